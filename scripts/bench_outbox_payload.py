@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+
+from shared.contracts.event_codec import (
+    EventPayload,
+    decode_event_payload,
+    encode_event_payload,
+    event_payload_to_json,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare outbox payload encodings")
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def best_ns_per_call(statement: Callable[[], object], iterations: int, repeat: int) -> float:
+    timings = timeit.repeat(statement, number=iterations, repeat=repeat)
+    return min(timings) / iterations * 1e9
+
+
+def parse_json_payload(payload_json: str) -> EventPayload:
+    # Mirrors the worker's legacy path: json.loads plus per-field type checks.
+    payload: dict[str, object] = json.loads(payload_json)
+    payment_id = payload["payment_id"]
+    source_account_id = payload["source_account_id"]
+    destination_account_id = payload["destination_account_id"]
+    amount_cents = payload["amount_cents"]
+    traceparent = payload.get("traceparent")
+    assert isinstance(payment_id, str) and isinstance(source_account_id, str)
+    assert isinstance(destination_account_id, str) and isinstance(amount_cents, int)
+    return EventPayload(
+        payment_id=payment_id,
+        source_account_id=source_account_id,
+        destination_account_id=destination_account_id,
+        amount_cents=amount_cents,
+        traceparent=traceparent if isinstance(traceparent, str) else None,
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    payload = EventPayload(
+        payment_id="pay-3f0c1b9e8a7d4c2b9e6f5a4d3c2b1a09",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=12_345,
+        traceparent="00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+    )
+    encoded_json = event_payload_to_json(payload)
+    encoded_bin = encode_event_payload(payload)
+    assert parse_json_payload(encoded_json) == decode_event_payload(encoded_bin) == payload
+
+    rows = [
+        (
+            "json",
+            len(encoded_json.encode("utf-8")),
+            best_ns_per_call(lambda: event_payload_to_json(payload), args.iterations, args.repeat),
+            best_ns_per_call(lambda: parse_json_payload(encoded_json), args.iterations, args.repeat),
+        ),
+        (
+            "binary v1",
+            len(encoded_bin),
+            best_ns_per_call(lambda: encode_event_payload(payload), args.iterations, args.repeat),
+            best_ns_per_call(lambda: decode_event_payload(encoded_bin), args.iterations, args.repeat),
+        ),
+    ]
+    print(f"{'format':<10} {'bytes':>6} {'serialize ns':>13} {'parse ns':>10}")
+    for name, size, serialize_ns, parse_ns in rows:
+        print(f"{name:<10} {size:>6} {serialize_ns:>13.0f} {parse_ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+from shared.contracts.models import CreatePaymentRequest
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare idempotency request hash schemes")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rps", type=float, default=2_000.0, help="request rate to project CPU cost at")
+    return parser.parse_args()
+
+
+def best_ns_per_call(statement: Callable[[], object], iterations: int, repeat: int) -> float:
+    timings = timeit.repeat(statement, number=iterations, repeat=repeat)
+    return min(timings) / iterations * 1e9
+
+
+def main() -> None:
+    args = parse_args()
+    request = CreatePaymentRequest(
+        idempotency_key="bench-idem-000001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=12_345,
+    )
+    legacy_ns = best_ns_per_call(request.compute_legacy_request_hash, args.iterations, args.repeat)
+    current_ns = best_ns_per_call(request.compute_request_hash, args.iterations, args.repeat)
+    saved_ns = legacy_ns - current_ns
+    cpu_ms_per_second = saved_ns * args.rps / 1e6
+    print(f"v1 json+sha256:      {legacy_ns:8.0f} ns/request")
+    print(f"v2 struct+blake2b:   {current_ns:8.0f} ns/request")
+    print(f"speedup:             {legacy_ns / current_ns:8.2f}x")
+    print(f"CPU saved at {args.rps:.0f} req/s: {cpu_ms_per_second:.2f} ms per second of wall time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import timeit
+from collections.abc import Callable
+from uuid import uuid4
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from shared.utils.ids import new_id
+
+SCHEMES: dict[str, Callable[[], str]] = {
+    "uuid4": lambda: f"pay-{uuid4().hex}",
+    "time-ordered": lambda: new_id("pay"),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare random and time-ordered primary keys: insert throughput and index size"
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=1_000_000,
+        help="rows per scheme; use tens of millions against PostgreSQL for production-like B-trees",
+    )
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    return parser.parse_args()
+
+
+def table_for(metadata: MetaData, scheme: str) -> Table:
+    return Table(
+        f"bench_ids_{scheme.replace('-', '_')}",
+        metadata,
+        Column("id", String(64), primary_key=True),
+        Column("amount_cents", Integer, nullable=False),
+    )
+
+
+def index_size_bytes(connection: Connection, table: Table) -> int | None:
+    if connection.dialect.name == "postgresql":
+        size = connection.execute(
+            text("SELECT pg_relation_size(CAST(:index AS regclass))"), {"index": f"{table.name}_pkey"}
+        ).scalar_one()
+        return int(size)
+    if connection.dialect.name == "sqlite":
+        try:
+            size = connection.execute(
+                text("SELECT SUM(pgsize) FROM dbstat WHERE name = :index"),
+                {"index": f"sqlite_autoindex_{table.name}_1"},
+            ).scalar_one()
+        except Exception:
+            # dbstat is an optional SQLite compile-time extension.
+            return None
+        return int(size or 0)
+    return None
+
+
+def run_inserts(engine: Engine, table: Table, generate: Callable[[], str], rows: int, batch_size: int) -> float:
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        count = min(batch_size, rows - inserted)
+        batch = [{"id": generate(), "amount_cents": inserted + offset} for offset in range(count)]
+        with engine.begin() as connection:
+            connection.execute(table.insert(), batch)
+        inserted += count
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    args = parse_args()
+    database_url = args.database_url
+    if not database_url:
+        database_url = f"sqlite+pysqlite:///{tempfile.mkdtemp()}/bench_ids.db"
+    engine = create_engine(database_url, future=True)
+    metadata = MetaData()
+    tables = {scheme: table_for(metadata, scheme) for scheme in SCHEMES}
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    print(f"database: {engine.dialect.name}, rows per scheme: {args.rows}")
+    print(f"{'scheme':<14} {'gen ns/id':>10} {'rows/s':>12} {'pk index MB':>12}")
+    try:
+        for scheme, generate in SCHEMES.items():
+            generation_ns = min(timeit.repeat(generate, number=100_000, repeat=3)) / 100_000 * 1e9
+            elapsed = run_inserts(engine, tables[scheme], generate, args.rows, args.batch_size)
+            with engine.connect() as connection:
+                size = index_size_bytes(connection, tables[scheme])
+            size_label = "n/a" if size is None else f"{size / 1_048_576:.1f}"
+            print(f"{scheme:<14} {generation_ns:>10.0f} {args.rows / elapsed:>12.0f} {size_label:>12}")
+    finally:
+        metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
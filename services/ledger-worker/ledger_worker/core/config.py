@@ -3,7 +3,9 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
-from shared.contracts.models import ConsistencyMode
+from shared.contracts.messages import WorkerMessage
+from shared.contracts.models import AccountLockStrategy, ConsistencyMode
+from shared.utils.partitions import OUTBOX_PARTITION_SPACE
 
 
 def _build_postgres_url() -> str:
@@ -15,6 +17,34 @@ def _build_postgres_url() -> str:
     return f"postgresql+psycopg://{user}:{password}@{host}:{port}/{database}"
 
 
+@dataclass(frozen=True)
+class PartitionAssignment:
+    # Outbox partitions this worker claims: events whose `partition_key % total` is in `owned`.
+    # Keys derive from the source account only, so this orders per source. Events that
+    # share a destination can run concurrently on different workers; only the account
+    # row locks of the lock strategy (or the optimistic version check) serialize them.
+    owned: frozenset[int]
+    total: int
+
+
+def parse_partition_assignment(spec: str) -> PartitionAssignment | None:
+    # "0-3/16", "5/16" or "0,2,8-11/16"; empty means every partition.
+    if not spec.strip():
+        return None
+    try:
+        ranges, total_text = spec.strip().split("/")
+        total = int(total_text)
+        owned: set[int] = set()
+        for part in ranges.split(","):
+            first, _, last = part.strip().partition("-")
+            owned.update(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise ValueError(f"{WorkerMessage.INVALID_PARTITION_ASSIGNMENT.value}: {spec}") from None
+    if not 0 < total <= OUTBOX_PARTITION_SPACE or not owned or min(owned) < 0 or max(owned) >= total:
+        raise ValueError(f"{WorkerMessage.INVALID_PARTITION_ASSIGNMENT.value}: {spec}")
+    return PartitionAssignment(owned=frozenset(owned), total=total)
+
+
 @dataclass(frozen=True)
 class Settings:
     database_url: str
@@ -24,6 +54,21 @@ class Settings:
     poll_interval_seconds: float
     reconciliation_interval_seconds: float
     processing_timeout_seconds: float
+    account_lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM
+    occ_max_attempts: int = 5
+    occ_backoff_base_ms: float = 2.0
+    outbox_batch_size: int = 20
+    batch_apply: bool = False
+    pipelined_claims: bool = False
+    worker_concurrency: int = 1
+    outbox_partitions: PartitionAssignment | None = None
+    outbox_notify: bool = True
+    idle_poll_max_seconds: float = 2.0
+    adaptive_batch: bool = False
+    outbox_batch_max: int = 500
+    outbox_batch_target_ms: float = 1_000.0
+    net_settlement: bool = False
+    reconciliation_timeout_seconds: float = 60.0
 
 
 def load_settings() -> Settings:
@@ -42,4 +87,21 @@ def load_settings() -> Settings:
         poll_interval_seconds=poll_interval_seconds,
         reconciliation_interval_seconds=reconciliation_interval_seconds,
         processing_timeout_seconds=processing_timeout_seconds,
+        account_lock_strategy=AccountLockStrategy(
+            os.getenv("ACCOUNT_LOCK_STRATEGY", AccountLockStrategy.ORM.value)
+        ),
+        occ_max_attempts=int(os.getenv("OCC_MAX_ATTEMPTS", "5")),
+        occ_backoff_base_ms=float(os.getenv("OCC_BACKOFF_BASE_MS", "2")),
+        outbox_batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "20")),
+        batch_apply=os.getenv("WORKER_BATCH_APPLY", "0") == "1",
+        pipelined_claims=os.getenv("WORKER_PIPELINED_CLAIMS", "0") == "1",
+        worker_concurrency=int(os.getenv("WORKER_CONCURRENCY", "1")),
+        outbox_partitions=parse_partition_assignment(os.getenv("OUTBOX_PARTITIONS", "")),
+        outbox_notify=os.getenv("OUTBOX_NOTIFY", "1") == "1",
+        idle_poll_max_seconds=float(os.getenv("OUTBOX_IDLE_POLL_MAX_SECONDS", "2")),
+        adaptive_batch=os.getenv("WORKER_ADAPTIVE_BATCH", "0") == "1",
+        outbox_batch_max=int(os.getenv("OUTBOX_BATCH_MAX", "500")),
+        outbox_batch_target_ms=float(os.getenv("OUTBOX_BATCH_TARGET_MS", "1000")),
+        net_settlement=os.getenv("WORKER_NET_SETTLEMENT", "0") == "1",
+        reconciliation_timeout_seconds=float(os.getenv("RECONCILIATION_TIMEOUT_SECONDS", "60")),
     )
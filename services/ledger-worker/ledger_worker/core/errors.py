@@ -9,3 +9,8 @@ from shared.contracts.models import ErrorCode
 class WorkerError(Exception):
     error_code: ErrorCode
     message: str
+
+
+@dataclass
+class OptimisticLockConflict(Exception):
+    account_id: str
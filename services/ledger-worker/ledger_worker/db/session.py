@@ -1,20 +1,39 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Any
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
 
-from ledger_worker.core.config import load_settings
+from ledger_worker.core.config import Settings, load_settings
+
+
+def _pool_options(settings: Settings) -> dict[str, Any]:
+    # One connection per dispatch slot, plus the claim and failure-handling sessions.
+    if make_url(settings.database_url).get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": max(settings.worker_concurrency + 1, 5)}
 
 
 @lru_cache(maxsize=1)
 def get_engine() -> Engine:
     settings = load_settings()
-    return create_engine(settings.database_url, future=True, pool_pre_ping=True)
+    return create_engine(settings.database_url, future=True, pool_pre_ping=True, **_pool_options(settings))
 
 
 @lru_cache(maxsize=1)
 def get_session_factory() -> sessionmaker[Session]:
     return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_reconciliation_session_factory() -> sessionmaker[Session]:
+    # A single dedicated connection: the aggregate scans never hold a processing slot.
+    settings = load_settings()
+    options: dict[str, Any] = {}
+    if make_url(settings.database_url).get_backend_name() != "sqlite":
+        options = {"pool_size": 1, "max_overflow": 0}
+    engine = create_engine(settings.database_url, future=True, pool_pre_ping=True, **options)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 import os
-import time
+import sys
+from dataclasses import replace
 
-from ledger_worker.core.config import Settings, load_settings
-from ledger_worker.db.session import get_session_factory
+from ledger_worker.core.config import Settings, load_settings, parse_partition_assignment
+from ledger_worker.db.session import get_reconciliation_session_factory, get_session_factory
+from ledger_worker.services.batch_sizer import AdaptiveBatchSizer
 from ledger_worker.services.failure_injector import FailureInjector
 from ledger_worker.services.processor import WorkerProcessor
-from ledger_worker.services.reconciliation import ReconciliationService
+from ledger_worker.services.reconciliation import ReconciliationScheduler, ReconciliationService
+from ledger_worker.services.wakeup import IdleBackoff, build_wakeup
 from ledger_worker.telemetry.metrics import start_metrics_server
 from ledger_worker.telemetry.otel import configure_otel
+from shared.utils.backoff import RetryPolicy
 
 
 def build_processor(settings: Settings) -> WorkerProcessor:
@@ -21,9 +26,39 @@ def build_processor(settings: Settings) -> WorkerProcessor:
         mode=settings.consistency_mode,
         failure_injector=injector,
         processing_timeout_seconds=settings.processing_timeout_seconds,
+        account_lock_strategy=settings.account_lock_strategy,
+        conflict_retry=RetryPolicy(
+            max_attempts=settings.occ_max_attempts,
+            base_delay_seconds=settings.occ_backoff_base_ms / 1000.0,
+        ),
+        batch_size=settings.outbox_batch_size,
+        batch_apply=settings.batch_apply,
+        pipelined_claims=settings.pipelined_claims,
+        concurrency=settings.worker_concurrency,
+        partitions=settings.outbox_partitions,
+        batch_sizer=build_batch_sizer(settings),
+        net_settlement=settings.net_settlement,
     )
 
 
+def build_batch_sizer(settings: Settings) -> AdaptiveBatchSizer | None:
+    if not settings.adaptive_batch:
+        return None
+    return AdaptiveBatchSizer(
+        initial_size=settings.outbox_batch_size,
+        max_size=settings.outbox_batch_max,
+        target_seconds=settings.outbox_batch_target_ms / 1000.0,
+        lease_seconds=settings.processing_timeout_seconds,
+    )
+
+
+def build_reconciliation_scheduler(settings: Settings) -> ReconciliationScheduler:
+    service = ReconciliationService(
+        get_reconciliation_session_factory(), timeout_seconds=settings.reconciliation_timeout_seconds
+    )
+    return ReconciliationScheduler(service, settings.reconciliation_interval_seconds)
+
+
 def process_outbox_once(settings: Settings | None = None) -> int:
     active_settings = settings or load_settings()
     processor = build_processor(active_settings)
@@ -33,19 +68,35 @@ def process_outbox_once(settings: Settings | None = None) -> int:
 async def run_loop(settings: Settings | None = None) -> None:
     active_settings = settings or load_settings()
     processor = build_processor(active_settings)
-    reconciliation = ReconciliationService(get_session_factory())
-    last_reconciliation = time.monotonic()
-    while True:
-        processor.process_available_events()
-        now = time.monotonic()
-        if now - last_reconciliation >= active_settings.reconciliation_interval_seconds:
-            reconciliation.run_once()
-            last_reconciliation = now
-        await asyncio.sleep(active_settings.poll_interval_seconds)
-
-
-def main() -> None:
+    reconciliation = build_reconciliation_scheduler(active_settings)
+    wakeup = build_wakeup(active_settings)
+    backoff = IdleBackoff(active_settings.poll_interval_seconds, active_settings.idle_poll_max_seconds)
+    reconciliation.start()
+    try:
+        while True:
+            claim_size = processor.claim_size
+            processed = processor.process_available_events()
+            await wakeup.wait(backoff.next_delay(processed, claim_size))
+    finally:
+        wakeup.close()
+        reconciliation.stop()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the ledger outbox worker")
+    parser.add_argument(
+        "--partitions",
+        default=None,
+        help='outbox partitions to claim, e.g. "0-3/16"; overrides OUTBOX_PARTITIONS',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv or [])
     settings = load_settings()
+    if args.partitions is not None:
+        settings = replace(settings, outbox_partitions=parse_partition_assignment(args.partitions))
     port = int(os.getenv("LEDGER_WORKER_METRICS_PORT", "8001"))
     configure_otel(service_name=os.getenv("LEDGER_WORKER_OTEL_SERVICE_NAME", "ledger-worker"))
     start_metrics_server(port)
@@ -53,4 +104,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
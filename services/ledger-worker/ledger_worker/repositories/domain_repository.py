@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from sqlalchemy import Select, case, func, select
 from sqlalchemy.orm import Session
 
 from shared.contracts.models import LedgerDirection
-from shared.db import AccountORM, LedgerEntryORM, PaymentORM
+from shared.db import (
+    AccountBalance,
+    AccountORM,
+    LedgerEntryORM,
+    PaymentORM,
+    balance_delta_statement,
+    compare_and_swap_statement,
+    insert_rows,
+    lock_balances_statement,
+)
+from shared.db.append_only import LEDGER_ENTRIES_TABLE
 
 
 class DomainRepository:
@@ -18,6 +30,54 @@ class DomainRepository:
             statement = statement.with_for_update()
         return self.session.scalar(statement)
 
+    def get_accounts_for_update(self, account_ids: Iterable[str]) -> dict[str, AccountORM]:
+        ordered_ids = sorted(set(account_ids))
+        if not ordered_ids:
+            return {}
+        statement: Select[tuple[AccountORM]] = (
+            select(AccountORM).where(AccountORM.id.in_(ordered_ids)).order_by(AccountORM.id.asc())
+        )
+        dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
+        if dialect != "sqlite":
+            statement = statement.with_for_update()
+        return {account.id: account for account in self.session.scalars(statement)}
+
+    def lock_account_balances(self, account_ids: Iterable[str]) -> dict[str, AccountBalance]:
+        dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
+        statement = lock_balances_statement(account_ids, for_update=dialect != "sqlite")
+        return {row[0]: AccountBalance(*row) for row in self.session.execute(statement)}
+
+    def read_account_balances(self, account_ids: Iterable[str]) -> dict[str, AccountBalance]:
+        statement = lock_balances_statement(account_ids, for_update=False)
+        return {row[0]: AccountBalance(*row) for row in self.session.execute(statement)}
+
+    def compare_and_swap_balance(
+        self, balance: AccountBalance, *, available_delta: int = 0, reserved_delta: int = 0
+    ) -> bool:
+        statement = compare_and_swap_statement(
+            balance, available_delta=available_delta, reserved_delta=reserved_delta
+        )
+        return self.session.execute(statement).first() is not None
+
+    def apply_balance_delta(
+        self,
+        account_id: str,
+        *,
+        available_delta: int = 0,
+        reserved_delta: int = 0,
+        min_available: int | None = None,
+        min_reserved: int | None = None,
+    ) -> AccountBalance | None:
+        statement = balance_delta_statement(
+            account_id,
+            available_delta=available_delta,
+            reserved_delta=reserved_delta,
+            min_available=min_available,
+            min_reserved=min_reserved,
+        )
+        row = self.session.execute(statement).first()
+        return AccountBalance(*row) if row is not None else None
+
     def get_payment_for_update(self, payment_id: str) -> PaymentORM | None:
         statement: Select[tuple[PaymentORM]] = select(PaymentORM).where(PaymentORM.id == payment_id)
         dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
@@ -25,9 +85,24 @@ class DomainRepository:
             statement = statement.with_for_update()
         return self.session.scalar(statement)
 
+    def get_payments_for_update(self, payment_ids: Iterable[str]) -> dict[str, PaymentORM]:
+        ordered_ids = sorted(set(payment_ids))
+        if not ordered_ids:
+            return {}
+        statement: Select[tuple[PaymentORM]] = (
+            select(PaymentORM).where(PaymentORM.id.in_(ordered_ids)).order_by(PaymentORM.id.asc())
+        )
+        dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
+        if dialect != "sqlite":
+            statement = statement.with_for_update()
+        return {payment.id: payment for payment in self.session.scalars(statement)}
+
     def add_ledger_entry(self, entry: LedgerEntryORM) -> None:
         self.session.add(entry)
 
+    def add_ledger_entries(self, rows: list[dict[str, object]]) -> None:
+        insert_rows(self.session, LEDGER_ENTRIES_TABLE, rows)
+
     def ledger_imbalance(self) -> int:
         expression = case(
             (LedgerEntryORM.direction == LedgerDirection.DEBIT.value, LedgerEntryORM.amount_cents),
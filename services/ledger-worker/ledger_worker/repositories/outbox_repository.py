@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import Select, or_, select
+from sqlalchemy import ColumnElement, Select, or_, select, update
 from sqlalchemy.orm import Session
 
+from ledger_worker.core.config import PartitionAssignment
 from shared.contracts.models import OutboxStatus
 from shared.db import OutboxEventORM
 
@@ -17,29 +18,20 @@ class OutboxRepository:
         self.session = session
 
     def fetch_batch_for_processing(
-        self, batch_size: int, processing_timeout_seconds: float = 30.0
+        self,
+        batch_size: int,
+        processing_timeout_seconds: float = 30.0,
+        partitions: PartitionAssignment | None = None,
     ) -> list[OutboxEventORM]:
         now = utc_now()
         lease_expiration = now + timedelta(seconds=processing_timeout_seconds)
         statement: Select[tuple[OutboxEventORM]] = (
             select(OutboxEventORM)
-            .where(
-                or_(
-                    (
-                        (OutboxEventORM.status == OutboxStatus.PENDING.value)
-                        & or_(OutboxEventORM.next_retry_at.is_(None), OutboxEventORM.next_retry_at <= now)
-                    ),
-                    (
-                        (OutboxEventORM.status == OutboxStatus.PROCESSING.value)
-                        & or_(OutboxEventORM.next_retry_at.is_(None), OutboxEventORM.next_retry_at <= now)
-                    ),
-                )
-            )
+            .where(self._claimable(now, partitions))
             .order_by(OutboxEventORM.created_at.asc(), OutboxEventORM.id.asc())
             .limit(batch_size)
         )
-        dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
-        if dialect != "sqlite":
+        if self._dialect() != "sqlite":
             statement = statement.with_for_update(skip_locked=True)
         events = list(self.session.scalars(statement))
         for event in events:
@@ -47,6 +39,52 @@ class OutboxRepository:
             event.next_retry_at = lease_expiration
         return events
 
+    def claim_batch(
+        self,
+        batch_size: int,
+        processing_timeout_seconds: float = 30.0,
+        partitions: PartitionAssignment | None = None,
+    ) -> list[OutboxEventORM]:
+        # Select, lease and load the batch in one UPDATE ... RETURNING round trip. The
+        # returned rows populate the identity map, so the caller processes them without
+        # re-reading; a crashed worker's lease expires and the rows become claimable again.
+        now = utc_now()
+        candidates = (
+            select(OutboxEventORM.id)
+            .where(self._claimable(now, partitions))
+            .order_by(OutboxEventORM.created_at.asc(), OutboxEventORM.id.asc())
+            .limit(batch_size)
+        )
+        if self._dialect() != "sqlite":
+            candidates = candidates.with_for_update(skip_locked=True)
+        statement = (
+            update(OutboxEventORM)
+            .where(OutboxEventORM.id.in_(candidates))
+            .values(
+                status=OutboxStatus.PROCESSING.value,
+                next_retry_at=now + timedelta(seconds=processing_timeout_seconds),
+            )
+            .returning(OutboxEventORM)
+            .execution_options(synchronize_session=False)
+        )
+        events = list(self.session.scalars(statement))
+        # RETURNING carries no ordering guarantee.
+        events.sort(key=lambda event: (event.created_at, event.id))
+        return events
+
+    def _claimable(self, now: datetime, partitions: PartitionAssignment | None) -> ColumnElement[bool]:
+        lease_free = or_(OutboxEventORM.next_retry_at.is_(None), OutboxEventORM.next_retry_at <= now)
+        claimable = or_(
+            (OutboxEventORM.status == OutboxStatus.PENDING.value) & lease_free,
+            (OutboxEventORM.status == OutboxStatus.PROCESSING.value) & lease_free,
+        )
+        if partitions is None:
+            return claimable
+        return claimable & (OutboxEventORM.partition_key % partitions.total).in_(sorted(partitions.owned))
+
+    def _dialect(self) -> str:
+        return self.session.bind.dialect.name if self.session.bind is not None else ""
+
     def mark_processed(self, event: OutboxEventORM) -> None:
         event.status = OutboxStatus.PROCESSED.value
         event.next_retry_at = None
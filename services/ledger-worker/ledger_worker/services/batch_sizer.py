@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+
+class AdaptiveBatchSizer:
+    # AIMD over the claim size. A full batch that finished well inside the target means
+    # the backlog is deeper than one claim and there is headroom, so the size grows by one
+    # step. A slow batch (lock waits, a loaded database) or any conflict/transient failure
+    # halves it. The target stays a fraction of the lease so a claimed batch always
+    # finishes before its rows become claimable by another worker.
+    def __init__(
+        self,
+        initial_size: int,
+        max_size: int,
+        target_seconds: float,
+        lease_seconds: float,
+        min_size: int = 1,
+    ) -> None:
+        self.min_size = max(min_size, 1)
+        self.max_size = max(max_size, self.min_size)
+        self.step = max(initial_size, 1)
+        self.target_seconds = min(target_seconds, lease_seconds / 4)
+        self._size = min(max(initial_size, self.min_size), self.max_size)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def observe(self, requested: int, claimed: int, duration_seconds: float, contended: int) -> int:
+        if contended > 0 or duration_seconds > self.target_seconds:
+            self._size = max(self.min_size, self._size // 2)
+        elif claimed >= requested and duration_seconds <= self.target_seconds / 2:
+            self._size = min(self.max_size, self._size + self.step)
+        return self._size
@@ -11,7 +11,8 @@ from shared.db import OutboxEventORM
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
-    from ledger_worker.services.processor import EventPayload, WorkerProcessor
+    from ledger_worker.services.processor import WorkerProcessor
+    from shared.contracts.event_codec import EventPayload
 
 
 class WorkerModeStrategy(Protocol):
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
 from datetime import datetime, timedelta, timezone
 from typing import Final, Protocol
-from uuid import uuid4
 
 from opentelemetry import trace
 from opentelemetry.context import Context
@@ -12,38 +16,66 @@ from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapProp
 from sqlalchemy import Select, select
 from sqlalchemy.orm import Session, sessionmaker
 
-from ledger_worker.core.errors import WorkerError
+from ledger_worker.core.config import PartitionAssignment
+from ledger_worker.core.errors import OptimisticLockConflict, WorkerError
 from ledger_worker.repositories.domain_repository import DomainRepository
 from ledger_worker.repositories.outbox_repository import OutboxRepository
+from ledger_worker.services.batch_sizer import AdaptiveBatchSizer
+from ledger_worker.services.dispatcher import AccountOrderedDispatcher, DispatchItem
 from ledger_worker.services.mode_strategies import (
     EventualModeStrategy,
     HybridModeStrategy,
     StrongModeStrategy,
     WorkerModeStrategy,
 )
-from ledger_worker.telemetry.metrics import INVARIANT_VIOLATION, OUTBOX_RETRY, PAYMENTS_PROCESSED
+from ledger_worker.telemetry.metrics import (
+    BATCH_APPLY_ROLLBACK,
+    BATCH_APPLY_SIZE,
+    CLAIM_BATCH_DURATION_MS,
+    CLAIM_BATCH_SIZE,
+    INVARIANT_VIOLATION,
+    NET_SETTLEMENT_ACCOUNT_UPDATES,
+    NET_SETTLEMENT_EVENTS,
+    OPTIMISTIC_LOCK_CONFLICT,
+    OUTBOX_RETRY,
+    PAYMENTS_PROCESSED,
+)
+from shared.contracts.event_codec import EventPayload, EventPayloadError, decode_event_payload
 from shared.contracts.messages import WorkerMessage
 from shared.contracts.models import (
+    AccountLockStrategy,
     ConsistencyMode,
     ErrorCode,
-    LedgerDirection,
+    OutboxEventType,
     OutboxStatus,
     PaymentStatus,
 )
-from shared.db import AccountORM, LedgerEntryORM, OutboxEventORM
+from shared.db import AccountORM, OutboxEventORM, PaymentORM, ledger_transfer_rows
+from shared.utils.backoff import RetryPolicy
+
+
+# Session.info key: account ids already locked by the enclosing batch transaction.
+PRELOCKED_ACCOUNTS = "prelocked_account_ids"
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@dataclass
+class BatchApplyOutcome:
+    conflicts: list[str] = field(default_factory=list)
+    permanent: list[tuple[str, WorkerError]] = field(default_factory=list)
+    transient: list[str] = field(default_factory=list)
+    # Left out of a net settlement; processed one by one afterwards.
+    deferred: list[str] = field(default_factory=list)
+
+
 @dataclass(frozen=True)
-class EventPayload:
-    payment_id: str
-    source_account_id: str
-    destination_account_id: str
-    amount_cents: int
-    traceparent: str | None
+class SettlementItem:
+    event: OutboxEventORM
+    payload: EventPayload
+    payment: PaymentORM
 
 
 class FailureInjectorPort(Protocol):
@@ -61,11 +93,32 @@ class WorkerProcessor:
         mode: ConsistencyMode,
         failure_injector: FailureInjectorPort,
         processing_timeout_seconds: float = 30.0,
+        account_lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM,
+        conflict_retry: RetryPolicy | None = None,
+        batch_size: int = 20,
+        batch_apply: bool = False,
+        pipelined_claims: bool = False,
+        concurrency: int = 1,
+        partitions: PartitionAssignment | None = None,
+        batch_sizer: AdaptiveBatchSizer | None = None,
+        net_settlement: bool = False,
     ) -> None:
         self.session_factory = session_factory
         self.mode = mode
         self.failure_injector = failure_injector
         self.processing_timeout_seconds = processing_timeout_seconds
+        self.account_lock_strategy = account_lock_strategy
+        self.conflict_retry = conflict_retry or RetryPolicy()
+        self.batch_size = batch_size
+        self.batch_apply = batch_apply
+        self.pipelined_claims = pipelined_claims
+        self.dispatcher = AccountOrderedDispatcher(concurrency) if concurrency > 1 else None
+        self.partitions = partitions
+        self.batch_sizer = batch_sizer
+        self.net_settlement = net_settlement and mode is ConsistencyMode.HYBRID
+        # Conflicts and transient failures, counted from every dispatch slot.
+        self._contention = 0
+        self._contention_lock = threading.Lock()
         self.tracer = trace.get_tracer("ledger_worker.processor")
         self._strategies: Final[dict[ConsistencyMode, WorkerModeStrategy]] = {
             ConsistencyMode.STRONG: StrongModeStrategy(),
@@ -73,38 +126,380 @@ class WorkerProcessor:
             ConsistencyMode.EVENTUAL: EventualModeStrategy(),
         }
 
-    def process_available_events(self, batch_size: int = 20) -> int:
-        event_ids = self._acquire_event_ids(batch_size)
+    @property
+    def claim_size(self) -> int:
+        return self.batch_sizer.size if self.batch_sizer is not None else self.batch_size
+
+    def process_available_events(self, batch_size: int | None = None) -> int:
+        requested = batch_size or self.claim_size
+        contention_before = self._contention
+        started = time.perf_counter()
+        claimed = self._process_available(requested)
+        duration_seconds = time.perf_counter() - started
+        CLAIM_BATCH_SIZE.set(requested)
+        if claimed == 0:
+            return 0
+        CLAIM_BATCH_DURATION_MS.observe(duration_seconds * 1000.0)
+        if self.batch_sizer is not None:
+            self.batch_sizer.observe(
+                requested, claimed, duration_seconds, self._contention - contention_before
+            )
+        return claimed
+
+    def _process_available(self, batch_size: int) -> int:
+        if self.pipelined_claims:
+            return self._process_claimed_batch(batch_size)
+        events = self._acquire_events(batch_size)
+        event_ids = [event.id for event in events]
+        if (self.net_settlement or self.batch_apply) and len(event_ids) > 1:
+            session = self.session_factory()
+            try:
+                process = self._process_net_settlement if self.net_settlement else self._process_batch
+                process(session, event_ids, lambda: self._load_events_for_update(session, event_ids))
+            finally:
+                session.close()
+            return len(event_ids)
+        if self.dispatcher is not None and len(events) > 1:
+            self.dispatcher.run(
+                [
+                    DispatchItem(self._event_accounts(event), partial(self._process_event_by_id, event.id))
+                    for event in events
+                ]
+            )
+            return len(event_ids)
         for event_id in event_ids:
             self._process_event_by_id(event_id)
         return len(event_ids)
 
-    def _acquire_event_ids(self, batch_size: int) -> list[str]:
+    def _process_claimed_batch(self, batch_size: int) -> int:
+        # Claimed rows stay loaded in this session (expire_on_commit=False) and go straight
+        # to the strategies: no per-event re-select and no separate lease write.
+        session = self.session_factory()
+        try:
+            with session.begin():
+                events = self.outbox(session).claim_batch(
+                    batch_size, self.processing_timeout_seconds, self.partitions
+                )
+            event_ids = [event.id for event in events]
+            if self.net_settlement and len(events) > 1:
+                self._process_net_settlement(session, event_ids, lambda: events)
+            elif self.batch_apply and len(events) > 1:
+                self._process_batch(session, event_ids, lambda: events)
+            elif self.dispatcher is not None and len(events) > 1:
+                self.dispatcher.run(
+                    [
+                        DispatchItem(
+                            self._event_accounts(event), partial(self._process_claimed_event_alone, event)
+                        )
+                        for event in events
+                    ]
+                )
+            else:
+                for event in events:
+                    self._process_claimed_event(session, event)
+        finally:
+            session.close()
+        return len(event_ids)
+
+    def _process_claimed_event_alone(self, event: OutboxEventORM) -> None:
+        # Dispatch slots run on their own threads, so each needs its own session.
         session = self.session_factory()
+        try:
+            self._process_claimed_event(session, event)
+        finally:
+            session.close()
+
+    def _event_accounts(self, event: OutboxEventORM) -> frozenset[str]:
+        # An undecodable payload touches no account; it fails on its own slot.
+        try:
+            payload = self._parse_payload(event)
+        except Exception:
+            return frozenset()
+        return frozenset((payload.source_account_id, payload.destination_account_id))
+
+    def _process_claimed_event(self, session: Session, event: OutboxEventORM) -> None:
+        event_id = event.id
         try:
             with session.begin():
-                events = OutboxRepository(session).fetch_batch_for_processing(
+                # A no-op for rows claimed in this session; otherwise the claimed state is
+                # copied in as-is rather than re-read.
+                self._process_event(session, session.merge(event, load=False))
+        except OptimisticLockConflict:
+            self._record_conflict()
+            self._process_event_by_id(event_id)
+        except WorkerError as exc:
+            self._handle_permanent_failure(event_id, exc)
+        except Exception:
+            self._handle_transient_failure(event_id)
+
+    def _process_batch(
+        self,
+        session: Session,
+        event_ids: list[str],
+        load_events: Callable[[], list[OutboxEventORM]],
+    ) -> None:
+        try:
+            outcome = self._apply_batch(session, load_events)
+        except Exception:
+            # The batch transaction itself failed, so none of it was committed: fall back
+            # to one transaction per event, which classifies each failure on its own.
+            for event_id in event_ids:
+                self._process_event_by_id(event_id)
+            return
+        for event_id, exc in outcome.permanent:
+            self._handle_permanent_failure(event_id, exc)
+        for event_id in outcome.transient:
+            self._handle_transient_failure(event_id)
+        for event_id in outcome.conflicts:
+            self._record_conflict()
+            self._process_event_by_id(event_id)
+
+    def _apply_batch(
+        self, session: Session, load_events: Callable[[], list[OutboxEventORM]]
+    ) -> BatchApplyOutcome:
+        # One transaction and one commit for the whole claimed batch. Each event runs
+        # inside its own savepoint, so a failing event rolls back only its own writes and
+        # is then routed through the same failure handlers as the per-event path.
+        outcome = BatchApplyOutcome()
+        with session.begin():
+            parsed: list[tuple[OutboxEventORM, EventPayload]] = []
+            for event in load_events():
+                try:
+                    parsed.append((event, self._parse_payload(event)))
+                except WorkerError as exc:
+                    outcome.permanent.append((event.id, exc))
+                except Exception:
+                    outcome.transient.append(event.id)
+            self._prelock_batch_accounts(session, [payload for _, payload in parsed])
+            for event, payload in parsed:
+                event_id = event.id
+                try:
+                    with session.begin_nested():
+                        self._apply_event(session, event, payload)
+                    continue
+                except OptimisticLockConflict:
+                    outcome.conflicts.append(event_id)
+                except WorkerError as exc:
+                    outcome.permanent.append((event_id, exc))
+                except Exception:
+                    outcome.transient.append(event_id)
+                BATCH_APPLY_ROLLBACK.inc()
+            BATCH_APPLY_SIZE.observe(len(parsed))
+        return outcome
+
+    def _process_net_settlement(
+        self,
+        session: Session,
+        event_ids: list[str],
+        load_events: Callable[[], list[OutboxEventORM]],
+    ) -> None:
+        try:
+            outcome = self._apply_net_settlement(session, load_events)
+        except Exception as failure:
+            # Nothing was committed: every event goes through the per-event path, which
+            # retries conflicts and classifies failures one payment at a time.
+            if isinstance(failure, OptimisticLockConflict):
+                self._record_conflict()
+            for event_id in event_ids:
+                self._process_event_by_id(event_id)
+            return
+        for event_id, exc in outcome.permanent:
+            self._handle_permanent_failure(event_id, exc)
+        for event_id in outcome.transient:
+            self._handle_transient_failure(event_id)
+        for event_id in outcome.deferred:
+            self._process_event_by_id(event_id)
+
+    def _apply_net_settlement(
+        self, session: Session, load_events: Callable[[], list[OutboxEventORM]]
+    ) -> BatchApplyOutcome:
+        # Settling a hybrid payment only moves funds the API already reserved, so the
+        # batch's payments commute: they are summed into one balance update per account
+        # while payment statuses, ledger entries and outbox rows stay per payment.
+        outcome = BatchApplyOutcome()
+        with session.begin():
+            parsed: list[tuple[OutboxEventORM, EventPayload]] = []
+            for event in load_events():
+                try:
+                    parsed.append((event, self._parse_settlement_event(event)))
+                except WorkerError as exc:
+                    outcome.permanent.append((event.id, exc))
+                except Exception:
+                    outcome.transient.append(event.id)
+            repository = DomainRepository(session)
+            payments = repository.get_payments_for_update(payload.payment_id for _, payload in parsed)
+            items: list[SettlementItem] = []
+            for event, payload in parsed:
+                payment = payments.get(payload.payment_id)
+                if payment is None:
+                    error = WorkerError(ErrorCode.INVARIANT_VIOLATION, WorkerMessage.PAYMENT_NOT_FOUND.value)
+                    outcome.permanent.append((event.id, error))
+                elif payment.status in [PaymentStatus.COMPLETED.value, PaymentStatus.REJECTED.value]:
+                    self.outbox(session).mark_processed(event)
+                else:
+                    items.append(SettlementItem(event, payload, payment))
+            settled = self._apply_net_balances(repository, items, outcome)
+            ledger_rows: list[dict[str, object]] = []
+            for item in settled:
+                payload = item.payload
+                # Same span as the per-event path, so API-to-worker traces stay connected.
+                with self.tracer.start_as_current_span(
+                    "worker.process_event", context=self._extract_context(payload)
+                ) as span:
+                    span.set_attribute("worker.net_settlement", True)
+                    item.payment.status = PaymentStatus.COMPLETED.value
+                    ledger_rows.extend(
+                        ledger_transfer_rows(
+                            payload.payment_id,
+                            payload.source_account_id,
+                            payload.destination_account_id,
+                            payload.amount_cents,
+                        )
+                    )
+                    self.outbox(session).mark_processed(item.event)
+            repository.add_ledger_entries(ledger_rows)
+        PAYMENTS_PROCESSED.inc(len(settled))
+        return outcome
+
+    def _parse_settlement_event(self, event: OutboxEventORM) -> EventPayload:
+        if event.event_type != OutboxEventType.PAYMENT_RESERVED.value:
+            raise WorkerError(
+                ErrorCode.INVARIANT_VIOLATION,
+                f"{WorkerMessage.UNEXPECTED_EVENT.value} {event.event_type}",
+            )
+        self._inject_failures(event)
+        return self._parse_payload(event)
+
+    def _apply_net_balances(
+        self, repository: DomainRepository, items: list[SettlementItem], outcome: BatchApplyOutcome
+    ) -> list[SettlementItem]:
+        if not items:
+            return []
+        account_ids = {
+            account_id
+            for item in items
+            for account_id in (item.payload.source_account_id, item.payload.destination_account_id)
+        }
+        optimistic = self.account_lock_strategy is AccountLockStrategy.OPTIMISTIC
+        # One ordered read (FOR UPDATE unless optimistic) for every account in the batch.
+        if optimistic:
+            balances = repository.read_account_balances(account_ids)
+        else:
+            balances = repository.lock_account_balances(account_ids)
+        if len(balances) != len(account_ids):
+            raise WorkerError(ErrorCode.INVARIANT_VIOLATION, WorkerMessage.ACCOUNT_NOT_FOUND.value)
+        reserved_due: dict[str, int] = defaultdict(int)
+        for item in items:
+            reserved_due[item.payload.source_account_id] += item.payload.amount_cents
+        # A source whose reservations do not cover its payments is left to the per-event
+        # path, which settles the payments that fit and dead-letters the rest.
+        short = {
+            account_id
+            for account_id, due in reserved_due.items()
+            if balances[account_id].reserved_balance_cents < due
+        }
+        settled: list[SettlementItem] = []
+        deltas: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        for item in items:
+            payload = item.payload
+            if payload.source_account_id in short:
+                outcome.deferred.append(item.event.id)
+                continue
+            deltas[payload.source_account_id][1] -= payload.amount_cents
+            deltas[payload.destination_account_id][0] += payload.amount_cents
+            settled.append(item)
+        for account_id in sorted(deltas):
+            available_delta, reserved_delta = deltas[account_id]
+            if optimistic:
+                if not repository.compare_and_swap_balance(
+                    balances[account_id], available_delta=available_delta, reserved_delta=reserved_delta
+                ):
+                    raise OptimisticLockConflict(account_id)
+                continue
+            updated = repository.apply_balance_delta(
+                account_id,
+                available_delta=available_delta,
+                reserved_delta=reserved_delta,
+                min_reserved=-reserved_delta,
+            )
+            if updated is None:
+                raise WorkerError(ErrorCode.INVARIANT_VIOLATION, WorkerMessage.RESERVED_FUNDS_BELOW_AMOUNT.value)
+        NET_SETTLEMENT_EVENTS.inc(len(settled))
+        NET_SETTLEMENT_ACCOUNT_UPDATES.inc(len(deltas))
+        return settled
+
+    def _load_events_for_update(self, session: Session, event_ids: list[str]) -> list[OutboxEventORM]:
+        statement: Select[tuple[OutboxEventORM]] = (
+            select(OutboxEventORM)
+            .where(OutboxEventORM.id.in_(event_ids))
+            .order_by(OutboxEventORM.created_at.asc(), OutboxEventORM.id.asc())
+        )
+        dialect = session.bind.dialect.name if session.bind is not None else ""
+        if dialect != "sqlite":
+            statement = statement.with_for_update()
+        return list(session.scalars(statement))
+
+    def _prelock_batch_accounts(self, session: Session, payloads: list[EventPayload]) -> None:
+        # Lock the union of touched accounts once, in sorted order, before any event runs;
+        # the per-event lock helpers then skip accounts that are already held.
+        if self.mode is ConsistencyMode.STRONG:
+            return
+        if self.account_lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            return
+        account_ids = {
+            account_id
+            for payload in payloads
+            for account_id in (payload.source_account_id, payload.destination_account_id)
+        }
+        repository = DomainRepository(session)
+        if self.account_lock_strategy is AccountLockStrategy.LEAN:
+            locked = set(repository.lock_account_balances(account_ids))
+        else:
+            locked = set(repository.get_accounts_for_update(account_ids))
+        session.info[PRELOCKED_ACCOUNTS] = locked
+
+    def _acquire_events(self, batch_size: int) -> list[OutboxEventORM]:
+        session = self.session_factory()
+        try:
+            with session.begin():
+                return OutboxRepository(session).fetch_batch_for_processing(
                     batch_size=batch_size,
                     processing_timeout_seconds=self.processing_timeout_seconds,
+                    partitions=self.partitions,
                 )
-                return [event.id for event in events]
         finally:
             session.close()
 
     def _process_event_by_id(self, event_id: str) -> None:
+        # A blocking backoff is acceptable here: this runs on a dispatch slot thread or
+        # inline in run_loop, whose event loop has nothing else to serve while a batch
+        # is being processed (its only other task is the idle wait between batches).
+        attempt = 1
+        while not self._try_process_event(event_id):
+            self._record_conflict()
+            if attempt >= self.conflict_retry.max_attempts:
+                self._handle_transient_failure(event_id)
+                return
+            time.sleep(self.conflict_retry.delay_seconds(attempt))
+            attempt += 1
+
+    def _try_process_event(self, event_id: str) -> bool:
         session = self.session_factory()
         try:
             with session.begin():
                 event = self._load_event_for_update(session, event_id)
                 if event is None:
-                    return
+                    return True
                 self._process_event(session, event)
+        except OptimisticLockConflict:
+            return False
         except WorkerError as exc:
             self._handle_permanent_failure(event_id, exc)
         except Exception:
             self._handle_transient_failure(event_id)
         finally:
             session.close()
+        return True
 
     def _load_event_for_update(self, session: Session, event_id: str) -> OutboxEventORM | None:
         statement: Select[tuple[OutboxEventORM]] = select(OutboxEventORM).where(OutboxEventORM.id == event_id)
@@ -114,19 +509,40 @@ class WorkerProcessor:
         return session.scalar(statement)
 
     def _process_event(self, session: Session, event: OutboxEventORM) -> None:
-        payload = self._parse_payload(event.payload_json)
+        self._apply_event(session, event, self._parse_payload(event))
+
+    def _apply_event(self, session: Session, event: OutboxEventORM, payload: EventPayload) -> None:
         parent = self._extract_context(payload)
-        attempt = event.attempts + 1
         with self.tracer.start_as_current_span("worker.process_event", context=parent):
-            self.failure_injector.maybe_apply_db_delay(event.id, attempt)
-            if self.failure_injector.should_raise_worker_exception(event.id, attempt):
-                raise RuntimeError(WorkerMessage.DETERMINISTIC_WORKER_FAILURE.value)
-            if self.failure_injector.should_fail_redis_simulation(event.id, attempt):
-                raise RuntimeError(WorkerMessage.DETERMINISTIC_REDIS_FAILURE.value)
+            self._inject_failures(event)
             strategy = self._strategies[self.mode]
             strategy.process(self, session, event, payload)
 
-    def _parse_payload(self, payload_json: str) -> EventPayload:
+    def _inject_failures(self, event: OutboxEventORM) -> None:
+        attempt = event.attempts + 1
+        self.failure_injector.maybe_apply_db_delay(event.id, attempt)
+        if self.failure_injector.should_raise_worker_exception(event.id, attempt):
+            raise RuntimeError(WorkerMessage.DETERMINISTIC_WORKER_FAILURE.value)
+        if self.failure_injector.should_fail_redis_simulation(event.id, attempt):
+            raise RuntimeError(WorkerMessage.DETERMINISTIC_REDIS_FAILURE.value)
+
+    def _parse_payload(self, event: OutboxEventORM) -> EventPayload:
+        if event.payload_bin is not None:
+            try:
+                return decode_event_payload(event.payload_bin)
+            except EventPayloadError as exc:
+                raise WorkerError(
+                    ErrorCode.INVARIANT_VIOLATION,
+                    f"{WorkerMessage.INVALID_PAYLOAD_ENCODING.value}: {exc}",
+                ) from exc
+        if event.payload_json is None:
+            raise WorkerError(
+                ErrorCode.INVARIANT_VIOLATION,
+                f"{WorkerMessage.INVALID_PAYLOAD_FIELD.value}: payload_json",
+            )
+        return self._parse_json_payload(event.payload_json)
+
+    def _parse_json_payload(self, payload_json: str) -> EventPayload:
         payload: dict[str, object] = json.loads(payload_json)
         return EventPayload(
             payment_id=self._as_required_str(payload, "payment_id"),
@@ -156,16 +572,11 @@ class WorkerProcessor:
         if payment.status in [PaymentStatus.COMPLETED.value, PaymentStatus.REJECTED.value]:
             self.outbox(session).mark_processed(event)
             return
-        source, destination = self._lock_accounts(repository, source_id, destination_id)
-        if source.reserved_balance_cents < amount_cents:
+        if not self._settle_reserved(repository, source_id, destination_id, amount_cents):
             raise WorkerError(
                 ErrorCode.INVARIANT_VIOLATION,
                 WorkerMessage.RESERVED_FUNDS_BELOW_AMOUNT.value,
             )
-        source.reserved_balance_cents -= amount_cents
-        source.version += 1
-        destination.available_balance_cents += amount_cents
-        destination.version += 1
         payment.status = PaymentStatus.COMPLETED.value
         self._add_ledger_entries(repository, payment_id, source_id, destination_id, amount_cents)
         self.outbox(session).mark_processed(event)
@@ -185,24 +596,114 @@ class WorkerProcessor:
         if payment.status in [PaymentStatus.COMPLETED.value, PaymentStatus.REJECTED.value]:
             self.outbox(session).mark_processed(event)
             return
-        source, destination = self._lock_accounts(repository, source_id, destination_id)
-        if source.available_balance_cents < amount_cents:
+        if not self._transfer_available(repository, source_id, destination_id, amount_cents):
             payment.status = PaymentStatus.REJECTED.value
             self.outbox(session).mark_processed(event)
             PAYMENTS_PROCESSED.inc()
             return
-        source.available_balance_cents -= amount_cents
-        source.version += 1
-        destination.available_balance_cents += amount_cents
-        destination.version += 1
         payment.status = PaymentStatus.COMPLETED.value
         self._add_ledger_entries(repository, payment_id, source_id, destination_id, amount_cents)
         self.outbox(session).mark_processed(event)
         PAYMENTS_PROCESSED.inc()
 
+    def _settle_reserved(
+        self, repository: DomainRepository, source_id: str, destination_id: str, amount_cents: int
+    ) -> bool:
+        if self.account_lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            return self._swap_balances(
+                repository,
+                source_id,
+                {source_id: (0, -amount_cents), destination_id: (amount_cents, 0)},
+                reserved_floor=amount_cents,
+            )
+        if self.account_lock_strategy is AccountLockStrategy.LEAN:
+            self._lock_account_ids(repository, source_id, destination_id)
+            settled = repository.apply_balance_delta(
+                source_id, reserved_delta=-amount_cents, min_reserved=amount_cents
+            )
+            if settled is None:
+                return False
+            repository.apply_balance_delta(destination_id, available_delta=amount_cents)
+            return True
+        source, destination = self._lock_accounts(repository, source_id, destination_id)
+        if source.reserved_balance_cents < amount_cents:
+            return False
+        source.reserved_balance_cents -= amount_cents
+        source.version += 1
+        destination.available_balance_cents += amount_cents
+        destination.version += 1
+        return True
+
+    def _transfer_available(
+        self, repository: DomainRepository, source_id: str, destination_id: str, amount_cents: int
+    ) -> bool:
+        if self.account_lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            return self._swap_balances(
+                repository,
+                source_id,
+                {source_id: (-amount_cents, 0), destination_id: (amount_cents, 0)},
+                available_floor=amount_cents,
+            )
+        if self.account_lock_strategy is AccountLockStrategy.LEAN:
+            self._lock_account_ids(repository, source_id, destination_id)
+            debited = repository.apply_balance_delta(
+                source_id, available_delta=-amount_cents, min_available=amount_cents
+            )
+            if debited is None:
+                return False
+            repository.apply_balance_delta(destination_id, available_delta=amount_cents)
+            return True
+        source, destination = self._lock_accounts(repository, source_id, destination_id)
+        if source.available_balance_cents < amount_cents:
+            return False
+        source.available_balance_cents -= amount_cents
+        source.version += 1
+        destination.available_balance_cents += amount_cents
+        destination.version += 1
+        return True
+
+    def _swap_balances(
+        self,
+        repository: DomainRepository,
+        source_id: str,
+        deltas: dict[str, tuple[int, int]],
+        available_floor: int = 0,
+        reserved_floor: int = 0,
+    ) -> bool:
+        balances = repository.read_account_balances(deltas)
+        if len(balances) != len(deltas):
+            raise WorkerError(ErrorCode.INVARIANT_VIOLATION, WorkerMessage.ACCOUNT_NOT_FOUND.value)
+        source = balances[source_id]
+        if source.available_balance_cents < available_floor:
+            return False
+        if source.reserved_balance_cents < reserved_floor:
+            return False
+        for account_id in sorted(deltas):
+            available_delta, reserved_delta = deltas[account_id]
+            swapped = repository.compare_and_swap_balance(
+                balances[account_id], available_delta=available_delta, reserved_delta=reserved_delta
+            )
+            if not swapped:
+                raise OptimisticLockConflict(account_id)
+        return True
+
+    def _lock_account_ids(
+        self, repository: DomainRepository, source_id: str, destination_id: str
+    ) -> None:
+        if self._prelocked(repository, source_id, destination_id):
+            return
+        locked = repository.lock_account_balances([source_id, destination_id])
+        if len(locked) != len({source_id, destination_id}):
+            raise WorkerError(ErrorCode.INVARIANT_VIOLATION, WorkerMessage.ACCOUNT_NOT_FOUND.value)
+
     def _lock_accounts(
         self, repository: DomainRepository, source_id: str, destination_id: str
     ) -> tuple[AccountORM, AccountORM]:
+        if self._prelocked(repository, source_id, destination_id):
+            source = repository.session.get(AccountORM, source_id)
+            destination = repository.session.get(AccountORM, destination_id)
+            if source is not None and destination is not None:
+                return source, destination
         first_id, second_id = sorted([source_id, destination_id])
         first = repository.get_account_for_update(first_id)
         second = repository.get_account_for_update(second_id)
@@ -211,26 +712,15 @@ class WorkerProcessor:
         by_id = {first.id: first, second.id: second}
         return by_id[source_id], by_id[destination_id]
 
+    def _prelocked(self, repository: DomainRepository, source_id: str, destination_id: str) -> bool:
+        prelocked: set[str] = repository.session.info.get(PRELOCKED_ACCOUNTS, set())
+        return source_id in prelocked and destination_id in prelocked
+
     def _add_ledger_entries(
         self, repository: DomainRepository, payment_id: str, source_id: str, destination_id: str, amount_cents: int
     ) -> None:
-        repository.add_ledger_entry(
-            LedgerEntryORM(
-                id=f"led-{uuid4().hex}",
-                payment_id=payment_id,
-                account_id=source_id,
-                direction=LedgerDirection.DEBIT.value,
-                amount_cents=amount_cents,
-            )
-        )
-        repository.add_ledger_entry(
-            LedgerEntryORM(
-                id=f"led-{uuid4().hex}",
-                payment_id=payment_id,
-                account_id=destination_id,
-                direction=LedgerDirection.CREDIT.value,
-                amount_cents=amount_cents,
-            )
+        repository.add_ledger_entries(
+            ledger_transfer_rows(payment_id, source_id, destination_id, amount_cents)
         )
 
     def _handle_permanent_failure(self, event_id: str, _exc: WorkerError) -> None:
@@ -246,7 +736,16 @@ class WorkerProcessor:
         finally:
             session.close()
 
+    def _record_conflict(self) -> None:
+        OPTIMISTIC_LOCK_CONFLICT.inc()
+        self._record_contention()
+
+    def _record_contention(self) -> None:
+        with self._contention_lock:
+            self._contention += 1
+
     def _handle_transient_failure(self, event_id: str) -> None:
+        self._record_contention()
         session = self.session_factory()
         try:
             with session.begin():
@@ -1,26 +1,124 @@
 from __future__ import annotations
 
+import threading
+import time
+from typing import Final
+
+from psycopg.errors import QueryCanceled
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
 from ledger_worker.repositories.domain_repository import DomainRepository
-from ledger_worker.telemetry.metrics import LEDGER_IMBALANCE, NEGATIVE_BALANCE_DETECTED
+from ledger_worker.telemetry.metrics import (
+    LEDGER_IMBALANCE,
+    NEGATIVE_BALANCE_DETECTED,
+    RECONCILIATION_DURATION_MS,
+    RECONCILIATION_RUNS,
+)
+
+# pg_try_advisory_xact_lock key shared by every worker process.
+RECONCILIATION_LOCK_KEY: Final[int] = 0x6C65646772
+RECONCILIATION_THREAD_NAME: Final[str] = "ledger-worker-reconciliation"
 
 
 class ReconciliationService:
-    def __init__(self, session_factory: sessionmaker[Session]) -> None:
+    def __init__(self, session_factory: sessionmaker[Session], timeout_seconds: float | None = None) -> None:
         self.session_factory = session_factory
+        self.timeout_seconds = timeout_seconds
 
     def run_once(self) -> dict[str, int]:
         session = self.session_factory()
         try:
             with session.begin():
-                repository = DomainRepository(session)
-                imbalance = repository.ledger_imbalance()
-                negative_count = repository.negative_balance_count()
-            if imbalance != 0:
-                LEDGER_IMBALANCE.inc()
-            if negative_count > 0:
-                NEGATIVE_BALANCE_DETECTED.inc()
-            return {"imbalance": imbalance, "negative_count": negative_count}
+                self._limit_duration(session)
+                result = self._check(session)
+            return self._report(result)
         finally:
             session.close()
+
+    def run_exclusive(self) -> dict[str, int] | None:
+        # Returns None when another worker process is reconciling right now.
+        session = self.session_factory()
+        try:
+            with session.begin():
+                if not self._try_lock(session):
+                    return None
+                self._limit_duration(session)
+                result = self._check(session)
+            return self._report(result)
+        finally:
+            session.close()
+
+    def _check(self, session: Session) -> dict[str, int]:
+        repository = DomainRepository(session)
+        return {
+            "imbalance": repository.ledger_imbalance(),
+            "negative_count": repository.negative_balance_count(),
+        }
+
+    def _report(self, result: dict[str, int]) -> dict[str, int]:
+        if result["imbalance"] != 0:
+            LEDGER_IMBALANCE.inc()
+        if result["negative_count"] > 0:
+            NEGATIVE_BALANCE_DETECTED.inc()
+        return result
+
+    def _limit_duration(self, session: Session) -> None:
+        if self.timeout_seconds is None or _dialect(session) != "postgresql":
+            return
+        timeout_ms = str(max(int(self.timeout_seconds * 1000), 1))
+        session.execute(select(func.set_config("statement_timeout", timeout_ms, True)))
+
+    def _try_lock(self, session: Session) -> bool:
+        if _dialect(session) != "postgresql":
+            return True
+        return bool(session.scalar(select(func.pg_try_advisory_xact_lock(RECONCILIATION_LOCK_KEY))))
+
+
+class ReconciliationScheduler:
+    # Runs reconciliation on its own thread and connection, `interval_seconds` after the
+    # previous run ended. The aggregate scans then never stall event processing, and a
+    # slow run delays the next one instead of overlapping it.
+    def __init__(self, service: ReconciliationService, interval_seconds: float) -> None:
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=RECONCILIATION_THREAD_NAME, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_scheduled(self) -> dict[str, int] | None:
+        started = time.perf_counter()
+        try:
+            result = self.service.run_exclusive()
+        except OperationalError as exc:
+            outcome = "timeout" if isinstance(exc.orig, QueryCanceled) else "failed"
+            RECONCILIATION_RUNS.labels(outcome=outcome).inc()
+            return None
+        except Exception:
+            RECONCILIATION_RUNS.labels(outcome="failed").inc()
+            return None
+        finally:
+            RECONCILIATION_DURATION_MS.observe((time.perf_counter() - started) * 1000.0)
+        RECONCILIATION_RUNS.labels(outcome="skipped" if result is None else "completed").inc()
+        return result
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_scheduled()
+
+
+def _dialect(session: Session) -> str:
+    return session.bind.dialect.name if session.bind is not None else ""
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any, Protocol
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from ledger_worker.core.config import Settings
+from ledger_worker.telemetry.metrics import WORKER_WAKEUPS
+from shared.db.append_only import OUTBOX_CHANNEL
+
+
+class OutboxWakeup(Protocol):
+    async def wait(self, timeout_seconds: float) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class IdleBackoff:
+    # A full batch polls again at once, a partial one after the base interval, and each
+    # empty poll doubles the wait up to the cap; any work resets it.
+    def __init__(self, base_seconds: float, max_seconds: float) -> None:
+        self.base_seconds = base_seconds
+        self.max_seconds = max(max_seconds, base_seconds)
+        self._delay = base_seconds
+
+    def next_delay(self, processed: int, batch_size: int) -> float:
+        if processed >= batch_size:
+            self._delay = self.base_seconds
+            return 0.0
+        if processed > 0:
+            self._delay = self.base_seconds
+            return self.base_seconds
+        delay = self._delay
+        self._delay = min(self._delay * 2, self.max_seconds)
+        return delay
+
+
+class PollingWakeup:
+    async def wait(self, timeout_seconds: float) -> bool:
+        await asyncio.sleep(timeout_seconds)
+        if timeout_seconds > 0:
+            WORKER_WAKEUPS.labels(reason="timeout").inc()
+        return False
+
+    def close(self) -> None:
+        return None
+
+
+class NotifyWakeup:
+    # LISTENs on a dedicated autocommit connection, outside the SQLAlchemy pool. A
+    # notification ends the idle wait early. Polling remains the fallback, so a lost
+    # notification or a dropped connection only costs latency.
+    def __init__(self, conninfo: str, connect: Callable[[str], psycopg.Connection[Any]] | None = None) -> None:
+        self.conninfo = conninfo
+        self._connect = connect or _connect_autocommit
+        self._connection: psycopg.Connection[Any] | None = None
+
+    async def wait(self, timeout_seconds: float) -> bool:
+        if timeout_seconds <= 0:
+            await asyncio.sleep(0)
+            return False
+        notified = await asyncio.to_thread(self._wait, timeout_seconds)
+        WORKER_WAKEUPS.labels(reason="notify" if notified else "timeout").inc()
+        return notified
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _wait(self, timeout_seconds: float) -> bool:
+        try:
+            connection = self._listening_connection()
+            notified = any(True for _ in connection.notifies(timeout=timeout_seconds, stop_after=1))
+            if notified:
+                # One poll covers everything committed so far; drop the queued duplicates.
+                for _ in connection.notifies(timeout=0):
+                    pass
+            return notified
+        except psycopg.Error:
+            # Reconnect on the next wait; until then this wait is a plain poll interval.
+            self.close()
+            time.sleep(timeout_seconds)
+            return False
+
+    def _listening_connection(self) -> psycopg.Connection[Any]:
+        if self._connection is None:
+            connection = self._connect(self.conninfo)
+            connection.execute(f"LISTEN {OUTBOX_CHANNEL}")
+            self._connection = connection
+        return self._connection
+
+
+def _connect_autocommit(conninfo: str) -> psycopg.Connection[Any]:
+    return psycopg.connect(conninfo, autocommit=True)
+
+
+def build_wakeup(settings: Settings) -> OutboxWakeup:
+    url = make_url(settings.database_url)
+    if not settings.outbox_notify or url.get_backend_name() != "postgresql":
+        return PollingWakeup()
+    return NotifyWakeup(url.set(drivername="postgresql").render_as_string(hide_password=False))
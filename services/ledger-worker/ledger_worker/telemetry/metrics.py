@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 
 PAYMENTS_PROCESSED = Counter("payments_processed_total", "Payments processed by worker")
 OPTIMISTIC_LOCK_CONFLICT = Counter(
@@ -12,6 +12,47 @@ NEGATIVE_BALANCE_DETECTED = Counter(
     "negative_balance_detected_total", "Detected negative available/reserved balance"
 )
 INVARIANT_VIOLATION = Counter("invariant_violation_total", "Detected invariant violations")
+BATCH_APPLY_SIZE = Histogram(
+    "worker_batch_apply_size",
+    "Outbox events applied in one worker transaction",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+BATCH_APPLY_ROLLBACK = Counter(
+    "worker_batch_savepoint_rollback_total", "Events rolled back to their savepoint inside a batch"
+)
+
+WORKER_SLOTS = Gauge("worker_dispatch_slots", "Configured concurrent event slots per worker process")
+WORKER_IN_FLIGHT = Gauge("worker_in_flight_events", "Outbox events currently being processed")
+WORKER_SLOT_BUSY_SECONDS = Counter(
+    "worker_slot_busy_seconds", "Time each dispatch slot spent processing events", ["slot"]
+)
+
+WORKER_WAKEUPS = Counter(
+    "worker_wakeups", "Idle waits ended by an outbox notification or by the poll timeout", ["reason"]
+)
+
+CLAIM_BATCH_SIZE = Gauge("worker_claim_batch_size", "Outbox events requested by the latest claim")
+CLAIM_BATCH_DURATION_MS = Histogram(
+    "worker_claim_batch_duration_ms",
+    "Time from claiming an outbox batch to finishing its last event",
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000),
+)
+
+NET_SETTLEMENT_EVENTS = Counter(
+    "worker_net_settlement_events", "Hybrid events settled through a per-account net balance update"
+)
+NET_SETTLEMENT_ACCOUNT_UPDATES = Counter(
+    "worker_net_settlement_account_updates", "Account balance updates issued by net settlement"
+)
+
+RECONCILIATION_DURATION_MS = Histogram(
+    "worker_reconciliation_duration_ms",
+    "Duration of one scheduled reconciliation run",
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000),
+)
+RECONCILIATION_RUNS = Counter(
+    "worker_reconciliation_runs", "Scheduled reconciliation runs by outcome", ["outcome"]
+)
 
 
 def start_metrics_server(port: int) -> None:
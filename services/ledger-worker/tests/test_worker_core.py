@@ -1,25 +1,47 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 import json
 import os
 import sys
+import threading
+import time
 
+import psycopg
 import pytest
-from sqlalchemy import select
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import event, select
 
 from ledger_worker import main as worker_main
-from ledger_worker.core.config import Settings, load_settings
-from ledger_worker.db.session import get_session_factory
-from ledger_worker.main import process_outbox_once
+from ledger_worker.core.config import (
+    PartitionAssignment,
+    Settings,
+    load_settings,
+    parse_partition_assignment,
+)
+from ledger_worker.db.session import get_engine, get_session_factory
+from ledger_worker.main import build_processor, process_outbox_once
+from ledger_worker.repositories.domain_repository import DomainRepository
+from ledger_worker.services.batch_sizer import AdaptiveBatchSizer
+from ledger_worker.services.dispatcher import AccountOrderedDispatcher, DispatchItem
 from ledger_worker.services.failure_injector import FailureInjector
 from ledger_worker.services.processor import WorkerProcessor
-from ledger_worker.services.reconciliation import ReconciliationService
+from ledger_worker.services.reconciliation import (
+    RECONCILIATION_THREAD_NAME,
+    ReconciliationScheduler,
+    ReconciliationService,
+)
+from ledger_worker.services.wakeup import IdleBackoff, NotifyWakeup, PollingWakeup, build_wakeup
 from ledger_worker.telemetry import metrics as worker_metrics
 from ledger_worker.telemetry import otel as worker_otel
+from shared.contracts.event_codec import EventPayload, encode_event_payload
 from shared.contracts.messages import WorkerMessage
 from shared.contracts.models import (
+    AccountLockStrategy,
     ConsistencyMode,
     LedgerDirection,
     OutboxEventType,
@@ -27,6 +49,7 @@ from shared.contracts.models import (
     PaymentStatus,
 )
 from shared.db import AccountORM, LedgerEntryORM, OutboxEventORM, PaymentORM
+from shared.utils.partitions import outbox_partition_key
 
 
 def _insert_payment_with_event(
@@ -37,6 +60,7 @@ def _insert_payment_with_event(
     source_id: str = "acc-001",
     destination_id: str = "acc-002",
     traceparent: str | None = None,
+    binary: bool = False,
 ) -> str:
     payment_id = f"pay-test-{suffix}"
     payload = {
@@ -67,7 +91,14 @@ def _insert_payment_with_event(
                     aggregate_type="payment",
                     aggregate_id=payment_id,
                     event_type=event_type,
-                    payload_json=json.dumps(payload, sort_keys=True),
+                    payload_json=None if binary else json.dumps(payload, sort_keys=True),
+                    payload_bin=(
+                        encode_event_payload(
+                            EventPayload(payment_id, source_id, destination_id, amount_cents, traceparent)
+                        )
+                        if binary
+                        else None
+                    ),
                     status=OutboxStatus.PENDING.value,
                     attempts=0,
                 )
@@ -194,6 +225,38 @@ def test_eventual_rejection_due_to_funds() -> None:
         session.close()
 
 
+@pytest.mark.parametrize("strategy", ["lean", "optimistic"])
+def test_statement_level_lock_strategies_settle_and_reject(
+    monkeypatch: pytest.MonkeyPatch, strategy: str
+) -> None:
+    monkeypatch.setenv("ACCOUNT_LOCK_STRATEGY", strategy)
+    monkeypatch.setenv("CONSISTENCY_MODE", "eventual")
+    completed_id = _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, 400, suffix="lean-ok"
+    )
+    rejected_id = _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, 700, suffix="lean-nsf"
+    )
+    assert process_outbox_once(load_settings()) == 2
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-002"))
+        completed = session.scalar(select(PaymentORM).where(PaymentORM.id == completed_id))
+        rejected = session.scalar(select(PaymentORM).where(PaymentORM.id == rejected_id))
+        assert source is not None and destination is not None
+        assert completed is not None and rejected is not None
+        assert source.available_balance_cents == 600
+        assert source.version == 1
+        assert destination.available_balance_cents == 1_400
+        assert completed.status == PaymentStatus.COMPLETED.value
+        assert rejected.status == PaymentStatus.REJECTED.value
+        assert len(list(session.scalars(select(LedgerEntryORM)))) == 2
+    finally:
+        session.close()
+
+
 def test_strong_mode_marks_outbox_as_processed() -> None:
     os.environ["CONSISTENCY_MODE"] = "strong"
     _insert_payment_with_event(
@@ -398,24 +461,25 @@ def test_processing_event_is_recovered_after_timeout() -> None:
         session.close()
 
 
-def test_run_loop_executes_processing_and_reconciliation(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_run_loop_executes_processing_and_schedules_reconciliation(monkeypatch: pytest.MonkeyPatch) -> None:
     class StopLoop(Exception):
         pass
 
-    calls = {"process": 0, "reconcile": 0}
+    calls = {"process": 0, "start": 0, "stop": 0}
 
     class FakeProcessor:
+        claim_size = 20
+
         def process_available_events(self) -> int:
             calls["process"] += 1
             return 0
 
-    class FakeReconciliation:
-        def __init__(self, _factory: object) -> None:
-            pass
+    class FakeScheduler:
+        def start(self) -> None:
+            calls["start"] += 1
 
-        def run_once(self) -> dict[str, int]:
-            calls["reconcile"] += 1
-            return {"imbalance": 0, "negative_count": 0}
+        def stop(self) -> None:
+            calls["stop"] += 1
 
     async def fake_sleep(_seconds: float) -> None:
         raise StopLoop()
@@ -430,12 +494,12 @@ def test_run_loop_executes_processing_and_reconciliation(monkeypatch: pytest.Mon
         processing_timeout_seconds=30.0,
     )
     monkeypatch.setattr(worker_main, "build_processor", lambda _settings: FakeProcessor())
-    monkeypatch.setattr(worker_main, "ReconciliationService", FakeReconciliation)
+    monkeypatch.setattr(worker_main, "build_reconciliation_scheduler", lambda _settings: FakeScheduler())
     monkeypatch.setattr(asyncio, "sleep", fake_sleep)
     with pytest.raises(StopLoop):
         asyncio.run(worker_main.run_loop(settings))
-    assert calls["process"] == 1
-    assert calls["reconcile"] == 1
+    # Reconciliation runs on the scheduler's thread, never inline with processing.
+    assert calls == {"process": 1, "start": 1, "stop": 1}
 
 
 def test_main_wires_dependencies(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -485,6 +549,13 @@ def test_configure_otel_branches(monkeypatch: pytest.MonkeyPatch) -> None:
         def __init__(self, _exporter: object) -> None:
             pass
 
+        # The provider stays installed globally, so later tests start spans through it.
+        def on_start(self, _span: object, parent_context: object = None) -> None:
+            return None
+
+        def on_end(self, _span: object) -> None:
+            return None
+
         def shutdown(self) -> None:
             return None
 
@@ -497,3 +568,681 @@ def test_configure_otel_branches(monkeypatch: pytest.MonkeyPatch) -> None:
     worker_otel.configure_otel("ledger-worker-test")
     assert worker_otel._configured is True
     worker_otel._configured = False
+
+
+def test_binary_payload_events_settle_and_corrupt_payloads_go_dead() -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"
+    payment_id = _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value,
+        OutboxEventType.PAYMENT_REQUESTED.value,
+        200,
+        suffix="bin",
+        traceparent=traceparent,
+        binary=True,
+    )
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            session.add(
+                OutboxEventORM(
+                    id="evt-corrupt-binary",
+                    aggregate_type="payment",
+                    aggregate_id="pay-corrupt",
+                    event_type=OutboxEventType.PAYMENT_REQUESTED.value,
+                    payload_bin=b"\x09truncated",
+                    status=OutboxStatus.PENDING.value,
+                    attempts=0,
+                )
+            )
+    finally:
+        session.close()
+    assert process_outbox_once(load_settings()) == 2
+
+    session = get_session_factory()()
+    try:
+        payment = session.scalar(select(PaymentORM).where(PaymentORM.id == payment_id))
+        corrupt = session.scalar(select(OutboxEventORM).where(OutboxEventORM.id == "evt-corrupt-binary"))
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert payment is not None and corrupt is not None and source is not None
+        assert payment.status == PaymentStatus.COMPLETED.value
+        assert source.available_balance_cents == 800
+        assert corrupt.status == OutboxStatus.DEAD.value
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("lock_strategy", ["orm", "lean", "optimistic"])
+def test_batch_apply_commits_once_and_rolls_back_only_the_poisoned_event(
+    monkeypatch: pytest.MonkeyPatch, lock_strategy: str
+) -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["ACCOUNT_LOCK_STRATEGY"] = lock_strategy
+    os.environ["WORKER_BATCH_APPLY"] = "1"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("ACCOUNT_LOCK_STRATEGY", None)
+        os.environ.pop("WORKER_BATCH_APPLY", None)
+    for suffix, amount in (("b01", 100), ("b02", 200), ("b03", 300), ("b04", 5_000)):
+        _insert_payment_with_event(
+            PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, amount, suffix=suffix
+        )
+
+    add_ledger_entries = DomainRepository.add_ledger_entries
+
+    def poisoned(self: DomainRepository, rows: list[dict[str, object]]) -> None:
+        # Fails after the balances were already moved in this event's savepoint.
+        if rows[0]["payment_id"] == "pay-test-b02":
+            raise RuntimeError("poisoned")
+        add_ledger_entries(self, rows)
+
+    monkeypatch.setattr(DomainRepository, "add_ledger_entries", poisoned)
+    commits: list[object] = []
+
+    def count_commit(connection: object) -> None:
+        commits.append(connection)
+
+    engine = get_engine()
+    event.listen(engine, "commit", count_commit)
+    try:
+        assert build_processor(settings).process_available_events() == 4
+    finally:
+        event.remove(engine, "commit", count_commit)
+    # Claim, batch apply and the poisoned event's retry scheduling.
+    assert len(commits) == 3
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-002"))
+        statuses = {
+            payment.id: payment.status for payment in session.scalars(select(PaymentORM))
+        }
+        events = {item.id: item for item in session.scalars(select(OutboxEventORM))}
+        entries = list(session.scalars(select(LedgerEntryORM)))
+        assert source is not None and destination is not None
+        assert source.available_balance_cents == 600
+        assert destination.available_balance_cents == 1_400
+        assert statuses == {
+            "pay-test-b01": PaymentStatus.COMPLETED.value,
+            "pay-test-b02": PaymentStatus.RECEIVED.value,
+            "pay-test-b03": PaymentStatus.COMPLETED.value,
+            "pay-test-b04": PaymentStatus.REJECTED.value,
+        }
+        assert len(entries) == 4
+        assert events["evt-test-b02"].status == OutboxStatus.PENDING.value
+        assert events["evt-test-b02"].attempts == 1
+        assert events["evt-test-b03"].status == OutboxStatus.PROCESSED.value
+    finally:
+        session.close()
+
+
+def test_pipelined_claims_process_claimed_rows_without_rereading_them() -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["WORKER_PIPELINED_CLAIMS"] = "1"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("WORKER_PIPELINED_CLAIMS", None)
+    for suffix, amount in (("p01", 100), ("p02", 200), ("p03", 300)):
+        _insert_payment_with_event(
+            PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, amount, suffix=suffix
+        )
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            # A crashed worker's expired lease is reclaimed; a live lease is skipped.
+            expired = session.get(OutboxEventORM, "evt-test-p02")
+            leased = session.get(OutboxEventORM, "evt-test-p03")
+            assert expired is not None and leased is not None
+            expired.status = OutboxStatus.PROCESSING.value
+            expired.next_retry_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            leased.status = OutboxStatus.PROCESSING.value
+            leased.next_retry_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    finally:
+        session.close()
+
+    statements: list[str] = []
+
+    def capture(
+        connection: object, cursor: object, statement: str, parameters: object, context: object, executemany: bool
+    ) -> None:
+        statements.append(" ".join(statement.split()).lower())
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert build_processor(settings).process_available_events() == 2
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    outbox_reads = [sql for sql in statements if sql.startswith("select") and "outbox_events" in sql]
+    claims = [sql for sql in statements if sql.startswith("update outbox_events") and "returning" in sql]
+    assert outbox_reads == []
+    assert len(claims) == 1
+
+    session = get_session_factory()()
+    try:
+        events = {item.id: item for item in session.scalars(select(OutboxEventORM))}
+        statuses = {payment.id: payment.status for payment in session.scalars(select(PaymentORM))}
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-002"))
+        assert destination is not None
+        assert destination.available_balance_cents == 1_300
+        assert events["evt-test-p01"].status == OutboxStatus.PROCESSED.value
+        assert events["evt-test-p02"].status == OutboxStatus.PROCESSED.value
+        assert events["evt-test-p03"].status == OutboxStatus.PROCESSING.value
+        assert statuses["pay-test-p01"] == PaymentStatus.COMPLETED.value
+        assert statuses["pay-test-p03"] == PaymentStatus.RECEIVED.value
+    finally:
+        session.close()
+
+
+def test_dispatcher_runs_disjoint_accounts_concurrently_and_keeps_per_account_order() -> None:
+    guard = threading.Lock()
+    running: set[str] = set()
+    overlaps: list[tuple[str, str]] = []
+    started: list[str] = []
+    finished: list[str] = []
+    peak = {"in_flight": 0}
+
+    def task(name: str, accounts: frozenset[str], delay: float) -> DispatchItem:
+        def run() -> None:
+            with guard:
+                overlaps.extend((name, other) for other in running if accounts & item_accounts[other])
+                running.add(name)
+                started.append(name)
+                peak["in_flight"] = max(peak["in_flight"], len(running))
+            time.sleep(delay)
+            with guard:
+                running.discard(name)
+                finished.append(name)
+
+        item_accounts[name] = accounts
+        return DispatchItem(accounts, run)
+
+    item_accounts: dict[str, frozenset[str]] = {}
+    items = [
+        task("a", frozenset({"acc-1", "acc-2"}), 0.05),
+        task("b", frozenset({"acc-3", "acc-4"}), 0.05),
+        task("c", frozenset({"acc-2", "acc-5"}), 0.0),
+        task("d", frozenset({"acc-1"}), 0.0),
+        task("e", frozenset(), 0.0),
+    ]
+    busy_before = worker_metrics.WORKER_SLOT_BUSY_SECONDS.labels(slot="0")._value.get()
+    dispatcher = AccountOrderedDispatcher(concurrency=3)
+    try:
+        dispatcher.run(items)
+    finally:
+        dispatcher.shutdown()
+    assert sorted(finished) == ["a", "b", "c", "d", "e"]
+    assert overlaps == []
+    assert peak["in_flight"] >= 2
+    # Same-account events start in claim order, after their predecessor finished.
+    assert started.index("c") > finished.index("a")
+    assert started.index("d") > started.index("c")
+    assert worker_metrics.WORKER_IN_FLIGHT._value.get() == 0
+    assert worker_metrics.WORKER_SLOTS._value.get() == 3
+    assert worker_metrics.WORKER_SLOT_BUSY_SECONDS.labels(slot="0")._value.get() > busy_before
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_concurrent_worker_applies_shared_account_events_in_claim_order(pipelined: bool) -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["WORKER_CONCURRENCY"] = "4"
+    os.environ["WORKER_PIPELINED_CLAIMS"] = "1" if pipelined else "0"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("WORKER_CONCURRENCY", None)
+        os.environ.pop("WORKER_PIPELINED_CLAIMS", None)
+    # The second transfer only fits after the first one credited acc-002.
+    _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, 900, suffix="c01"
+    )
+    _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value,
+        OutboxEventType.PAYMENT_REQUESTED.value,
+        1_800,
+        suffix="c02",
+        source_id="acc-002",
+        destination_id="acc-001",
+    )
+    processor = build_processor(settings)
+    assert processor.dispatcher is not None
+    try:
+        assert processor.process_available_events() == 2
+    finally:
+        processor.dispatcher.shutdown()
+
+    session = get_session_factory()()
+    try:
+        statuses = {payment.id: payment.status for payment in session.scalars(select(PaymentORM))}
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert statuses == {
+            "pay-test-c01": PaymentStatus.COMPLETED.value,
+            "pay-test-c02": PaymentStatus.COMPLETED.value,
+        }
+        assert source.available_balance_cents == 1_900
+    finally:
+        session.close()
+
+
+def test_parse_partition_assignment() -> None:
+    assert parse_partition_assignment("") is None
+    assert parse_partition_assignment("0-3/16") == PartitionAssignment(frozenset({0, 1, 2, 3}), 16)
+    assert parse_partition_assignment("1,4-5/8") == PartitionAssignment(frozenset({1, 4, 5}), 8)
+    for invalid in ("3", "4/4", "2-x/8", "0/0"):
+        with pytest.raises(ValueError, match=WorkerMessage.INVALID_PARTITION_ASSIGNMENT.value):
+            parse_partition_assignment(invalid)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_partitioned_workers_claim_only_their_source_accounts(pipelined: bool) -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["WORKER_PIPELINED_CLAIMS"] = "1" if pipelined else "0"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("WORKER_PIPELINED_CLAIMS", None)
+    transfers = (("q01", "acc-001", "acc-002"), ("q02", "acc-002", "acc-001"), ("q03", "acc-001", "acc-002"))
+    for suffix, source_id, destination_id in transfers:
+        _insert_payment_with_event(
+            PaymentStatus.RECEIVED.value,
+            OutboxEventType.PAYMENT_REQUESTED.value,
+            100,
+            suffix=suffix,
+            source_id=source_id,
+            destination_id=destination_id,
+        )
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            for suffix, source_id, _ in transfers:
+                outbox_event = session.get(OutboxEventORM, f"evt-test-{suffix}")
+                assert outbox_event is not None
+                outbox_event.partition_key = outbox_partition_key(source_id)
+    finally:
+        session.close()
+    # acc-001 falls in partition 0 of 4 and acc-002 in partition 2.
+    low = replace(settings, outbox_partitions=parse_partition_assignment("0-1/4"))
+    high = replace(settings, outbox_partitions=parse_partition_assignment("2-3/4"))
+    assert build_processor(low).process_available_events() == 2
+    assert build_processor(low).process_available_events() == 0
+    assert build_processor(high).process_available_events() == 1
+
+    session = get_session_factory()()
+    try:
+        statuses = {item.id: item.status for item in session.scalars(select(OutboxEventORM))}
+        assert set(statuses.values()) == {OutboxStatus.PROCESSED.value}
+    finally:
+        session.close()
+
+
+# SQLite has no SELECT ... FOR UPDATE, so the default ORM strategy is only exercised
+# for this race on PostgreSQL; these two stay correct without row locks.
+@pytest.mark.parametrize("lock_strategy", [AccountLockStrategy.LEAN, AccountLockStrategy.OPTIMISTIC])
+def test_partitioned_workers_credit_a_shared_destination_consistently(
+    lock_strategy: AccountLockStrategy,
+) -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    settings = replace(load_settings(), account_lock_strategy=lock_strategy)
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            session.add(
+                AccountORM(id="acc-shared", available_balance_cents=0, reserved_balance_cents=0, version=0)
+            )
+    finally:
+        session.close()
+    transfers = [(f"s{index:02d}", ("acc-001", "acc-002")[index % 2]) for index in range(8)]
+    for suffix, source_id in transfers:
+        _insert_payment_with_event(
+            PaymentStatus.RECEIVED.value,
+            OutboxEventType.PAYMENT_REQUESTED.value,
+            50,
+            suffix=suffix,
+            source_id=source_id,
+            destination_id="acc-shared",
+        )
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            for suffix, source_id in transfers:
+                outbox_event = session.get(OutboxEventORM, f"evt-test-{suffix}")
+                assert outbox_event is not None
+                outbox_event.partition_key = outbox_partition_key(source_id)
+    finally:
+        session.close()
+    # Different partitions, same destination: only the row locks order the credits.
+    processors = [
+        build_processor(replace(settings, outbox_partitions=parse_partition_assignment(spec)))
+        for spec in ("0-1/4", "2-3/4")
+    ]
+    start = threading.Barrier(len(processors))
+    processed: list[int] = []
+
+    def drain(processor: WorkerProcessor) -> None:
+        start.wait()
+        processed.append(processor.process_available_events())
+
+    threads = [threading.Thread(target=drain, args=(processor,)) for processor in processors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(processed) == [4, 4]
+
+    session = get_session_factory()()
+    try:
+        balances = {
+            account.id: account.available_balance_cents for account in session.scalars(select(AccountORM))
+        }
+        assert balances == {"acc-001": 800, "acc-002": 800, "acc-shared": 400}
+        entries = list(session.scalars(select(LedgerEntryORM)))
+        assert len(entries) == 16
+        assert len([entry for entry in entries if entry.account_id == "acc-shared"]) == 8
+        statuses = {item.status for item in session.scalars(select(OutboxEventORM))}
+        assert statuses == {OutboxStatus.PROCESSED.value}
+    finally:
+        session.close()
+
+
+def test_main_accepts_a_partition_assignment(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: dict[str, object] = {}
+
+    async def fake_run_loop(settings: Settings) -> None:
+        captured["partitions"] = settings.outbox_partitions
+
+    monkeypatch.setattr(worker_main, "configure_otel", lambda service_name: None)
+    monkeypatch.setattr(worker_main, "start_metrics_server", lambda port: None)
+    monkeypatch.setattr(worker_main, "run_loop", fake_run_loop)
+    worker_main.main(["--partitions", "2-3/4"])
+    assert captured["partitions"] == PartitionAssignment(frozenset({2, 3}), 4)
+
+
+def test_idle_backoff_doubles_on_empty_polls_and_resets_on_work() -> None:
+    backoff = IdleBackoff(base_seconds=0.2, max_seconds=1.0)
+    assert [backoff.next_delay(0, 10) for _ in range(5)] == [0.2, 0.4, 0.8, 1.0, 1.0]
+    assert backoff.next_delay(3, 10) == 0.2
+    assert backoff.next_delay(0, 10) == 0.2
+    # A full batch means more work is likely waiting.
+    assert backoff.next_delay(10, 10) == 0.0
+    assert backoff.next_delay(0, 10) == 0.2
+
+
+def test_notify_wakeup_listens_once_and_falls_back_to_polling_on_errors() -> None:
+    class FakeConnection:
+        # Each notifies() call consumes the next scripted outcome.
+        def __init__(self, outcomes: list[list[int] | Exception]) -> None:
+            self.outcomes = outcomes
+            self.executed: list[str] = []
+            self.closed = False
+
+        def execute(self, query: str) -> None:
+            self.executed.append(query)
+
+        def notifies(self, timeout: float, stop_after: int | None = None) -> list[int]:
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        def close(self) -> None:
+            self.closed = True
+
+    connections = [
+        FakeConnection([[1], [2, 3], psycopg.OperationalError("connection lost")]),
+        FakeConnection([[], [1], []]),
+    ]
+
+    def connect(conninfo: str) -> FakeConnection:
+        assert conninfo == "postgresql://ledger:ledger@db:5432/ledgerlab"
+        return connections.pop(0)
+
+    wakeup = NotifyWakeup("postgresql://ledger:ledger@db:5432/ledgerlab", connect=connect)  # type: ignore[arg-type]
+    first, second = connections
+    assert asyncio.run(wakeup.wait(0.01)) is True
+    assert first.executed == ["LISTEN outbox_events"]
+    assert asyncio.run(wakeup.wait(0.01)) is False
+    assert first.closed is True
+    # Reconnected and listening again: a timeout, then a notification.
+    assert asyncio.run(wakeup.wait(0.01)) is False
+    assert asyncio.run(wakeup.wait(0.01)) is True
+    assert second.executed == ["LISTEN outbox_events"]
+    assert second.outcomes == []
+    wakeup.close()
+    assert second.closed is True
+
+    polling = build_wakeup(load_settings())
+    assert isinstance(polling, PollingWakeup)
+    listening = build_wakeup(
+        replace(load_settings(), database_url="postgresql+psycopg://ledger:ledger@db:5432/ledgerlab")
+    )
+    assert isinstance(listening, NotifyWakeup)
+    assert listening.conninfo == "postgresql://ledger:ledger@db:5432/ledgerlab"
+    silent = build_wakeup(
+        replace(
+            load_settings(),
+            database_url="postgresql+psycopg://ledger:ledger@db:5432/ledgerlab",
+            outbox_notify=False,
+        )
+    )
+    assert isinstance(silent, PollingWakeup)
+
+
+def test_adaptive_batch_sizer_grows_on_fast_full_batches_and_halves_on_contention() -> None:
+    sizer = AdaptiveBatchSizer(initial_size=20, max_size=70, target_seconds=1.0, lease_seconds=30.0)
+    assert sizer.observe(requested=20, claimed=20, duration_seconds=0.1, contended=0) == 40
+    assert sizer.observe(requested=40, claimed=40, duration_seconds=0.1, contended=0) == 60
+    assert sizer.observe(requested=60, claimed=60, duration_seconds=0.1, contended=0) == 70
+    # A partial batch means the backlog is drained: hold the size.
+    assert sizer.observe(requested=70, claimed=12, duration_seconds=0.1, contended=0) == 70
+    # Between half the target and the target: hold.
+    assert sizer.observe(requested=70, claimed=70, duration_seconds=0.8, contended=0) == 70
+    assert sizer.observe(requested=70, claimed=70, duration_seconds=1.5, contended=0) == 35
+    assert sizer.observe(requested=35, claimed=35, duration_seconds=0.1, contended=2) == 17
+    for _ in range(10):
+        sizer.observe(requested=sizer.size, claimed=sizer.size, duration_seconds=5.0, contended=0)
+    assert sizer.size == 1
+    # The target never exceeds a quarter of the lease.
+    assert AdaptiveBatchSizer(20, 500, target_seconds=60.0, lease_seconds=8.0).target_seconds == 2.0
+
+
+def test_processor_feeds_batch_outcomes_to_the_adaptive_sizer(monkeypatch: pytest.MonkeyPatch) -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["WORKER_ADAPTIVE_BATCH"] = "1"
+    os.environ["OUTBOX_BATCH_SIZE"] = "2"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("WORKER_ADAPTIVE_BATCH", None)
+        os.environ.pop("OUTBOX_BATCH_SIZE", None)
+    for index in range(7):
+        _insert_payment_with_event(
+            PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, 10, suffix=f"s{index:02d}"
+        )
+    processor = build_processor(settings)
+    assert processor.batch_sizer is not None
+    assert processor.claim_size == 2
+    assert processor.process_available_events() == 2
+    assert processor.claim_size == 4
+    assert worker_metrics.CLAIM_BATCH_SIZE._value.get() == 2
+    assert processor.process_available_events() == 4
+    assert processor.claim_size == 6
+    # Only one event left: a partial batch keeps the size.
+    assert processor.process_available_events() == 1
+    assert processor.claim_size == 6
+
+    # A transient failure halves it.
+    _insert_payment_with_event(
+        PaymentStatus.RECEIVED.value, OutboxEventType.PAYMENT_REQUESTED.value, 10, suffix="s99"
+    )
+
+    def failing(_session: object, _event: object) -> None:
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(processor, "_process_event", failing)
+    assert processor.process_available_events() == 1
+    assert processor.claim_size == 3
+
+
+def _set_balances(balances: dict[str, tuple[int, int]]) -> None:
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            for account_id, (available, reserved) in balances.items():
+                account = session.get(AccountORM, account_id)
+                assert account is not None
+                account.available_balance_cents = available
+                account.reserved_balance_cents = reserved
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("lock_strategy", ["orm", "lean", "optimistic"])
+def test_net_settlement_updates_each_account_once_and_defers_short_sources(lock_strategy: str) -> None:
+    os.environ["ACCOUNT_LOCK_STRATEGY"] = lock_strategy
+    os.environ["WORKER_NET_SETTLEMENT"] = "1"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("ACCOUNT_LOCK_STRATEGY", None)
+        os.environ.pop("WORKER_NET_SETTLEMENT", None)
+    _set_balances({"acc-001": (1_000, 600), "acc-002": (1_000, 50)})
+    transfers = (("n01", 100, "acc-001"), ("n02", 200, "acc-001"), ("n03", 300, "acc-001"), ("n04", 50, "acc-002"))
+    for suffix, amount, source_id in transfers:
+        destination_id = "acc-002" if source_id == "acc-001" else "acc-001"
+        _insert_payment_with_event(
+            PaymentStatus.RESERVED.value,
+            OutboxEventType.PAYMENT_RESERVED.value,
+            amount,
+            suffix=suffix,
+            source_id=source_id,
+            destination_id=destination_id,
+        )
+
+    statements: list[str] = []
+
+    def capture(
+        connection: object, cursor: object, statement: str, parameters: object, context: object, executemany: bool
+    ) -> None:
+        statements.append(" ".join(statement.split()).lower())
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert build_processor(settings).process_available_events() == 4
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert len([sql for sql in statements if sql.startswith("update accounts")]) == 2
+
+    session = get_session_factory()()
+    try:
+        accounts = {account.id: account for account in session.scalars(select(AccountORM))}
+        statuses = {payment.id: payment.status for payment in session.scalars(select(PaymentORM))}
+        entries = list(session.scalars(select(LedgerEntryORM)))
+        assert (accounts["acc-001"].available_balance_cents, accounts["acc-001"].reserved_balance_cents) == (1_050, 0)
+        assert (accounts["acc-002"].available_balance_cents, accounts["acc-002"].reserved_balance_cents) == (1_600, 0)
+        assert set(statuses.values()) == {PaymentStatus.COMPLETED.value}
+        assert len(entries) == 8
+    finally:
+        session.close()
+    assert ReconciliationService(get_session_factory()).run_once() == {"imbalance": 0, "negative_count": 0}
+
+    # acc-002 reserved less than its events claim: acc-001 is still netted, acc-002's
+    # events fall back to the per-event path, which settles one and dead-letters the other.
+    _set_balances({"acc-001": (1_000, 40), "acc-002": (1_000, 100)})
+    for suffix, amount, source_id in (("n05", 40, "acc-001"), ("n06", 80, "acc-002"), ("n07", 70, "acc-002")):
+        destination_id = "acc-002" if source_id == "acc-001" else "acc-001"
+        _insert_payment_with_event(
+            PaymentStatus.RESERVED.value,
+            OutboxEventType.PAYMENT_RESERVED.value,
+            amount,
+            suffix=suffix,
+            source_id=source_id,
+            destination_id=destination_id,
+        )
+    assert build_processor(settings).process_available_events() == 3
+
+    session = get_session_factory()()
+    try:
+        accounts = {account.id: account for account in session.scalars(select(AccountORM))}
+        statuses = {payment.id: payment.status for payment in session.scalars(select(PaymentORM))}
+        events = {item.id: item for item in session.scalars(select(OutboxEventORM))}
+        assert (accounts["acc-001"].available_balance_cents, accounts["acc-001"].reserved_balance_cents) == (1_080, 0)
+        assert (accounts["acc-002"].available_balance_cents, accounts["acc-002"].reserved_balance_cents) == (1_040, 20)
+        assert statuses["pay-test-n05"] == PaymentStatus.COMPLETED.value
+        assert statuses["pay-test-n06"] == PaymentStatus.COMPLETED.value
+        assert events["evt-test-n07"].status == OutboxStatus.DEAD.value
+    finally:
+        session.close()
+
+
+def test_reconciliation_scheduler_runs_on_its_own_thread_and_records_outcomes() -> None:
+    runs = worker_metrics.RECONCILIATION_RUNS
+    duration = worker_metrics.RECONCILIATION_DURATION_MS
+    completed_before = runs.labels(outcome="completed")._value.get()
+    failed_before = runs.labels(outcome="failed")._value.get()
+    observed_before = duration._sum.get()
+
+    scheduler = ReconciliationScheduler(ReconciliationService(get_session_factory(), timeout_seconds=1.0), 60.0)
+    assert scheduler.run_scheduled() == {"imbalance": 0, "negative_count": 0}
+    assert runs.labels(outcome="completed")._value.get() == completed_before + 1
+    assert duration._sum.get() > observed_before
+
+    class FailingService(ReconciliationService):
+        def run_exclusive(self) -> dict[str, int] | None:
+            raise RuntimeError("scan failed")
+
+    assert ReconciliationScheduler(FailingService(get_session_factory()), 60.0).run_scheduled() is None
+    assert runs.labels(outcome="failed")._value.get() == failed_before + 1
+
+    ran_on: list[str] = []
+    ran = threading.Event()
+
+    class RecordingService(ReconciliationService):
+        def run_exclusive(self) -> dict[str, int] | None:
+            ran_on.append(threading.current_thread().name)
+            ran.set()
+            return None
+
+    background = ReconciliationScheduler(RecordingService(get_session_factory()), 0.01)
+    background.start()
+    try:
+        assert ran.wait(timeout=5)
+    finally:
+        background.stop()
+    count = len(ran_on)
+    time.sleep(0.05)
+    assert len(ran_on) == count
+    assert set(ran_on) == {RECONCILIATION_THREAD_NAME}
+
+
+def test_net_settlement_continues_each_payment_trace() -> None:
+    os.environ["WORKER_NET_SETTLEMENT"] = "1"
+    try:
+        settings = load_settings()
+    finally:
+        os.environ.pop("WORKER_NET_SETTLEMENT", None)
+    _set_balances({"acc-001": (1_000, 300)})
+    trace_ids = ["4bf92f3577b34da6a3ce929d0e0e4736", "0af7651916cd43dd8448eb211c80319c"]
+    for suffix, trace_id in zip(("t01", "t02"), trace_ids, strict=True):
+        _insert_payment_with_event(
+            PaymentStatus.RESERVED.value,
+            OutboxEventType.PAYMENT_RESERVED.value,
+            150,
+            suffix=suffix,
+            traceparent=f"00-{trace_id}-00f067aa0ba902b7-01",
+        )
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    processor = build_processor(settings)
+    processor.tracer = provider.get_tracer("test")
+    assert processor.process_available_events() == 2
+
+    spans = [span for span in exporter.get_finished_spans() if span.name == "worker.process_event"]
+    assert sorted(f"{span.context.trace_id:032x}" for span in spans) == sorted(trace_ids)
+    assert all(span.parent is not None and span.parent.span_id == 0x00F067AA0BA902B7 for span in spans)
+    assert all(span.attributes is not None and span.attributes["worker.net_settlement"] for span in spans)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
+from functools import lru_cache
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from payments_api.core.config import Settings, load_settings
-from payments_api.db.session import get_session
+from payments_api.db.session import get_async_session, get_session, get_session_factory
+from payments_api.repositories.idempotency_cache import IdempotencyCache
+from payments_api.repositories.outbox_repository import OutboxRepository
+from payments_api.use_cases.account_serializer import AccountSerializer, AsyncAccountSerializer
+from payments_api.use_cases.admission_control import AdmissionController
+from payments_api.use_cases.group_commit import StrongGroupCommitter
+from shared.contracts.models import ConsistencyMode
+from shared.utils.backoff import RetryPolicy
 
 
 def get_settings() -> Settings:
@@ -14,3 +23,75 @@ def get_settings() -> Settings:
 
 def db_session() -> Iterator[Session]:
     yield from get_session()
+
+
+async def async_db_session() -> AsyncIterator[AsyncSession]:
+    async for session in get_async_session():
+        yield session
+
+
+@lru_cache(maxsize=1)
+def get_idempotency_cache() -> IdempotencyCache | None:
+    settings = load_settings()
+    if settings.idempotency_cache_size <= 0:
+        return None
+    return IdempotencyCache(max_entries=settings.idempotency_cache_size)
+
+
+def get_conflict_retry_policy() -> RetryPolicy:
+    settings = load_settings()
+    return RetryPolicy(
+        max_attempts=settings.occ_max_attempts,
+        base_delay_seconds=settings.occ_backoff_base_ms / 1000.0,
+    )
+
+
+def outbox_backlog() -> int:
+    session = get_session_factory()()
+    try:
+        return OutboxRepository(session).pending_count()
+    finally:
+        session.close()
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController | None:
+    settings = load_settings()
+    # Strong mode settles inline and writes no outbox rows, so there is no backlog to shed on.
+    if not settings.admission_control_enabled or settings.consistency_mode is ConsistencyMode.STRONG:
+        return None
+    controller = AdmissionController(
+        backlog_source=outbox_backlog,
+        delay_backlog=settings.admission_delay_backlog,
+        shed_backlog=settings.admission_shed_backlog,
+        max_delay_seconds=settings.admission_max_delay_ms / 1000.0,
+        refresh_interval_seconds=settings.admission_refresh_ms / 1000.0,
+    )
+    controller.start()
+    return controller
+
+
+@lru_cache(maxsize=1)
+def get_account_serializer() -> AccountSerializer | None:
+    settings = load_settings()
+    if not settings.account_serialization:
+        return None
+    return AccountSerializer(max_waiters=settings.account_serialization_max_waiters)
+
+
+@lru_cache(maxsize=1)
+def get_async_account_serializer() -> AsyncAccountSerializer | None:
+    return AsyncAccountSerializer() if load_settings().account_serialization else None
+
+
+@lru_cache(maxsize=1)
+def get_group_committer() -> StrongGroupCommitter:
+    settings = load_settings()
+    return StrongGroupCommitter(
+        session_factory=lambda: get_session_factory()(),
+        window_seconds=settings.group_commit_window_ms / 1000.0,
+        max_batch=settings.group_commit_max_batch,
+        idempotency_cache=get_idempotency_cache(),
+        lock_strategy=settings.account_lock_strategy,
+        conflict_retry=get_conflict_retry_policy(),
+    )
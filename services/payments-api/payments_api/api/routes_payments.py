@@ -1,40 +1,143 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import time
 
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from payments_api.api.dependencies import db_session, get_settings
+from payments_api.api.dependencies import (
+    async_db_session,
+    db_session,
+    get_account_serializer,
+    get_admission_controller,
+    get_async_account_serializer,
+    get_conflict_retry_policy,
+    get_group_committer,
+    get_idempotency_cache,
+    get_settings,
+)
 from payments_api.core.config import Settings
 from payments_api.core.errors import DomainError
 from payments_api.telemetry.metrics import PAYMENTS_RECEIVED, REQUEST_LATENCY_MS
 from payments_api.use_cases.create_payment import CreatePaymentUseCase
-from shared.contracts.models import ApiErrorResponse, CreatePaymentRequest, PaymentResponse
+from payments_api.use_cases.create_payment_async import AsyncCreatePaymentUseCase
+from shared.contracts.models import (
+    ApiErrorResponse,
+    ConsistencyMode,
+    CreatePaymentRequest,
+    PaymentResponse,
+)
+
+PAYMENT_ERROR_RESPONSES: dict[int | str, dict[str, object]] = {
+    409: {"model": ApiErrorResponse},
+    422: {"model": ApiErrorResponse},
+    429: {"model": ApiErrorResponse},
+    503: {"model": ApiErrorResponse},
+}
 
 router = APIRouter(prefix="/v1", tags=["payments"])
+async_router = APIRouter(prefix="/v1", tags=["payments"])
 
 
-@router.post(
-    "/payments",
-    response_model=PaymentResponse,
-    responses={409: {"model": ApiErrorResponse}, 422: {"model": ApiErrorResponse}, 503: {"model": ApiErrorResponse}},
-)
+def domain_error_response(exc: DomainError) -> JSONResponse:
+    payload = ApiErrorResponse(error_code=exc.error_code, message=exc.message).model_dump()
+    headers = None
+    if exc.retry_after_seconds is not None:
+        headers = {"Retry-After": str(exc.retry_after_seconds)}
+    return JSONResponse(status_code=exc.http_status, content=payload, headers=headers)
+
+
+def admission_delay_seconds() -> float:
+    controller = get_admission_controller()
+    return controller.admit() if controller is not None else 0.0
+
+
+def uses_group_commit(settings: Settings) -> bool:
+    return settings.group_commit_enabled and settings.consistency_mode is ConsistencyMode.STRONG
+
+
+def account_pair(request_body: CreatePaymentRequest) -> tuple[str, str]:
+    return request_body.source_account_id, request_body.destination_account_id
+
+
+def serialized(request_body: CreatePaymentRequest) -> contextlib.AbstractContextManager[None]:
+    serializer = get_account_serializer()
+    if serializer is None:
+        return contextlib.nullcontext()
+    return serializer.hold(account_pair(request_body))
+
+
+def serialized_async(request_body: CreatePaymentRequest) -> contextlib.AbstractAsyncContextManager[None]:
+    serializer = get_async_account_serializer()
+    if serializer is None:
+        return contextlib.nullcontext()
+    return serializer.hold(account_pair(request_body))
+
+
+@router.post("/payments", response_model=PaymentResponse, responses=PAYMENT_ERROR_RESPONSES)
 def create_payment(
     request_body: CreatePaymentRequest,
     request: Request,
     session: Session = Depends(db_session),
     settings: Settings = Depends(get_settings),
-) -> PaymentResponse | JSONResponse:
+) -> PaymentResponse | Response:
+    PAYMENTS_RECEIVED.inc()
+    started = time.perf_counter()
+    use_case = CreatePaymentUseCase(
+        session=session,
+        mode=settings.consistency_mode,
+        idempotency_cache=get_idempotency_cache(),
+        lock_strategy=settings.account_lock_strategy,
+        conflict_retry=get_conflict_retry_policy(),
+    )
+    try:
+        delay = admission_delay_seconds()
+        if delay:
+            time.sleep(delay)
+        if uses_group_commit(settings):
+            return get_group_committer().submit(request_body)
+        with serialized(request_body):
+            payload = use_case.execute_raw(request_body, request.headers.get("traceparent"))
+        return Response(content=payload, media_type="application/json")
+    except DomainError as exc:
+        return domain_error_response(exc)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        REQUEST_LATENCY_MS.observe(elapsed_ms)
+
+
+@async_router.post("/payments", response_model=PaymentResponse, responses=PAYMENT_ERROR_RESPONSES)
+async def create_payment_async(
+    request_body: CreatePaymentRequest,
+    request: Request,
+    session: AsyncSession = Depends(async_db_session),
+    settings: Settings = Depends(get_settings),
+) -> PaymentResponse | Response:
     PAYMENTS_RECEIVED.inc()
     started = time.perf_counter()
-    use_case = CreatePaymentUseCase(session=session, mode=settings.consistency_mode)
+    use_case = AsyncCreatePaymentUseCase(
+        session=session,
+        mode=settings.consistency_mode,
+        idempotency_cache=get_idempotency_cache(),
+        lock_strategy=settings.account_lock_strategy,
+        conflict_retry=get_conflict_retry_policy(),
+    )
     try:
-        return use_case.execute(request_body, request.headers.get("traceparent"))
+        delay = admission_delay_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        if uses_group_commit(settings):
+            return await run_in_threadpool(get_group_committer().submit, request_body)
+        async with serialized_async(request_body):
+            payload = await use_case.execute_raw(request_body, request.headers.get("traceparent"))
+        return Response(content=payload, media_type="application/json")
     except DomainError as exc:
-        payload = ApiErrorResponse(error_code=exc.error_code, message=exc.message).model_dump()
-        return JSONResponse(status_code=exc.http_status, content=payload)
+        return domain_error_response(exc)
     finally:
         elapsed_ms = (time.perf_counter() - started) * 1000.0
         REQUEST_LATENCY_MS.observe(elapsed_ms)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from payments_api.api.dependencies import (
+    db_session,
+    get_conflict_retry_policy,
+    get_idempotency_cache,
+    get_settings,
+)
+from payments_api.api.routes_payments import (
+    PAYMENT_ERROR_RESPONSES,
+    admission_delay_seconds,
+    domain_error_response,
+)
+from payments_api.core.config import Settings
+from payments_api.core.errors import DomainError
+from payments_api.telemetry.metrics import BATCH_REQUEST_LATENCY_MS, BATCH_SIZE, PAYMENTS_RECEIVED
+from payments_api.use_cases.create_payment_batch import BatchItemResult, CreatePaymentBatchUseCase
+from shared.contracts.models import (
+    ApiErrorResponse,
+    BatchItemOutcome,
+    CreatePaymentBatchRequest,
+    CreatePaymentBatchResponse,
+    PaymentBatchItemResult,
+)
+
+router = APIRouter(prefix="/v1", tags=["payments"])
+
+
+def to_batch_item_result(result: BatchItemResult) -> PaymentBatchItemResult:
+    key = result.request.idempotency_key
+    if result.error is not None:
+        error = ApiErrorResponse(error_code=result.error.error_code, message=result.error.message)
+        return PaymentBatchItemResult(idempotency_key=key, outcome=BatchItemOutcome.REJECTED, error=error)
+    outcome = BatchItemOutcome.REPLAYED if result.replayed else BatchItemOutcome.CREATED
+    return PaymentBatchItemResult(idempotency_key=key, outcome=outcome, payment=result.response)
+
+
+@router.post(
+    "/payments:batch", response_model=CreatePaymentBatchResponse, responses=PAYMENT_ERROR_RESPONSES
+)
+def create_payment_batch(
+    request_body: CreatePaymentBatchRequest,
+    request: Request,
+    session: Session = Depends(db_session),
+    settings: Settings = Depends(get_settings),
+) -> CreatePaymentBatchResponse | JSONResponse:
+    PAYMENTS_RECEIVED.inc(len(request_body.items))
+    BATCH_SIZE.observe(len(request_body.items))
+    started = time.perf_counter()
+    use_case = CreatePaymentBatchUseCase(
+        session=session,
+        mode=settings.consistency_mode,
+        max_items=settings.batch_max_items,
+        idempotency_cache=get_idempotency_cache(),
+        lock_strategy=settings.account_lock_strategy,
+        conflict_retry=get_conflict_retry_policy(),
+    )
+    try:
+        delay = admission_delay_seconds()
+        if delay:
+            time.sleep(delay)
+        results = use_case.execute(request_body.items, request.headers.get("traceparent"))
+        return CreatePaymentBatchResponse(results=[to_batch_item_result(item) for item in results])
+    except DomainError as exc:
+        return domain_error_response(exc)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        BATCH_REQUEST_LATENCY_MS.observe(elapsed_ms)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+from payments_api.api.dependencies import (
+    get_conflict_retry_policy,
+    get_idempotency_cache,
+    get_settings,
+)
+from payments_api.api.routes_payments import (
+    PAYMENT_ERROR_RESPONSES,
+    admission_delay_seconds,
+    domain_error_response,
+)
+from payments_api.api.routes_payments_batch import to_batch_item_result
+from payments_api.core.config import Settings
+from payments_api.core.errors import DomainError
+from payments_api.db.session import get_session_factory
+from payments_api.telemetry.metrics import IMPORT_CHUNK_MS, IMPORT_LINES, PAYMENTS_RECEIVED
+from payments_api.use_cases.create_payment_batch import CreatePaymentBatchUseCase
+from payments_api.use_cases.payment_import import (
+    ImportedLine,
+    ImportFormat,
+    LineParser,
+    PaymentImportUseCase,
+    import_format,
+    iter_text_lines,
+)
+from shared.contracts.models import ApiErrorResponse, BatchItemOutcome, PaymentImportLineResult
+
+router = APIRouter(prefix="/v1", tags=["payments"])
+
+IMPORT_MEDIA_TYPE = "application/x-ndjson"
+
+
+class ImportStreamingResponse(StreamingResponse):
+    # StreamingResponse on ASGI spec < 2.4 reads `receive` for http.disconnect while it
+    # streams, which would swallow the request body the import is still consuming. Here
+    # the body reader is the only consumer and surfaces the disconnect itself.
+    # stream_response is not a documented hook, which is why pyproject pins Starlette.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect() from None
+        if self.background is not None:
+            await self.background()
+
+
+def to_import_line_result(line: ImportedLine) -> PaymentImportLineResult:
+    if line.error is not None:
+        error = ApiErrorResponse(error_code=line.error.error_code, message=line.error.message)
+        return PaymentImportLineResult(
+            line=line.number,
+            idempotency_key=line.idempotency_key,
+            outcome=BatchItemOutcome.REJECTED,
+            error=error,
+        )
+    if line.result is None:
+        raise ValueError(f"import line {line.number} was not applied")
+    item = to_batch_item_result(line.result)
+    return PaymentImportLineResult(
+        line=line.number,
+        idempotency_key=item.idempotency_key,
+        outcome=item.outcome,
+        payment=item.payment,
+        error=item.error,
+    )
+
+
+async def apply_chunk(
+    use_case: PaymentImportUseCase, lines: list[ImportedLine], traceparent: str | None
+) -> bytes:
+    PAYMENTS_RECEIVED.inc(len([line for line in lines if line.request is not None]))
+    started = time.perf_counter()
+    try:
+        delay = admission_delay_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        applied = await run_in_threadpool(use_case.apply_chunk, lines, traceparent)
+    except DomainError as exc:
+        applied = use_case.fail_chunk(lines, exc)
+    IMPORT_CHUNK_MS.observe((time.perf_counter() - started) * 1000.0)
+    results = [to_import_line_result(line) for line in applied]
+    for result in results:
+        IMPORT_LINES.labels(outcome=result.outcome.value).inc()
+    return b"".join(result.model_dump_json().encode() + b"\n" for result in results)
+
+
+async def stream_import(
+    request: Request, body_format: ImportFormat, settings: Settings
+) -> AsyncIterator[bytes]:
+    # The session lives for the whole stream and is used from one threadpool call at a
+    # time; memory is bounded by one chunk of parsed lines and their results.
+    session = get_session_factory()()
+    use_case = PaymentImportUseCase(
+        CreatePaymentBatchUseCase(
+            session=session,
+            mode=settings.consistency_mode,
+            max_items=settings.import_chunk_size,
+            idempotency_cache=get_idempotency_cache(),
+            lock_strategy=settings.account_lock_strategy,
+            conflict_retry=get_conflict_retry_policy(),
+        )
+    )
+    parser = LineParser(body_format)
+    traceparent = request.headers.get("traceparent")
+    chunk: list[ImportedLine] = []
+    try:
+        async for number, text in iter_text_lines(request.stream()):
+            line = parser.parse(number, text)
+            if line is None:
+                continue
+            chunk.append(line)
+            if len(chunk) >= settings.import_chunk_size:
+                yield await apply_chunk(use_case, chunk, traceparent)
+                chunk = []
+        if chunk:
+            yield await apply_chunk(use_case, chunk, traceparent)
+    finally:
+        await run_in_threadpool(session.close)
+
+
+@router.post("/payments:import", responses=PAYMENT_ERROR_RESPONSES)
+async def import_payments(request: Request, settings: Settings = Depends(get_settings)) -> Response:
+    try:
+        body_format = import_format(request.headers.get("content-type"))
+    except DomainError as exc:
+        return domain_error_response(exc)
+    return ImportStreamingResponse(
+        stream_import(request, body_format, settings), media_type=IMPORT_MEDIA_TYPE
+    )
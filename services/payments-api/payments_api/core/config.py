@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from enum import Enum
 
-from shared.contracts.models import ConsistencyMode
+from shared.contracts.models import AccountLockStrategy, ConsistencyMode, OutboxPayloadFormat
 
 
 def _build_postgres_url() -> str:
@@ -15,14 +16,76 @@ def _build_postgres_url() -> str:
     return f"postgresql+psycopg://{user}:{password}@{host}:{port}/{database}"
 
 
+class IntakeMode(str, Enum):
+    SYNC = "sync"
+    ASYNC = "async"
+
+
 @dataclass(frozen=True)
 class Settings:
     database_url: str
     consistency_mode: ConsistencyMode
+    intake_mode: IntakeMode = IntakeMode.SYNC
+    batch_max_items: int = 500
+    import_chunk_size: int = 500
+    group_commit_enabled: bool = False
+    group_commit_window_ms: float = 2.0
+    group_commit_max_batch: int = 64
+    idempotency_cache_size: int = 10_000
+    account_lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM
+    occ_max_attempts: int = 5
+    occ_backoff_base_ms: float = 2.0
+    idempotency_retention_days: int = 0
+    idempotency_partitions_ahead: int = 3
+    idempotency_prune_interval_seconds: float = 3600.0
+    outbox_payload_format: OutboxPayloadFormat = OutboxPayloadFormat.JSON
+    outbox_notify: bool = True
+    admission_control_enabled: bool = False
+    admission_delay_backlog: int = 2_000
+    admission_shed_backlog: int = 5_000
+    admission_max_delay_ms: float = 50.0
+    admission_refresh_ms: float = 250.0
+    account_serialization: bool = False
+    account_serialization_max_waiters: int = 8
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
 
 
 def load_settings() -> Settings:
     raw_mode = os.getenv("CONSISTENCY_MODE", ConsistencyMode.HYBRID.value)
     mode = ConsistencyMode(raw_mode)
     database_url = os.getenv("DATABASE_URL", _build_postgres_url())
-    return Settings(database_url=database_url, consistency_mode=mode)
+    intake_mode = IntakeMode(os.getenv("PAYMENTS_INTAKE_MODE", IntakeMode.SYNC.value))
+    batch_max_items = int(os.getenv("PAYMENTS_BATCH_MAX_ITEMS", "500"))
+    return Settings(
+        database_url=database_url,
+        consistency_mode=mode,
+        intake_mode=intake_mode,
+        batch_max_items=batch_max_items,
+        import_chunk_size=int(os.getenv("PAYMENTS_IMPORT_CHUNK_SIZE", "500")),
+        group_commit_enabled=os.getenv("STRONG_GROUP_COMMIT", "0") == "1",
+        group_commit_window_ms=float(os.getenv("GROUP_COMMIT_WINDOW_MS", "2")),
+        group_commit_max_batch=int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64")),
+        idempotency_cache_size=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+        account_lock_strategy=AccountLockStrategy(
+            os.getenv("ACCOUNT_LOCK_STRATEGY", AccountLockStrategy.ORM.value)
+        ),
+        occ_max_attempts=int(os.getenv("OCC_MAX_ATTEMPTS", "5")),
+        occ_backoff_base_ms=float(os.getenv("OCC_BACKOFF_BASE_MS", "2")),
+        idempotency_retention_days=int(os.getenv("IDEMPOTENCY_RETENTION_DAYS", "0")),
+        idempotency_partitions_ahead=int(os.getenv("IDEMPOTENCY_PARTITIONS_AHEAD", "3")),
+        idempotency_prune_interval_seconds=float(os.getenv("IDEMPOTENCY_PRUNE_INTERVAL_SECONDS", "3600")),
+        outbox_payload_format=OutboxPayloadFormat(
+            os.getenv("OUTBOX_PAYLOAD_FORMAT", OutboxPayloadFormat.JSON.value)
+        ),
+        outbox_notify=os.getenv("OUTBOX_NOTIFY", "1") == "1",
+        admission_control_enabled=os.getenv("ADMISSION_CONTROL", "0") == "1",
+        admission_delay_backlog=int(os.getenv("ADMISSION_DELAY_BACKLOG", "2000")),
+        admission_shed_backlog=int(os.getenv("ADMISSION_SHED_BACKLOG", "5000")),
+        admission_max_delay_ms=float(os.getenv("ADMISSION_MAX_DELAY_MS", "50")),
+        admission_refresh_ms=float(os.getenv("ADMISSION_REFRESH_MS", "250")),
+        account_serialization=os.getenv("ACCOUNT_SERIALIZATION", "0") == "1",
+        account_serialization_max_waiters=int(os.getenv("ACCOUNT_SERIALIZATION_MAX_WAITERS", "8")),
+        db_pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
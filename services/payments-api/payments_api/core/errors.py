@@ -10,3 +10,9 @@ class DomainError(Exception):
     error_code: ErrorCode
     message: str
     http_status: int
+    retry_after_seconds: int | None = None
+
+
+@dataclass
+class OptimisticLockConflict(Exception):
+    account_id: str
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from psycopg.errors import LockNotAvailable
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from payments_api.core.config import Settings, load_settings
+from payments_api.db.session import get_engine
+from payments_api.telemetry.metrics import (
+    IDEMPOTENCY_PARTITIONS,
+    IDEMPOTENCY_PRUNE_DURATION_MS,
+    IDEMPOTENCY_PRUNE_FAILURES,
+    IDEMPOTENCY_PRUNE_LOCK_SKIPS,
+    IDEMPOTENCY_PRUNED_PARTITIONS,
+    IDEMPOTENCY_PRUNED_ROWS,
+    IDEMPOTENCY_TABLE_BYTES,
+)
+from shared.db import IdempotencyKeyORM
+from shared.db.orm_models import utc_now
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = IdempotencyKeyORM.__tablename__
+PARTITION_PREFIX = f"{TABLE_NAME}_p"
+# Catches rows whose day partition was never created, so a stalled pruning job cannot
+# make payment inserts fail with "no partition of relation found for row".
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+# Arbitrary application-wide key so only one replica prunes at a time.
+PRUNE_LOCK_ID = 7_310_001
+# Partition DDL takes an ACCESS EXCLUSIVE lock on idempotency_keys. Queued behind an open
+# claim, it would block every later idempotency read, so it gives up quickly instead.
+DDL_LOCK_TIMEOUT_MS = 200
+
+# Postgres requires the partition column in every unique constraint, so the primary key
+# becomes (key, created_at); key-level uniqueness is enforced by the claim's advisory lock.
+PARTITIONED_TABLE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    key VARCHAR(128) NOT NULL,
+    request_hash VARCHAR(64) NOT NULL,
+    response_payload_json TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (key, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+
+@dataclass(frozen=True)
+class PruneResult:
+    created_partitions: int = 0
+    dropped_partitions: int = 0
+    deleted_rows: int = 0
+    skipped_partitions: int = 0
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> date | None:
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX) :], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def create_partitioned_table(connection: Connection) -> None:
+    connection.execute(text(PARTITIONED_TABLE_DDL))
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"))
+
+
+def ensure_partitions(connection: Connection, first_day: date, days_ahead: int) -> int:
+    existing = set(list_partitions(connection))
+    if DEFAULT_PARTITION not in existing:
+        # Schemas created before the default partition existed get it on the next pass.
+        connection.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT")
+        )
+    created = 0
+    for offset in range(days_ahead + 1):
+        day = first_day + timedelta(days=offset)
+        name = partition_name(day)
+        if name in existing or _default_holds_day(connection, day):
+            continue
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE_NAME} "
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            )
+        )
+        created += 1
+    return created
+
+
+def _default_holds_day(connection: Connection, day: date) -> bool:
+    # Postgres refuses a new partition whose range already has rows in the default one;
+    # such a day stays in the default partition until it expires.
+    row = connection.execute(
+        text(
+            f"SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end LIMIT 1"
+        ),
+        {"start": day, "end": day + timedelta(days=1)},
+    ).first()
+    return row is not None
+
+
+def list_partitions(connection: Connection) -> list[str]:
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass) ORDER BY child.relname"
+        ),
+        {"table": TABLE_NAME},
+    )
+    return [str(row[0]) for row in rows]
+
+
+def is_partitioned(connection: Connection) -> bool:
+    row = connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": TABLE_NAME},
+    ).first()
+    return row is not None
+
+
+def table_size_bytes(connection: Connection) -> int:
+    size = connection.execute(
+        text(
+            "SELECT pg_total_relation_size(CAST(:table AS regclass)) + COALESCE(("
+            "SELECT SUM(pg_total_relation_size(inhrelid)) FROM pg_inherits "
+            "WHERE inhparent = CAST(:table AS regclass)), 0)"
+        ),
+        {"table": TABLE_NAME},
+    ).scalar_one()
+    return int(size)
+
+
+class IdempotencyPruner:
+    def __init__(self, engine: Engine, retention_days: int, partitions_ahead: int) -> None:
+        self.engine = engine
+        self.retention_days = retention_days
+        self.partitions_ahead = partitions_ahead
+
+    def run_once(self, now: datetime | None = None) -> PruneResult:
+        if self.retention_days <= 0:
+            return PruneResult()
+        now = now or utc_now()
+        started = time.perf_counter()
+        try:
+            with self.engine.begin() as connection:
+                if connection.dialect.name == "postgresql":
+                    return self._prune_postgres(connection, now)
+                return self._delete_expired_rows(connection, now)
+        finally:
+            IDEMPOTENCY_PRUNE_DURATION_MS.observe((time.perf_counter() - started) * 1000.0)
+
+    def _prune_postgres(self, connection: Connection, now: datetime) -> PruneResult:
+        locked = connection.execute(
+            select(func.pg_try_advisory_xact_lock(PRUNE_LOCK_ID))
+        ).scalar_one()
+        if not locked:
+            return PruneResult()
+        if not is_partitioned(connection):
+            result = self._delete_expired_rows(connection, now)
+            IDEMPOTENCY_TABLE_BYTES.set(table_size_bytes(connection))
+            return result
+
+        # Rows that landed in the default partition expire row by row. This runs before
+        # the DDL below, whose parent-table lock is held until the pass commits.
+        deleted = 0
+        if DEFAULT_PARTITION in list_partitions(connection):
+            deleted = connection.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+                {"cutoff": now - timedelta(days=self.retention_days)},
+            ).rowcount or 0
+        connection.execute(select(func.set_config("lock_timeout", str(DDL_LOCK_TIMEOUT_MS), True)))
+        created = 0
+        try:
+            with connection.begin_nested():
+                created = ensure_partitions(connection, now.date(), self.partitions_ahead)
+        except OperationalError as exc:
+            # Upcoming days already fall into the default partition; retry next pass.
+            if not _lock_not_available(exc):
+                raise
+            IDEMPOTENCY_PRUNE_LOCK_SKIPS.inc()
+        # A partition for day D holds keys created in [D, D + 1); it expires once D + 1 is
+        # older than the retention window, so the whole table is dropped at once.
+        cutoff = now.date() - timedelta(days=self.retention_days)
+        dropped = 0
+        skipped = 0
+        remaining = 0
+        for name in list_partitions(connection):
+            day = partition_day(name)
+            if day is None:
+                continue
+            if day + timedelta(days=1) > cutoff:
+                remaining += 1
+            elif _drop_partition(connection, name):
+                dropped += 1
+            else:
+                skipped += 1
+                remaining += 1
+        IDEMPOTENCY_PRUNED_PARTITIONS.inc(dropped)
+        IDEMPOTENCY_PRUNED_ROWS.inc(deleted)
+        IDEMPOTENCY_PARTITIONS.set(remaining)
+        IDEMPOTENCY_TABLE_BYTES.set(table_size_bytes(connection))
+        return PruneResult(
+            created_partitions=created,
+            dropped_partitions=dropped,
+            deleted_rows=deleted,
+            skipped_partitions=skipped,
+        )
+
+    def _delete_expired_rows(self, connection: Connection, now: datetime) -> PruneResult:
+        cutoff = now - timedelta(days=self.retention_days)
+        statement = delete(IdempotencyKeyORM).where(IdempotencyKeyORM.created_at < cutoff)
+        deleted = connection.execute(statement).rowcount or 0
+        IDEMPOTENCY_PRUNED_ROWS.inc(deleted)
+        return PruneResult(deleted_rows=deleted)
+
+
+def _drop_partition(connection: Connection, name: str) -> bool:
+    # Runs under the pass's short lock_timeout; a drop that would queue behind an open
+    # claim transaction is skipped and retried on the next pass.
+    try:
+        with connection.begin_nested():
+            connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    except OperationalError as exc:
+        if not _lock_not_available(exc):
+            raise
+        IDEMPOTENCY_PRUNE_LOCK_SKIPS.inc()
+        return False
+    return True
+
+
+def _lock_not_available(exc: OperationalError) -> bool:
+    return isinstance(exc.orig, LockNotAvailable)
+
+
+def build_pruner(settings: Settings | None = None) -> IdempotencyPruner:
+    settings = settings or load_settings()
+    return IdempotencyPruner(
+        engine=get_engine(),
+        retention_days=settings.idempotency_retention_days,
+        partitions_ahead=settings.idempotency_partitions_ahead,
+    )
+
+
+async def run_pruning_loop(pruner: IdempotencyPruner, interval_seconds: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(pruner.run_once)
+        except Exception:
+            # Retention is housekeeping; a failed pass is retried on the next interval.
+            IDEMPOTENCY_PRUNE_FAILURES.inc()
+            logger.exception("idempotency retention pass failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def main() -> None:
+    result = build_pruner().run_once()
+    print(
+        f"created_partitions={result.created_partitions} "
+        f"dropped_partitions={result.dropped_partitions} deleted_rows={result.deleted_rows}"
+    )
+
+
+if __name__ == "__main__":
+    main()
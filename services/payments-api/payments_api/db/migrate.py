@@ -5,8 +5,11 @@ import os
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
-from payments_api.db.session import get_engine, get_session_factory
+from payments_api.core.config import load_settings
+from payments_api.db.idempotency_retention import create_partitioned_table, ensure_partitions
+from payments_api.db.session import get_engine, get_session_factory, uses_partitioned_idempotency
 from shared.db import AccountORM, Base, IdempotencyKeyORM, LedgerEntryORM, OutboxEventORM, PaymentORM
+from shared.db.orm_models import utc_now
 
 SEED_ACCOUNTS = [
     ("acc-001", 1_000_000),
@@ -20,7 +23,18 @@ def create_schema(recreate: bool = False) -> None:
     engine = get_engine()
     if recreate:
         Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    settings = load_settings()
+    if not uses_partitioned_idempotency(settings, engine.dialect.name):
+        Base.metadata.create_all(bind=engine)
+        return
+    # With a retention window on Postgres, idempotency keys live in daily range partitions
+    # so expired days can be dropped whole instead of deleted row by row.
+    idempotency_table = IdempotencyKeyORM.__table__
+    tables = [table for table in Base.metadata.sorted_tables if table is not idempotency_table]
+    with engine.begin() as connection:
+        Base.metadata.create_all(bind=connection, tables=tables)
+        create_partitioned_table(connection)
+        ensure_partitions(connection, utc_now().date(), settings.idempotency_partitions_ahead)
 
 
 def seed_accounts() -> None:
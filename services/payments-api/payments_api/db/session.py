@@ -1,24 +1,72 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 from functools import lru_cache
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from payments_api.core.config import load_settings
+from payments_api.core.config import Settings, load_settings
+from shared.db.append_only import OUTBOX_NOTIFY
+
+# Session.info keys describing storage layout to repositories and use cases.
+IDEMPOTENCY_PARTITIONED = "idempotency_partitioned"
+OUTBOX_PAYLOAD_FORMAT = "outbox_payload_format"
+
+ASYNC_DRIVERS: dict[str, str] = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def uses_partitioned_idempotency(settings: Settings, dialect_name: str) -> bool:
+    return settings.idempotency_retention_days > 0 and dialect_name == "postgresql"
+
+
+def _session_info(settings: Settings, engine: Engine | AsyncEngine) -> dict[str, object]:
+    return {
+        IDEMPOTENCY_PARTITIONED: uses_partitioned_idempotency(settings, engine.dialect.name),
+        OUTBOX_PAYLOAD_FORMAT: settings.outbox_payload_format,
+        OUTBOX_NOTIFY: settings.outbox_notify and engine.dialect.name == "postgresql",
+    }
+
+
+def _pool_options(settings: Settings) -> dict[str, Any]:
+    # Sized per process: with N API workers the database sees N pools.
+    if make_url(settings.database_url).get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
 
 
 @lru_cache(maxsize=1)
 def get_engine() -> Engine:
     settings = load_settings()
-    return create_engine(settings.database_url, future=True, pool_pre_ping=True)
+    return create_engine(
+        settings.database_url, future=True, pool_pre_ping=True, **_pool_options(settings)
+    )
 
 
 @lru_cache(maxsize=1)
 def get_session_factory() -> sessionmaker[Session]:
-    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, expire_on_commit=False)
+    engine = get_engine()
+    return sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        info=_session_info(load_settings(), engine),
+    )
 
 
 def get_session() -> Iterator[Session]:
@@ -27,3 +75,31 @@ def get_session() -> Iterator[Session]:
         yield session
     finally:
         session.close()
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    settings = load_settings()
+    return create_async_engine(
+        to_async_database_url(settings.database_url), pool_pre_ping=True, **_pool_options(settings)
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    engine = get_async_engine()
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        info=_session_info(load_settings(), engine),
+    )
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    session = get_async_session_factory()()
+    try:
+        yield session
+    finally:
+        await session.close()
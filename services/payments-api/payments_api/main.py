@@ -1,25 +1,66 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
+from collections.abc import AsyncIterator, Callable
 
 from fastapi import FastAPI
 
 from payments_api.api.routes_health import router as health_router
 from payments_api.api.routes_internal import router as internal_router
+from payments_api.api.routes_payments import async_router as async_payments_router
 from payments_api.api.routes_payments import router as payments_router
-from payments_api.telemetry.metrics import mount_metrics_endpoint
+from payments_api.api.routes_payments_batch import router as payments_batch_router
+from payments_api.api.routes_payments_import import router as payments_import_router
+from payments_api.core.config import IntakeMode, Settings, load_settings
+from payments_api.db.idempotency_retention import build_pruner, run_pruning_loop
+from payments_api.telemetry.metrics import mark_process_dead, mount_metrics_endpoint, multiprocess_dir
 from payments_api.telemetry.otel import configure_otel, instrument_fastapi
 
 
+def _lifespan(
+    settings: Settings,
+) -> Callable[[FastAPI], contextlib.AbstractAsyncContextManager[None]] | None:
+    interval = settings.idempotency_prune_interval_seconds
+    prunes = settings.idempotency_retention_days > 0 and interval > 0
+    shares_metrics = multiprocess_dir() is not None
+    if not prunes and not shares_metrics:
+        return None
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        task = None
+        if prunes:
+            task = asyncio.create_task(run_pruning_loop(build_pruner(settings), interval))
+        try:
+            yield
+        finally:
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+            # Drop this worker's live gauges so a restarted worker does not leave stale values.
+            mark_process_dead(os.getpid())
+
+    return lifespan
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="payments-api", version="0.1.0")
+    settings = load_settings()
+    app = FastAPI(title="payments-api", version="0.1.0", lifespan=_lifespan(settings))
     app.include_router(health_router, tags=["health"])
     mount_metrics_endpoint(app)
 
     configure_otel(service_name=os.getenv("PAYMENTS_API_OTEL_SERVICE_NAME", "payments-api"))
     instrument_fastapi(app)
 
-    app.include_router(payments_router)
+    if settings.intake_mode is IntakeMode.ASYNC:
+        app.include_router(async_payments_router)
+    else:
+        app.include_router(payments_router)
+    app.include_router(payments_batch_router)
+    app.include_router(payments_import_router)
     app.include_router(internal_router)
     return app
 
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
-from shared.db import AccountORM
+from shared.db import (
+    AccountBalance,
+    AccountORM,
+    balance_delta_statement,
+    compare_and_swap_statement,
+    lock_balances_statement,
+)
 
 
 class AccountsRepository:
@@ -12,7 +20,55 @@ class AccountsRepository:
 
     def get_for_update(self, account_id: str) -> AccountORM | None:
         statement: Select[tuple[AccountORM]] = select(AccountORM).where(AccountORM.id == account_id)
+        return self.session.scalar(self._for_update(statement))
+
+    def get_many_for_update(self, account_ids: Iterable[str]) -> dict[str, AccountORM]:
+        ordered_ids = sorted(set(account_ids))
+        if not ordered_ids:
+            return {}
+        statement: Select[tuple[AccountORM]] = (
+            select(AccountORM).where(AccountORM.id.in_(ordered_ids)).order_by(AccountORM.id.asc())
+        )
+        return {account.id: account for account in self.session.scalars(self._for_update(statement))}
+
+    def lock_balances(self, account_ids: Iterable[str]) -> dict[str, AccountBalance]:
+        statement = lock_balances_statement(account_ids, for_update=self._supports_for_update())
+        return {row[0]: AccountBalance(*row) for row in self.session.execute(statement)}
+
+    def read_balances(self, account_ids: Iterable[str]) -> dict[str, AccountBalance]:
+        statement = lock_balances_statement(account_ids, for_update=False)
+        return {row[0]: AccountBalance(*row) for row in self.session.execute(statement)}
+
+    def compare_and_swap(
+        self, balance: AccountBalance, *, available_delta: int = 0, reserved_delta: int = 0
+    ) -> bool:
+        statement = compare_and_swap_statement(
+            balance, available_delta=available_delta, reserved_delta=reserved_delta
+        )
+        return self.session.execute(statement).first() is not None
+
+    def apply_balance_delta(
+        self,
+        account_id: str,
+        *,
+        available_delta: int = 0,
+        reserved_delta: int = 0,
+        min_available: int | None = None,
+    ) -> AccountBalance | None:
+        statement = balance_delta_statement(
+            account_id,
+            available_delta=available_delta,
+            reserved_delta=reserved_delta,
+            min_available=min_available,
+        )
+        row = self.session.execute(statement).first()
+        return AccountBalance(*row) if row is not None else None
+
+    def _supports_for_update(self) -> bool:
         dialect = self.session.bind.dialect.name if self.session.bind is not None else ""
-        if dialect != "sqlite":
+        return dialect != "sqlite"
+
+    def _for_update(self, statement: Select[tuple[AccountORM]]) -> Select[tuple[AccountORM]]:
+        if self._supports_for_update():
             statement = statement.with_for_update()
-        return self.session.scalar(statement)
+        return statement
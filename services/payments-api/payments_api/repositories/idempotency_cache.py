@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from hashlib import blake2b
+
+from payments_api.telemetry.metrics import (
+    IDEMPOTENCY_BLOOM_NEGATIVE,
+    IDEMPOTENCY_CACHE_EVICTION,
+    IDEMPOTENCY_CACHE_HIT,
+    IDEMPOTENCY_CACHE_MISS,
+)
+
+
+@dataclass(frozen=True)
+class CachedIdempotencyEntry:
+    request_hash: str
+    response_payload_json: str
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.capacity = max(capacity, 1)
+        self.size_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self._inserted = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self._inserted >= self.capacity
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._inserted += 1
+
+    def might_contain(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], byteorder="big")
+        second = int.from_bytes(digest[8:], byteorder="big") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size_bits
+
+
+class IdempotencyCache:
+    def __init__(self, max_entries: int, bloom_capacity: int | None = None) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedIdempotencyEntry] = OrderedDict()
+        # At least twice the LRU size, so rebuilding from the live entries leaves
+        # room for as many inserts again before the next rebuild.
+        self._bloom_capacity = max(bloom_capacity or max_entries * 10, max_entries * 2)
+        self._bloom = BloomFilter(self._bloom_capacity)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedIdempotencyEntry | None:
+        if not self._bloom.might_contain(key):
+            IDEMPOTENCY_BLOOM_NEGATIVE.inc()
+            IDEMPOTENCY_CACHE_MISS.inc()
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            IDEMPOTENCY_CACHE_MISS.inc()
+        else:
+            IDEMPOTENCY_CACHE_HIT.inc()
+        return entry
+
+    def put(self, key: str, request_hash: str, response_payload_json: str) -> None:
+        entry = CachedIdempotencyEntry(request_hash=request_hash, response_payload_json=response_payload_json)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                IDEMPOTENCY_CACHE_EVICTION.inc()
+            if self._bloom.is_full:
+                # Past capacity the false-positive rate degrades quickly. The new
+                # generation is seeded with every key still cached, so none of them
+                # turns into a bloom negative; evicted keys drop out of it.
+                self._bloom = BloomFilter(self._bloom_capacity)
+                for cached_key in self._entries:
+                    self._bloom.add(cached_key)
+            else:
+                self._bloom.add(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Iterable
+
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
+from payments_api.db.session import IDEMPOTENCY_PARTITIONED
 from shared.db import IdempotencyKeyORM
 
+# Volatile functions in the target list run after ORDER BY, so keys are locked in sorted
+# order and concurrent batches cannot deadlock on each other.
+LOCK_KEYS_SQL = text(
+    "SELECT pg_advisory_xact_lock(hashtextextended(k, 0)) "
+    "FROM unnest(CAST(:keys AS text[])) AS k ORDER BY k"
+)
+
 
 class IdempotencyRepository:
     def __init__(self, session: Session) -> None:
@@ -13,7 +24,54 @@ class IdempotencyRepository:
     def get(self, key: str) -> IdempotencyKeyORM | None:
         return self.session.scalar(select(IdempotencyKeyORM).where(IdempotencyKeyORM.key == key))
 
-    def save(self, key: str, request_hash: str, response_payload_json: str) -> None:
-        self.session.add(
-            IdempotencyKeyORM(key=key, request_hash=request_hash, response_payload_json=response_payload_json)
+    def get_many(self, keys: Iterable[str]) -> dict[str, IdempotencyKeyORM]:
+        unique_keys = sorted(set(keys))
+        if not unique_keys:
+            return {}
+        statement = select(IdempotencyKeyORM).where(IdempotencyKeyORM.key.in_(unique_keys))
+        return {row.key: row for row in self.session.scalars(statement)}
+
+    def save(self, key: str, request_hash: str, response_payload_json: str) -> IdempotencyKeyORM:
+        row = IdempotencyKeyORM(key=key, request_hash=request_hash, response_payload_json=response_payload_json)
+        self.session.add(row)
+        return row
+
+    def lock_keys(self, keys: Iterable[str]) -> None:
+        # Partitioned storage cannot keep a unique index on key alone; a transaction-scoped
+        # advisory lock per key serializes writers of the same key instead.
+        unique_keys = sorted(set(keys))
+        if unique_keys and self._partitioned():
+            self.session.execute(LOCK_KEYS_SQL, {"keys": unique_keys})
+
+    def claim(self, key: str, request_hash: str) -> bool:
+        if self._partitioned():
+            self.lock_keys([key])
+            if self.get(key) is not None:
+                return False
+            self.session.execute(
+                insert(IdempotencyKeyORM).values(key=key, request_hash=request_hash, response_payload_json="")
+            )
+            return True
+        dialect_insert = sqlite.insert if self._dialect() == "sqlite" else postgresql.insert
+        statement = (
+            dialect_insert(IdempotencyKeyORM)
+            .values(key=key, request_hash=request_hash, response_payload_json="")
+            .on_conflict_do_nothing(index_elements=[IdempotencyKeyORM.key])
+            .returning(IdempotencyKeyORM.key)
         )
+        return self.session.execute(statement).first() is not None
+
+    def complete(self, key: str, response_payload_json: str) -> None:
+        statement = (
+            update(IdempotencyKeyORM)
+            .where(IdempotencyKeyORM.key == key)
+            .values(response_payload_json=response_payload_json)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.execute(statement)
+
+    def _partitioned(self) -> bool:
+        return bool(self.session.info.get(IDEMPOTENCY_PARTITIONED, False))
+
+    def _dialect(self) -> str:
+        return self.session.bind.dialect.name if self.session.bind is not None else ""
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
@@ -17,3 +19,10 @@ class PaymentsRepository:
         statement = select(func.count()).select_from(PaymentORM).where(PaymentORM.status == status)
         count = self.session.scalar(statement)
         return int(count or 0)
+
+    def idempotency_keys_in(self, keys: Iterable[str]) -> set[str]:
+        key_list = list(keys)
+        if not key_list:
+            return set()
+        statement = select(PaymentORM.idempotency_key).where(PaymentORM.idempotency_key.in_(key_list))
+        return set(self.session.scalars(statement))
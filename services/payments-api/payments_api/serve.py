@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+APP = "payments_api.main:app"
+DEFAULT_MULTIPROC_DIR = Path(tempfile.gettempdir()) / "payments-api-metrics"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run payments-api with one or more uvicorn workers")
+    parser.add_argument("--host", default=os.getenv("PAYMENTS_API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PAYMENTS_API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")))
+    parser.add_argument(
+        "--db-connections",
+        type=int,
+        default=int(os.getenv("DB_CONNECTION_BUDGET", "0")),
+        help="total connections shared by all workers; 0 keeps DB_POOL_SIZE/DB_MAX_OVERFLOW",
+    )
+    return parser.parse_args(argv)
+
+
+def prepare_multiprocess_dir(path: Path) -> Path:
+    # Files left by a previous run would be summed into the new counters.
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    return path
+
+
+def worker_environment(workers: int, db_connections: int, env: dict[str, str]) -> dict[str, str]:
+    updates: dict[str, str] = {}
+    if workers > 1:
+        directory = Path(env.get("PROMETHEUS_MULTIPROC_DIR") or DEFAULT_MULTIPROC_DIR)
+        updates["PROMETHEUS_MULTIPROC_DIR"] = str(prepare_multiprocess_dir(directory))
+    if db_connections > 0:
+        updates["DB_POOL_SIZE"] = str(max(db_connections // workers, 1))
+        updates["DB_MAX_OVERFLOW"] = "0"
+    return updates
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    workers = max(args.workers, 1)
+    # Set before any worker imports prometheus_client: the value mode is chosen at import.
+    os.environ.update(worker_environment(workers, args.db_connections, dict(os.environ)))
+    uvicorn.run(APP, host=args.host, port=args.port, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
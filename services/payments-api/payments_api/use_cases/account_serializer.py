@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+
+from payments_api.core.errors import DomainError
+from payments_api.telemetry.metrics import ACCOUNT_QUEUE_DEPTH, ACCOUNT_QUEUE_REJECTED, ACCOUNT_QUEUE_WAIT_MS
+from shared.contracts.messages import DomainMessage
+from shared.contracts.models import ErrorCode
+
+
+@dataclass
+class _ThreadSlot:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    queued: int = 0
+
+
+@dataclass
+class _AsyncSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    queued: int = 0
+
+
+def _ordered(account_ids: Iterable[str]) -> list[str]:
+    # Sorted acquisition, like the database row locks, so two payments over the
+    # same account pair in opposite directions cannot deadlock in memory.
+    return sorted(set(account_ids))
+
+
+def _observe_wait(account_ids: list[str], started: float) -> None:
+    waited_ms = (time.perf_counter() - started) * 1000.0
+    for account_id in account_ids:
+        ACCOUNT_QUEUE_WAIT_MS.labels(account_id=account_id).observe(waited_ms)
+
+
+class AccountSerializer:
+    # Same-account requests queue on an in-process mutex before they open a
+    # transaction, so a hot account occupies one pooled connection instead of one
+    # per waiter blocked on its row lock. Each waiter blocks a threadpool thread, so
+    # past `max_waiters` per account a request fails fast with 429 instead of letting
+    # one hot account take every thread from requests on other accounts.
+    def __init__(self, max_waiters: int | None = None) -> None:
+        self.max_waiters = max_waiters
+        self._guard = threading.Lock()
+        self._slots: dict[str, _ThreadSlot] = {}
+
+    @contextmanager
+    def hold(self, account_ids: Iterable[str]) -> Iterator[None]:
+        ordered = _ordered(account_ids)
+        slots = self._enter(ordered)
+        acquired: list[_ThreadSlot] = []
+        started = time.perf_counter()
+        try:
+            for slot in slots:
+                slot.lock.acquire()
+                acquired.append(slot)
+            _observe_wait(ordered, started)
+            yield
+        finally:
+            for slot in reversed(acquired):
+                slot.lock.release()
+            self._leave(ordered)
+
+    def depth(self, account_id: str) -> int:
+        with self._guard:
+            slot = self._slots.get(account_id)
+            return slot.queued if slot is not None else 0
+
+    def _enter(self, account_ids: list[str]) -> list[_ThreadSlot]:
+        with self._guard:
+            if self.max_waiters is not None:
+                for account_id in account_ids:
+                    slot = self._slots.get(account_id)
+                    # One holder plus `max_waiters` queued behind it.
+                    if slot is not None and slot.queued > self.max_waiters:
+                        ACCOUNT_QUEUE_REJECTED.labels(account_id=account_id).inc()
+                        raise DomainError(
+                            error_code=ErrorCode.OVERLOADED,
+                            message=DomainMessage.ACCOUNT_QUEUE_FULL.value,
+                            http_status=429,
+                            retry_after_seconds=1,
+                        )
+            slots = []
+            for account_id in account_ids:
+                slot = self._slots.setdefault(account_id, _ThreadSlot())
+                slot.queued += 1
+                ACCOUNT_QUEUE_DEPTH.labels(account_id=account_id).set(slot.queued)
+                slots.append(slot)
+            return slots
+
+    def _leave(self, account_ids: list[str]) -> None:
+        with self._guard:
+            for account_id in account_ids:
+                slot = self._slots[account_id]
+                slot.queued -= 1
+                ACCOUNT_QUEUE_DEPTH.labels(account_id=account_id).set(slot.queued)
+                if slot.queued == 0:
+                    del self._slots[account_id]
+
+
+class AsyncAccountSerializer:
+    # Event-loop variant for the async intake path; waiting costs a suspended
+    # coroutine rather than a blocked thread.
+    def __init__(self) -> None:
+        self._slots: dict[str, _AsyncSlot] = {}
+
+    @asynccontextmanager
+    async def hold(self, account_ids: Iterable[str]) -> AsyncIterator[None]:
+        ordered = _ordered(account_ids)
+        slots = []
+        for account_id in ordered:
+            slot = self._slots.setdefault(account_id, _AsyncSlot())
+            slot.queued += 1
+            ACCOUNT_QUEUE_DEPTH.labels(account_id=account_id).set(slot.queued)
+            slots.append(slot)
+        acquired: list[_AsyncSlot] = []
+        started = time.perf_counter()
+        try:
+            for slot in slots:
+                await slot.lock.acquire()
+                acquired.append(slot)
+            _observe_wait(ordered, started)
+            yield
+        finally:
+            for slot in reversed(acquired):
+                slot.lock.release()
+            for account_id, slot in zip(ordered, slots, strict=True):
+                slot.queued -= 1
+                ACCOUNT_QUEUE_DEPTH.labels(account_id=account_id).set(slot.queued)
+                if slot.queued == 0 and self._slots.get(account_id) is slot:
+                    del self._slots[account_id]
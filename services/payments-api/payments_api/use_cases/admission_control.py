@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable
+
+from payments_api.core.errors import DomainError
+from payments_api.telemetry.metrics import ADMISSION_BACKLOG, ADMISSION_DELAYED, ADMISSION_SHED
+from shared.contracts.messages import DomainMessage
+from shared.contracts.models import ErrorCode
+
+
+class AdmissionController:
+    # Requests read a backlog estimate refreshed by a background thread, so admission
+    # costs no database round trip on the request path.
+    def __init__(
+        self,
+        backlog_source: Callable[[], int],
+        delay_backlog: int,
+        shed_backlog: int,
+        max_delay_seconds: float,
+        refresh_interval_seconds: float,
+        max_retry_after_seconds: int = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backlog_source = backlog_source
+        self.delay_backlog = delay_backlog
+        self.shed_backlog = max(shed_backlog, delay_backlog + 1)
+        self.max_delay_seconds = max_delay_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._backlog = 0
+        self._drain_rate = 0.0
+        self._refreshed_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def backlog(self) -> int:
+        return self._backlog
+
+    def refresh(self) -> int:
+        backlog = self.backlog_source()
+        now = self._clock()
+        with self._lock:
+            if self._refreshed_at is not None and now > self._refreshed_at:
+                # Net drain rate (worker throughput minus intake), smoothed across refreshes.
+                drained = (self._backlog - backlog) / (now - self._refreshed_at)
+                self._drain_rate = 0.8 * self._drain_rate + 0.2 * max(drained, 0.0)
+            self._backlog = backlog
+            self._refreshed_at = now
+        ADMISSION_BACKLOG.set(backlog)
+        return backlog
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="admission-backlog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval_seconds * 2)
+            self._thread = None
+
+    def admit(self) -> float:
+        with self._lock:
+            backlog = self._backlog
+            refreshed_at = self._refreshed_at
+        # Fail open when the estimate is missing or stale: the database is already
+        # unreachable or slow, and the write path reports that on its own.
+        if refreshed_at is None or self._clock() - refreshed_at > self.refresh_interval_seconds * 10:
+            return 0.0
+        if backlog >= self.shed_backlog:
+            ADMISSION_SHED.inc()
+            raise DomainError(
+                error_code=ErrorCode.OVERLOADED,
+                message=DomainMessage.OUTBOX_BACKLOG_HIGH.value,
+                http_status=429,
+                retry_after_seconds=self.retry_after_seconds(backlog),
+            )
+        if backlog <= self.delay_backlog:
+            return 0.0
+        ADMISSION_DELAYED.inc()
+        fraction = (backlog - self.delay_backlog) / (self.shed_backlog - self.delay_backlog)
+        return self.max_delay_seconds * fraction
+
+    def retry_after_seconds(self, backlog: int) -> int:
+        # Time for the worker to drain back to the delay mark at the observed net rate.
+        if self._drain_rate <= 0.0:
+            return self.max_retry_after_seconds
+        seconds = math.ceil((backlog - self.delay_backlog) / self._drain_rate)
+        return min(max(seconds, 1), self.max_retry_after_seconds)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # Keep the last estimate; admit() fails open once it goes stale.
+                pass
+            self._stop.wait(self.refresh_interval_seconds)
@@ -1,48 +1,98 @@
 from __future__ import annotations
 
-import json
-from typing import Final
-from uuid import uuid4
+import time
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+from typing import Final, TypeVar
 
 from opentelemetry import trace
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from payments_api.core.errors import DomainError
+from payments_api.core.errors import DomainError, OptimisticLockConflict
+from payments_api.db.session import OUTBOX_PAYLOAD_FORMAT
 from payments_api.repositories.accounts_repository import AccountsRepository
+from payments_api.repositories.idempotency_cache import CachedIdempotencyEntry, IdempotencyCache
 from payments_api.repositories.idempotency_repository import IdempotencyRepository
 from payments_api.repositories.outbox_repository import OutboxRepository
 from payments_api.repositories.payments_repository import PaymentsRepository
-from payments_api.telemetry.metrics import IDEMPOTENCY_REPLAY, PAYMENTS_PROCESSED
+from payments_api.telemetry.metrics import (
+    IDEMPOTENCY_REPLAY,
+    OPTIMISTIC_LOCK_CONFLICT,
+    PAYMENTS_PROCESSED,
+)
 from payments_api.use_cases.mode_strategies import (
     EventualModeStrategy,
     HybridModeStrategy,
     PaymentModeStrategy,
     StrongModeStrategy,
 )
+from shared.contracts.event_codec import EventPayload, encode_event_payload, event_payload_to_json
+from shared.contracts.messages import DomainMessage
 from shared.contracts.models import (
+    AccountLockStrategy,
     ConsistencyMode,
     CreatePaymentRequest,
     ErrorCode,
-    LedgerDirection,
     OutboxEventType,
-    OutboxStatus,
+    OutboxPayloadFormat,
     PaymentResponse,
     PaymentStatus,
 )
-from shared.contracts.messages import DomainMessage
-from shared.db import AccountORM, LedgerEntryORM, OutboxEventORM, PaymentORM
+from shared.db import (
+    AccountBalance,
+    AppendOnlyBuffer,
+    AccountORM,
+    IdempotencyKeyORM,
+    PaymentORM,
+)
+from shared.utils.backoff import RetryPolicy
+from shared.utils.ids import new_id
+from shared.utils.partitions import outbox_partition_key
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PaymentOutcome:
+    payload_json: str
+    created: bool
+    response: PaymentResponse | None = None
+
+    def to_response(self) -> PaymentResponse:
+        if self.response is not None:
+            return self.response
+        return PaymentResponse.model_validate_json(self.payload_json)
+
+    def to_bytes(self) -> bytes:
+        return self.payload_json.encode("utf-8")
 
 
 class CreatePaymentUseCase:
-    def __init__(self, session: Session, mode: ConsistencyMode) -> None:
+    def __init__(
+        self,
+        session: Session,
+        mode: ConsistencyMode,
+        idempotency_cache: IdempotencyCache | None = None,
+        lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM,
+        conflict_retry: RetryPolicy | None = None,
+    ) -> None:
         self.session = session
         self.mode = mode
+        self.idempotency_cache = idempotency_cache
+        self.lock_strategy = lock_strategy
+        self.conflict_retry = conflict_retry or RetryPolicy()
         self.accounts = AccountsRepository(session)
         self.idempotency = IdempotencyRepository(session)
         self.payments = PaymentsRepository(session)
         self.outbox = OutboxRepository(session)
+        self.append_only = AppendOnlyBuffer()
+        self.outbox_format = OutboxPayloadFormat(
+            session.info.get(OUTBOX_PAYLOAD_FORMAT, OutboxPayloadFormat.JSON)
+        )
         self.tracer = trace.get_tracer("payments_api.use_cases.create_payment")
+        self._locked_accounts: dict[str, AccountORM] = {}
+        self._locked_ids: set[str] = set()
         self._strategies: Final[dict[ConsistencyMode, PaymentModeStrategy]] = {
             ConsistencyMode.STRONG: StrongModeStrategy(self),
             ConsistencyMode.HYBRID: HybridModeStrategy(self),
@@ -50,17 +100,51 @@ class CreatePaymentUseCase:
         }
 
     def execute(self, request: CreatePaymentRequest, traceparent: str | None) -> PaymentResponse:
-        self._validate_request(request)
+        return self._execute_outcome(request, traceparent).to_response()
+
+    def execute_raw(self, request: CreatePaymentRequest, traceparent: str | None) -> bytes:
+        # The stored JSON is exactly what the client received the first time, so
+        # replays go back on the wire without a pydantic parse/serialize round trip.
+        return self._execute_outcome(request, traceparent).to_bytes()
+
+    def _execute_outcome(
+        self, request: CreatePaymentRequest, traceparent: str | None
+    ) -> PaymentOutcome:
+        request_hash, replay = self.prepare(request)
+        if replay is not None:
+            return replay
+        with self.tracer.start_as_current_span("payments.db.transaction"):
+            outcome = self.retry_on_conflict(
+                lambda: self.run_transaction(request, request_hash, traceparent)
+            )
+        return self.finish(request, request_hash, outcome)
+
+    def prepare(self, request: CreatePaymentRequest) -> tuple[str, PaymentOutcome | None]:
+        # Everything before the write transaction: returns the request hash and, when
+        # the key was already answered, the replayed outcome.
+        self.validate_request(request)
         request_hash = request.compute_request_hash()
+        cached = self.get_cached_idempotency(request.idempotency_key)
+        if cached is not None:
+            payload_json = self.validate_existing_idempotency(cached, request, request_hash)
+            return request_hash, PaymentOutcome(payload_json=payload_json, created=False)
         if self.session.in_transaction():
             self.session.rollback()
-        with self.tracer.start_as_current_span("payments.db.transaction"):
-            response, created = self._run_transaction(request, request_hash, traceparent)
-        if created:
+        replay = self._lookup_before_write(request, request_hash)
+        if replay is not None:
+            self.remember_idempotency(request.idempotency_key, request_hash, replay)
+            return request_hash, PaymentOutcome(payload_json=replay, created=False)
+        return request_hash, None
+
+    def finish(
+        self, request: CreatePaymentRequest, request_hash: str, outcome: PaymentOutcome
+    ) -> PaymentOutcome:
+        if outcome.created:
             PAYMENTS_PROCESSED.inc()
-        return response
+        self.remember_idempotency(request.idempotency_key, request_hash, outcome.payload_json)
+        return outcome
 
-    def _validate_request(self, request: CreatePaymentRequest) -> None:
+    def validate_request(self, request: CreatePaymentRequest) -> None:
         if request.source_account_id == request.destination_account_id:
             raise DomainError(
                 error_code=ErrorCode.INVALID_PAYMENT,
@@ -68,11 +152,46 @@ class CreatePaymentUseCase:
                 http_status=422,
             )
 
-    def _get_or_validate_idempotency(self, key: str, request_hash: str) -> PaymentResponse | None:
-        existing = self.idempotency.get(key)
+    def _get_or_validate_idempotency(
+        self, request: CreatePaymentRequest, request_hash: str
+    ) -> str | None:
+        existing = self.idempotency.get(request.idempotency_key)
         if existing is None:
             return None
-        if existing.request_hash != request_hash:
+        return self.validate_existing_idempotency(existing, request, request_hash)
+
+    def _lookup_before_write(self, request: CreatePaymentRequest, request_hash: str) -> str | None:
+        # A short read-only statement outside the write transaction: replays and
+        # conflicts are answered before any account row is locked.
+        try:
+            return self._get_or_validate_idempotency(request, request_hash)
+        except SQLAlchemyError as exc:
+            raise DomainError(
+                error_code=ErrorCode.DEPENDENCY_UNAVAILABLE,
+                message=DomainMessage.DATABASE_UNAVAILABLE.value,
+                http_status=503,
+            ) from exc
+        finally:
+            self.session.rollback()
+
+    def get_cached_idempotency(self, key: str) -> CachedIdempotencyEntry | None:
+        if self.idempotency_cache is None:
+            return None
+        return self.idempotency_cache.get(key)
+
+    def remember_idempotency(self, key: str, request_hash: str, payload_json: str) -> None:
+        # Only committed outcomes are cached: a stored key never changes afterwards,
+        # so replaying it from memory is as correct as reading it back.
+        if self.idempotency_cache is not None:
+            self.idempotency_cache.put(key, request_hash, payload_json)
+
+    def validate_existing_idempotency(
+        self,
+        existing: IdempotencyKeyORM | CachedIdempotencyEntry,
+        request: CreatePaymentRequest,
+        request_hash: str,
+    ) -> str:
+        if not request.matches_request_hash(existing.request_hash, request_hash):
             raise DomainError(
                 error_code=ErrorCode.IDEMPOTENCY_CONFLICT,
                 message=DomainMessage.IDEMPOTENCY_CONFLICT.value,
@@ -85,28 +204,32 @@ class CreatePaymentUseCase:
                 http_status=503,
             )
         IDEMPOTENCY_REPLAY.inc()
-        return PaymentResponse.model_validate_json(existing.response_payload_json)
+        return existing.response_payload_json
 
-    def _run_transaction(
+    def run_transaction(
         self, request: CreatePaymentRequest, request_hash: str, traceparent: str | None
-    ) -> tuple[PaymentResponse, bool]:
+    ) -> PaymentOutcome:
         try:
             with self.session.begin():
-                replay = self._get_or_validate_idempotency(request.idempotency_key, request_hash)
-                if replay is not None:
-                    return replay, False
-                response = self._execute_mode(request, request_hash, traceparent)
-                self.idempotency.save(
-                    key=request.idempotency_key,
-                    request_hash=request_hash,
-                    response_payload_json=response.model_dump_json(),
-                )
-                return response, True
+                self.append_only.clear()
+                if not self.idempotency.claim(request.idempotency_key, request_hash):
+                    # A concurrent duplicate owns the key: the claim waited for it to
+                    # finish, so replay its outcome instead of redoing the payment.
+                    return self._replay_after_lost_claim(request, request_hash)
+                response = self.execute_mode(request, request_hash, traceparent)
+                self.append_only.flush(self.session)
+                payload_json = response.model_dump_json()
+                self.idempotency.complete(request.idempotency_key, payload_json)
+                return PaymentOutcome(payload_json=payload_json, created=True, response=response)
         except IntegrityError as exc:
             self.session.rollback()
-            replay = self._get_or_validate_idempotency(request.idempotency_key, request_hash)
+            replay = self._get_or_validate_idempotency(request, request_hash)
             if replay is not None:
-                return replay, False
+                return PaymentOutcome(payload_json=replay, created=False)
+            self.check_key_not_expired(
+                request.idempotency_key,
+                self.payments.idempotency_keys_in([request.idempotency_key]),
+            )
             raise DomainError(
                 error_code=ErrorCode.IDEMPOTENCY_UNAVAILABLE,
                 message=DomainMessage.IDEMPOTENCY_RACE.value,
@@ -119,26 +242,175 @@ class CreatePaymentUseCase:
                 http_status=503,
             ) from exc
 
-    def _execute_mode(
+    def check_key_not_expired(self, key: str, expired_keys: Collection[str]) -> None:
+        # Retention prunes idempotency rows but never payments: a key that still names a
+        # payment was answered before and can no longer be replayed. Retrying it would
+        # only hit the payment's unique key again, so it is a conflict, not a race.
+        if key in expired_keys:
+            raise DomainError(
+                error_code=ErrorCode.IDEMPOTENCY_CONFLICT,
+                message=DomainMessage.IDEMPOTENCY_EXPIRED.value,
+                http_status=409,
+            )
+
+    def _replay_after_lost_claim(
+        self, request: CreatePaymentRequest, request_hash: str
+    ) -> PaymentOutcome:
+        replay = self._get_or_validate_idempotency(request, request_hash)
+        if replay is None:
+            raise DomainError(
+                error_code=ErrorCode.IDEMPOTENCY_UNAVAILABLE,
+                message=DomainMessage.IDEMPOTENCY_RACE.value,
+                http_status=503,
+            )
+        return PaymentOutcome(payload_json=replay, created=False)
+
+    def retry_on_conflict(
+        self, operation: Callable[[], T], sleep: Callable[[float], None] = time.sleep
+    ) -> T:
+        # Only for callers on a worker thread (sync routes, run_in_threadpool); an event
+        # loop caller drives conflict_backoff itself and awaits the delay.
+        attempt = 1
+        while True:
+            try:
+                return operation()
+            except OptimisticLockConflict as exc:
+                sleep(self.conflict_backoff(attempt, exc))
+                attempt += 1
+
+    def conflict_backoff(self, attempt: int, conflict: OptimisticLockConflict) -> float:
+        # Rolls back the failed attempt and returns the delay before the next one, or
+        # raises once the attempts are exhausted.
+        self.session.rollback()
+        OPTIMISTIC_LOCK_CONFLICT.inc()
+        if attempt >= self.conflict_retry.max_attempts:
+            raise DomainError(
+                error_code=ErrorCode.CONCURRENCY_CONFLICT,
+                message=DomainMessage.OPTIMISTIC_RETRIES_EXHAUSTED.value,
+                http_status=503,
+            ) from conflict
+        return self.conflict_retry.delay_seconds(attempt)
+
+    def execute_mode(
         self, request: CreatePaymentRequest, request_hash: str, traceparent: str | None
     ) -> PaymentResponse:
         strategy = self._strategies[self.mode]
         return strategy.execute(request, request_hash, traceparent)
 
-    def _lock_accounts(self, source_id: str, destination_id: str) -> tuple[AccountORM, AccountORM]:
-        first_id, second_id = sorted([source_id, destination_id])
-        first = self.accounts.get_for_update(first_id)
-        second = self.accounts.get_for_update(second_id)
-        if first is None or second is None:
+    def mode_locks_accounts(self) -> bool:
+        return self._strategies[self.mode].locks_accounts
+
+    def prelock_accounts(self, account_ids: set[str]) -> None:
+        if self.lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            # Each transfer compare-and-swaps its own rows; a FOR UPDATE here would make
+            # the multi-item paths lock pessimistically after all.
+            self._locked_accounts = {}
+            self._locked_ids = set()
+            return
+        if self.lock_strategy is AccountLockStrategy.LEAN:
+            self._locked_accounts = {}
+            self._locked_ids = set(self.accounts.lock_balances(account_ids)) if account_ids else set()
+            return
+        self._locked_ids = set()
+        self._locked_accounts = self.accounts.get_many_for_update(account_ids)
+
+    def _transfer_available(self, source_id: str, destination_id: str, amount_cents: int) -> None:
+        if self.lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            self._swap_balances(source_id, destination_id, amount_cents, reserve=False)
+            return
+        if self.lock_strategy is AccountLockStrategy.LEAN:
+            self._lock_account_ids(source_id, destination_id)
+            self._debit_or_reject(source_id, amount_cents, reserve=False)
+            self.accounts.apply_balance_delta(destination_id, available_delta=amount_cents)
+            return
+        source, destination = self._lock_accounts(source_id, destination_id)
+        self._validate_funds(source, amount_cents)
+        source.available_balance_cents -= amount_cents
+        source.version += 1
+        destination.available_balance_cents += amount_cents
+        destination.version += 1
+
+    def _reserve_available(self, source_id: str, destination_id: str, amount_cents: int) -> None:
+        if self.lock_strategy is AccountLockStrategy.OPTIMISTIC:
+            self._swap_balances(source_id, destination_id, amount_cents, reserve=True)
+            return
+        if self.lock_strategy is AccountLockStrategy.LEAN:
+            self._lock_account_ids(source_id, destination_id)
+            self._debit_or_reject(source_id, amount_cents, reserve=True)
+            return
+        source, _ = self._lock_accounts(source_id, destination_id)
+        self._validate_funds(source, amount_cents)
+        source.available_balance_cents -= amount_cents
+        source.reserved_balance_cents += amount_cents
+        source.version += 1
+
+    def _swap_balances(
+        self, source_id: str, destination_id: str, amount_cents: int, reserve: bool
+    ) -> None:
+        balances = self.accounts.read_balances([source_id, destination_id])
+        if len(balances) != len({source_id, destination_id}):
             raise DomainError(
                 error_code=ErrorCode.INVALID_PAYMENT,
                 message=DomainMessage.ACCOUNT_NOT_FOUND.value,
                 http_status=422,
             )
-        by_id = {first.id: first, second.id: second}
-        return by_id[source_id], by_id[destination_id]
+        self._validate_funds(balances[source_id], amount_cents)
+        deltas = {source_id: (-amount_cents, amount_cents if reserve else 0)}
+        if not reserve:
+            deltas[destination_id] = (amount_cents, 0)
+        # Swaps run in account id order like the pessimistic paths, so a losing
+        # writer only ever waits on rows it would have conflicted on anyway.
+        for account_id in sorted(deltas):
+            available_delta, reserved_delta = deltas[account_id]
+            swapped = self.accounts.compare_and_swap(
+                balances[account_id], available_delta=available_delta, reserved_delta=reserved_delta
+            )
+            if not swapped:
+                raise OptimisticLockConflict(account_id)
 
-    def _validate_funds(self, source: AccountORM, amount_cents: int) -> None:
+    def _lock_account_ids(self, source_id: str, destination_id: str) -> None:
+        missing = {source_id, destination_id} - self._locked_ids
+        if not missing:
+            return
+        locked = self.accounts.lock_balances(missing)
+        if len(locked) != len(missing):
+            raise DomainError(
+                error_code=ErrorCode.INVALID_PAYMENT,
+                message=DomainMessage.ACCOUNT_NOT_FOUND.value,
+                http_status=422,
+            )
+        self._locked_ids.update(locked)
+
+    def _debit_or_reject(self, source_id: str, amount_cents: int, reserve: bool) -> None:
+        # The funds check lives in the UPDATE's WHERE clause, so a rejected debit
+        # leaves the row untouched exactly like the ORM path's pre-check does.
+        debited = self.accounts.apply_balance_delta(
+            source_id,
+            available_delta=-amount_cents,
+            reserved_delta=amount_cents if reserve else 0,
+            min_available=amount_cents,
+        )
+        if debited is None:
+            raise DomainError(
+                error_code=ErrorCode.INSUFFICIENT_FUNDS,
+                message=DomainMessage.INSUFFICIENT_FUNDS.value,
+                http_status=422,
+            )
+
+    def _lock_accounts(self, source_id: str, destination_id: str) -> tuple[AccountORM, AccountORM]:
+        for account_id in sorted([source_id, destination_id]):
+            if account_id not in self._locked_accounts:
+                account = self.accounts.get_for_update(account_id)
+                if account is None:
+                    raise DomainError(
+                        error_code=ErrorCode.INVALID_PAYMENT,
+                        message=DomainMessage.ACCOUNT_NOT_FOUND.value,
+                        http_status=422,
+                    )
+                self._locked_accounts[account_id] = account
+        return self._locked_accounts[source_id], self._locked_accounts[destination_id]
+
+    def _validate_funds(self, source: AccountORM | AccountBalance, amount_cents: int) -> None:
         if source.available_balance_cents < amount_cents:
             raise DomainError(
                 error_code=ErrorCode.INSUFFICIENT_FUNDS,
@@ -149,7 +421,7 @@ class CreatePaymentUseCase:
     def _create_payment(
         self, request: CreatePaymentRequest, request_hash: str, status: PaymentStatus
     ) -> str:
-        payment_id = f"pay-{uuid4().hex}"
+        payment_id = new_id("pay")
         payment = PaymentORM(
             id=payment_id,
             idempotency_key=request.idempotency_key,
@@ -166,22 +438,7 @@ class CreatePaymentUseCase:
     def _add_ledger_entries(
         self, payment_id: str, source_id: str, destination_id: str, amount_cents: int
     ) -> None:
-        debit_entry = LedgerEntryORM(
-            id=f"led-{uuid4().hex}",
-            payment_id=payment_id,
-            account_id=source_id,
-            direction=LedgerDirection.DEBIT.value,
-            amount_cents=amount_cents,
-        )
-        credit_entry = LedgerEntryORM(
-            id=f"led-{uuid4().hex}",
-            payment_id=payment_id,
-            account_id=destination_id,
-            direction=LedgerDirection.CREDIT.value,
-            amount_cents=amount_cents,
-        )
-        self.session.add(debit_entry)
-        self.session.add(credit_entry)
+        self.append_only.add_ledger_transfer(payment_id, source_id, destination_id, amount_cents)
 
     def _add_outbox(
         self,
@@ -190,21 +447,19 @@ class CreatePaymentUseCase:
         request: CreatePaymentRequest,
         traceparent: str | None,
     ) -> None:
-        payload = {
-            "payment_id": payment_id,
-            "source_account_id": request.source_account_id,
-            "destination_account_id": request.destination_account_id,
-            "amount_cents": request.amount_cents,
-            "traceparent": traceparent,
-        }
-        event = OutboxEventORM(
-            id=f"evt-{uuid4().hex}",
-            aggregate_type="payment",
+        payload = EventPayload(
+            payment_id=payment_id,
+            source_account_id=request.source_account_id,
+            destination_account_id=request.destination_account_id,
+            amount_cents=request.amount_cents,
+            traceparent=traceparent,
+        )
+        binary = self.outbox_format is OutboxPayloadFormat.BINARY
+        self.append_only.add_outbox_event(
+            event_id=new_id("evt"),
             aggregate_id=payment_id,
             event_type=event_type.value,
-            payload_json=json.dumps(payload, sort_keys=True),
-            status=OutboxStatus.PENDING.value,
-            attempts=0,
-            next_retry_at=None,
+            payload_json=None if binary else event_payload_to_json(payload),
+            payload_bin=encode_event_payload(payload) if binary else None,
+            partition_key=outbox_partition_key(request.source_account_id),
         )
-        self.outbox.save(event)
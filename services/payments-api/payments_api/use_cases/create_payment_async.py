@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from payments_api.core.errors import OptimisticLockConflict
+from payments_api.repositories.idempotency_cache import IdempotencyCache
+from payments_api.use_cases.create_payment import CreatePaymentUseCase, PaymentOutcome
+from shared.contracts.models import (
+    AccountLockStrategy,
+    ConsistencyMode,
+    CreatePaymentRequest,
+    PaymentResponse,
+)
+from shared.utils.backoff import RetryPolicy
+
+
+class AsyncCreatePaymentUseCase:
+    def __init__(
+        self,
+        session: AsyncSession,
+        mode: ConsistencyMode,
+        idempotency_cache: IdempotencyCache | None = None,
+        lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM,
+        conflict_retry: RetryPolicy | None = None,
+    ) -> None:
+        self.session = session
+        self.mode = mode
+        self.idempotency_cache = idempotency_cache
+        self.lock_strategy = lock_strategy
+        self.conflict_retry = conflict_retry
+
+    async def execute(self, request: CreatePaymentRequest, traceparent: str | None) -> PaymentResponse:
+        return (await self._execute_outcome(request, traceparent)).to_response()
+
+    async def execute_raw(self, request: CreatePaymentRequest, traceparent: str | None) -> bytes:
+        return (await self._execute_outcome(request, traceparent)).to_bytes()
+
+    async def _execute_outcome(
+        self, request: CreatePaymentRequest, traceparent: str | None
+    ) -> PaymentOutcome:
+        # The mode strategies and repositories run unchanged on the async driver's
+        # connection: each run_sync drives one step inside a greenlet on the event loop.
+        # The optimistic retry loop stays out here so its backoff is awaited, not slept.
+        use_case = self._build()
+        request_hash, replay = await self.session.run_sync(lambda _: use_case.prepare(request))
+        if replay is not None:
+            return replay
+        with use_case.tracer.start_as_current_span("payments.db.transaction"):
+            attempt = 1
+            while True:
+                try:
+                    outcome = await self.session.run_sync(
+                        lambda _: use_case.run_transaction(request, request_hash, traceparent)
+                    )
+                    break
+                except OptimisticLockConflict as conflict:
+                    delay = await self.session.run_sync(
+                        lambda _, failure: use_case.conflict_backoff(attempt, failure), conflict
+                    )
+                    await asyncio.sleep(delay)
+                    attempt += 1
+        return use_case.finish(request, request_hash, outcome)
+
+    def _build(self) -> CreatePaymentUseCase:
+        return CreatePaymentUseCase(
+            session=self.session.sync_session,
+            mode=self.mode,
+            idempotency_cache=self.idempotency_cache,
+            lock_strategy=self.lock_strategy,
+            conflict_retry=self.conflict_retry,
+        )
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from opentelemetry import trace
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from payments_api.core.errors import DomainError
+from payments_api.repositories.idempotency_cache import CachedIdempotencyEntry, IdempotencyCache
+from payments_api.telemetry.metrics import PAYMENTS_PROCESSED
+from payments_api.use_cases.create_payment import CreatePaymentUseCase
+from shared.contracts.messages import DomainMessage
+from shared.contracts.models import (
+    AccountLockStrategy,
+    ConsistencyMode,
+    CreatePaymentRequest,
+    ErrorCode,
+    PaymentResponse,
+)
+from shared.db import IdempotencyKeyORM
+from shared.utils.backoff import RetryPolicy
+
+StoredIdempotency = IdempotencyKeyORM | CachedIdempotencyEntry
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    request: CreatePaymentRequest
+    response: PaymentResponse | None = None
+    error: DomainError | None = None
+    replayed: bool = False
+    payload_json: str | None = None
+
+
+class CreatePaymentBatchUseCase:
+    def __init__(
+        self,
+        session: Session,
+        mode: ConsistencyMode,
+        max_items: int,
+        idempotency_cache: IdempotencyCache | None = None,
+        lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM,
+        conflict_retry: RetryPolicy | None = None,
+    ) -> None:
+        self.session = session
+        self.max_items = max_items
+        self.single = CreatePaymentUseCase(
+            session=session,
+            mode=mode,
+            idempotency_cache=idempotency_cache,
+            lock_strategy=lock_strategy,
+            conflict_retry=conflict_retry,
+        )
+        self.tracer = trace.get_tracer("payments_api.use_cases.create_payment_batch")
+
+    def execute(
+        self, requests: Sequence[CreatePaymentRequest], traceparent: str | None
+    ) -> list[BatchItemResult]:
+        if len(requests) > self.max_items:
+            raise DomainError(
+                error_code=ErrorCode.INVALID_PAYMENT,
+                message=f"{DomainMessage.BATCH_TOO_LARGE.value}: {self.max_items}",
+                http_status=422,
+            )
+        if self.session.in_transaction():
+            self.session.rollback()
+        with self.tracer.start_as_current_span("payments.db.batch_transaction"):
+            results = self.single.retry_on_conflict(
+                lambda: self._run_transaction(requests, traceparent)
+            )
+        created = len([item for item in results if item.response is not None and not item.replayed])
+        if created:
+            PAYMENTS_PROCESSED.inc(created)
+        return results
+
+    def _run_transaction(
+        self, requests: Sequence[CreatePaymentRequest], traceparent: str | None
+    ) -> list[BatchItemResult]:
+        try:
+            try:
+                return self._apply(requests, traceparent)
+            except IntegrityError:
+                # A concurrent request persisted one of our keys first; a second pass
+                # sees it in the bulk idempotency lookup and replays it instead. A key
+                # whose idempotency row was pruned can only be rejected per item.
+                self.session.rollback()
+                return self._apply(requests, traceparent, check_expired=True)
+        except IntegrityError as exc:
+            self.session.rollback()
+            raise DomainError(
+                error_code=ErrorCode.IDEMPOTENCY_UNAVAILABLE,
+                message=DomainMessage.IDEMPOTENCY_RACE.value,
+                http_status=503,
+            ) from exc
+        except SQLAlchemyError as exc:
+            raise DomainError(
+                error_code=ErrorCode.DEPENDENCY_UNAVAILABLE,
+                message=DomainMessage.DATABASE_UNAVAILABLE.value,
+                http_status=503,
+            ) from exc
+
+    def _apply(
+        self,
+        requests: Sequence[CreatePaymentRequest],
+        traceparent: str | None,
+        check_expired: bool = False,
+    ) -> list[BatchItemResult]:
+        with self.session.begin():
+            self.single.append_only.clear()
+            hashes = [request.compute_request_hash() for request in requests]
+            existing = self._load_existing(requests)
+            expired: set[str] = set()
+            if check_expired:
+                pending = [request.idempotency_key for request in requests]
+                expired = self.single.payments.idempotency_keys_in(
+                    key for key in pending if key not in existing
+                )
+            self._lock_touched_accounts(requests, existing)
+            results = [
+                self._apply_item(request, request_hash, existing, expired, traceparent)
+                for request, request_hash in zip(requests, hashes, strict=True)
+            ]
+            self.single.append_only.flush(self.session)
+        for item, request_hash in zip(results, hashes, strict=True):
+            if item.payload_json is not None:
+                self.single.remember_idempotency(
+                    item.request.idempotency_key, request_hash, item.payload_json
+                )
+        return results
+
+    def _load_existing(self, requests: Sequence[CreatePaymentRequest]) -> dict[str, StoredIdempotency]:
+        existing: dict[str, StoredIdempotency] = {}
+        for request in requests:
+            cached = self.single.get_cached_idempotency(request.idempotency_key)
+            if cached is not None:
+                existing[request.idempotency_key] = cached
+        pending = [request.idempotency_key for request in requests if request.idempotency_key not in existing]
+        self.single.idempotency.lock_keys(pending)
+        existing.update(self.single.idempotency.get_many(pending))
+        return existing
+
+    def _lock_touched_accounts(
+        self, requests: Sequence[CreatePaymentRequest], existing: dict[str, StoredIdempotency]
+    ) -> None:
+        account_ids: set[str] = set()
+        if self.single.mode_locks_accounts():
+            for request in requests:
+                if request.idempotency_key not in existing:
+                    account_ids.update([request.source_account_id, request.destination_account_id])
+        self.single.prelock_accounts(account_ids)
+
+    def _apply_item(
+        self,
+        request: CreatePaymentRequest,
+        request_hash: str,
+        existing: dict[str, StoredIdempotency],
+        expired: set[str],
+        traceparent: str | None,
+    ) -> BatchItemResult:
+        try:
+            self.single.validate_request(request)
+            previous = existing.get(request.idempotency_key)
+            if previous is not None:
+                replay = self.single.validate_existing_idempotency(
+                    previous, request, request_hash
+                )
+                return BatchItemResult(
+                    request=request,
+                    response=PaymentResponse.model_validate_json(replay),
+                    replayed=True,
+                    payload_json=replay,
+                )
+            self.single.check_key_not_expired(request.idempotency_key, expired)
+            # Strategies raise DomainError before mutating any row, so a rejected item
+            # leaves the shared transaction untouched for the remaining items.
+            response = self.single.execute_mode(request, request_hash, traceparent)
+        except DomainError as exc:
+            return BatchItemResult(request=request, error=exc)
+        payload_json = response.model_dump_json()
+        existing[request.idempotency_key] = self.single.idempotency.save(
+            key=request.idempotency_key,
+            request_hash=request_hash,
+            response_payload_json=payload_json,
+        )
+        return BatchItemResult(request=request, response=response, payload_json=payload_json)
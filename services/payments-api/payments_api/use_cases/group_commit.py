@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from payments_api.repositories.idempotency_cache import IdempotencyCache
+from payments_api.telemetry.metrics import GROUP_COMMIT_FLUSH_MS, GROUP_COMMIT_SIZE
+from payments_api.use_cases.create_payment_batch import CreatePaymentBatchUseCase
+from shared.contracts.models import (
+    AccountLockStrategy,
+    ConsistencyMode,
+    CreatePaymentRequest,
+    PaymentResponse,
+)
+from shared.utils.backoff import RetryPolicy
+
+
+@dataclass(frozen=True)
+class PendingPayment:
+    request: CreatePaymentRequest
+    result: Future[PaymentResponse] = field(default_factory=Future)
+
+
+@dataclass
+class CommitGroup:
+    items: list[PendingPayment] = field(default_factory=list)
+    closed: threading.Event = field(default_factory=threading.Event)
+
+
+class StrongGroupCommitter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        window_seconds: float,
+        max_batch: int,
+        idempotency_cache: IdempotencyCache | None = None,
+        lock_strategy: AccountLockStrategy = AccountLockStrategy.ORM,
+        conflict_retry: RetryPolicy | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.idempotency_cache = idempotency_cache
+        self.lock_strategy = lock_strategy
+        self.conflict_retry = conflict_retry
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open_groups: dict[str, CommitGroup] = {}
+
+    def submit(self, request: CreatePaymentRequest) -> PaymentResponse:
+        pending = PendingPayment(request=request)
+        source_id = request.source_account_id
+        with self._lock:
+            group = self._open_groups.get(source_id)
+            is_leader = group is None
+            if group is None:
+                group = CommitGroup()
+                self._open_groups[source_id] = group
+            group.items.append(pending)
+            if len(group.items) >= self.max_batch:
+                del self._open_groups[source_id]
+                group.closed.set()
+        if is_leader:
+            group.closed.wait(self.window_seconds)
+            with self._lock:
+                if self._open_groups.get(source_id) is group:
+                    del self._open_groups[source_id]
+            self._flush(group.items)
+        return pending.result.result()
+
+    def _flush(self, items: list[PendingPayment]) -> None:
+        GROUP_COMMIT_SIZE.observe(len(items))
+        started = time.perf_counter()
+        session = self.session_factory()
+        try:
+            use_case = CreatePaymentBatchUseCase(
+                session=session,
+                mode=ConsistencyMode.STRONG,
+                max_items=len(items),
+                idempotency_cache=self.idempotency_cache,
+                lock_strategy=self.lock_strategy,
+                conflict_retry=self.conflict_retry,
+            )
+            results = use_case.execute([item.request for item in items], traceparent=None)
+            for item, outcome in zip(items, results, strict=True):
+                if outcome.error is not None:
+                    item.result.set_exception(outcome.error)
+                elif outcome.response is not None:
+                    item.result.set_result(outcome.response)
+        except Exception as exc:
+            for item in items:
+                if not item.result.done():
+                    item.result.set_exception(exc)
+        finally:
+            session.close()
+            GROUP_COMMIT_FLUSH_MS.observe((time.perf_counter() - started) * 1000.0)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, ClassVar, Protocol
 
 from shared.contracts.models import (
     CreatePaymentRequest,
@@ -15,6 +15,8 @@ if TYPE_CHECKING:
 
 
 class PaymentModeStrategy(Protocol):
+    locks_accounts: ClassVar[bool]
+
     def execute(
         self,
         request: CreatePaymentRequest,
@@ -26,6 +28,7 @@ class PaymentModeStrategy(Protocol):
 @dataclass(frozen=True)
 class StrongModeStrategy:
     use_case: CreatePaymentUseCase
+    locks_accounts: ClassVar[bool] = True
 
     def execute(
         self,
@@ -34,14 +37,9 @@ class StrongModeStrategy:
         traceparent: str | None,
     ) -> PaymentResponse:
         del traceparent
-        source, destination = self.use_case._lock_accounts(
-            request.source_account_id, request.destination_account_id
+        self.use_case._transfer_available(
+            request.source_account_id, request.destination_account_id, request.amount_cents
         )
-        self.use_case._validate_funds(source, request.amount_cents)
-        source.available_balance_cents -= request.amount_cents
-        source.version += 1
-        destination.available_balance_cents += request.amount_cents
-        destination.version += 1
         payment_id = self.use_case._create_payment(request, request_hash, PaymentStatus.COMPLETED)
         self.use_case._add_ledger_entries(
             payment_id,
@@ -55,6 +53,7 @@ class StrongModeStrategy:
 @dataclass(frozen=True)
 class HybridModeStrategy:
     use_case: CreatePaymentUseCase
+    locks_accounts: ClassVar[bool] = True
 
     def execute(
         self,
@@ -62,11 +61,9 @@ class HybridModeStrategy:
         request_hash: str,
         traceparent: str | None,
     ) -> PaymentResponse:
-        source, _ = self.use_case._lock_accounts(request.source_account_id, request.destination_account_id)
-        self.use_case._validate_funds(source, request.amount_cents)
-        source.available_balance_cents -= request.amount_cents
-        source.reserved_balance_cents += request.amount_cents
-        source.version += 1
+        self.use_case._reserve_available(
+            request.source_account_id, request.destination_account_id, request.amount_cents
+        )
         payment_id = self.use_case._create_payment(request, request_hash, PaymentStatus.RESERVED)
         self.use_case._add_outbox(
             payment_id=payment_id,
@@ -80,6 +77,7 @@ class HybridModeStrategy:
 @dataclass(frozen=True)
 class EventualModeStrategy:
     use_case: CreatePaymentUseCase
+    locks_accounts: ClassVar[bool] = False
 
     def execute(
         self,
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+from enum import Enum
+
+from pydantic import ValidationError
+
+from payments_api.core.errors import DomainError
+from payments_api.use_cases.create_payment_batch import BatchItemResult, CreatePaymentBatchUseCase
+from shared.contracts.messages import DomainMessage
+from shared.contracts.models import CreatePaymentRequest, ErrorCode
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+IMPORT_CONTENT_TYPES: dict[str, ImportFormat] = {
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+    "text/csv": ImportFormat.CSV,
+}
+
+
+def import_format(content_type: str | None) -> ImportFormat:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    try:
+        return IMPORT_CONTENT_TYPES[media_type]
+    except KeyError:
+        raise DomainError(
+            error_code=ErrorCode.INVALID_PAYMENT,
+            message=f"{DomainMessage.UNSUPPORTED_IMPORT_FORMAT.value}: {media_type or 'missing'}",
+            http_status=415,
+        ) from None
+
+
+@dataclass(frozen=True)
+class ImportedLine:
+    number: int
+    idempotency_key: str | None = None
+    request: CreatePaymentRequest | None = None
+    result: BatchItemResult | None = None
+    error: DomainError | None = None
+
+
+def invalid_line(number: int, detail: str, idempotency_key: str | None = None) -> ImportedLine:
+    error = DomainError(
+        error_code=ErrorCode.INVALID_PAYMENT,
+        message=f"{DomainMessage.INVALID_IMPORT_LINE.value}: {detail}",
+        http_status=422,
+    )
+    return ImportedLine(number=number, idempotency_key=idempotency_key, error=error)
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    # Splits the body as it arrives; only the current partial line is buffered, and an
+    # over-long line is cut off and reported rather than accumulated. Each chunk is split
+    # once, so parsing stays linear in the body size however short the lines are.
+    buffer = b""
+    number = 0
+    discarding = False
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if discarding:
+                discarding = False
+                continue
+            yield number, line[:MAX_LINE_BYTES].decode("utf-8", errors="replace").rstrip("\r")
+        if len(buffer) > MAX_LINE_BYTES and not discarding:
+            yield number + 1, buffer[:MAX_LINE_BYTES].decode("utf-8", errors="replace")
+            discarding = True
+        if discarding:
+            buffer = b""
+    if buffer and not discarding:
+        yield number + 1, buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+class LineParser:
+    def __init__(self, import_format: ImportFormat) -> None:
+        self.import_format = import_format
+        self.header: list[str] | None = None
+
+    def parse(self, number: int, text: str) -> ImportedLine | None:
+        if number == 1:
+            text = text.removeprefix("\ufeff")
+        if not text.strip():
+            return None
+        if self.import_format is ImportFormat.NDJSON:
+            return self._parse_ndjson(number, text)
+        return self._parse_csv(number, text)
+
+    def _parse_ndjson(self, number: int, text: str) -> ImportedLine:
+        try:
+            request = CreatePaymentRequest.model_validate_json(text)
+        except ValidationError as exc:
+            return invalid_line(number, _first_error(exc))
+        return ImportedLine(number=number, idempotency_key=request.idempotency_key, request=request)
+
+    def _parse_csv(self, number: int, text: str) -> ImportedLine | None:
+        # One record per physical line: quoted fields may contain commas, not newlines.
+        values = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self.header):
+            return invalid_line(number, f"expected {len(self.header)} columns, got {len(values)}")
+        row = dict(zip(self.header, values, strict=True))
+        key = row.get("idempotency_key") or None
+        try:
+            request = CreatePaymentRequest.model_validate(row)
+        except ValidationError as exc:
+            return invalid_line(number, _first_error(exc), key)
+        return ImportedLine(number=number, idempotency_key=key, request=request)
+
+
+def _first_error(exc: ValidationError) -> str:
+    error = exc.errors(include_url=False)[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else str(error["msg"])
+
+
+class PaymentImportUseCase:
+    # Each chunk is one batch transaction (sorted account locks, one commit), so the
+    # cost of a file grows with its chunk count rather than its line count.
+    def __init__(self, batch: CreatePaymentBatchUseCase) -> None:
+        self.batch = batch
+
+    def apply_chunk(self, lines: list[ImportedLine], traceparent: str | None) -> list[ImportedLine]:
+        requests = [line.request for line in lines if line.request is not None]
+        if not requests:
+            return lines
+        try:
+            results = iter(self.batch.execute(requests, traceparent))
+        except DomainError as exc:
+            return self.fail_chunk(lines, exc)
+        return [line if line.request is None else replace(line, result=next(results)) for line in lines]
+
+    def fail_chunk(self, lines: list[ImportedLine], error: DomainError) -> list[ImportedLine]:
+        return [line if line.error is not None else replace(line, error=error) for line in lines]
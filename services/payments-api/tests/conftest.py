@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from pathlib import Path
 from typing import Iterator
@@ -7,7 +8,19 @@ from typing import Iterator
 import pytest
 from sqlalchemy import delete
 
-from payments_api.db.session import get_engine, get_session_factory
+from payments_api.api.dependencies import (
+    get_account_serializer,
+    get_admission_controller,
+    get_async_account_serializer,
+    get_group_committer,
+    get_idempotency_cache,
+)
+from payments_api.db.session import (
+    get_async_engine,
+    get_async_session_factory,
+    get_engine,
+    get_session_factory,
+)
 from shared.db import AccountORM, Base
 
 
@@ -28,6 +41,7 @@ def clean_environment(db_url: str) -> Iterator[None]:
         pass
     get_engine.cache_clear()
     get_session_factory.cache_clear()
+    _reset_async_engine()
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
     session_factory = get_session_factory()
@@ -52,3 +66,20 @@ def clean_environment(db_url: str) -> Iterator[None]:
         pass
     get_engine.cache_clear()
     get_session_factory.cache_clear()
+    _reset_async_engine()
+
+
+def _reset_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        asyncio.run(get_async_engine().dispose())
+    get_async_engine.cache_clear()
+    get_async_session_factory.cache_clear()
+    get_group_committer.cache_clear()
+    get_idempotency_cache.cache_clear()
+    if get_admission_controller.cache_info().currsize:
+        controller = get_admission_controller()
+        if controller is not None:
+            controller.stop()
+    get_admission_controller.cache_clear()
+    get_account_serializer.cache_clear()
+    get_async_account_serializer.cache_clear()
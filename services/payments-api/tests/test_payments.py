@@ -1,16 +1,80 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
 import subprocess
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import select
+from httpx import Response
+from prometheus_client import REGISTRY
+from sqlalchemy import ClauseElement, event, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
 
-from payments_api.db.session import get_session_factory
+from payments_api.api.dependencies import get_admission_controller
+from payments_api.core.errors import DomainError, OptimisticLockConflict
+from payments_api.db.idempotency_retention import (
+    IdempotencyPruner,
+    PruneResult,
+    partition_day,
+    partition_name,
+    run_pruning_loop,
+)
+from payments_api.db.session import (
+    IDEMPOTENCY_PARTITIONED,
+    get_async_session_factory,
+    get_engine,
+    get_session_factory,
+)
+from payments_api.repositories.accounts_repository import AccountsRepository
 from payments_api.main import create_app
+from payments_api.repositories.idempotency_cache import BloomFilter, IdempotencyCache
+from payments_api.repositories.idempotency_repository import IdempotencyRepository
+from payments_api.serve import worker_environment
+from payments_api.use_cases.account_serializer import AccountSerializer, AsyncAccountSerializer
+from payments_api.use_cases.admission_control import AdmissionController
+from payments_api.use_cases.create_payment import CreatePaymentUseCase
+from payments_api.use_cases.create_payment_async import AsyncCreatePaymentUseCase
+from payments_api.use_cases.create_payment_batch import CreatePaymentBatchUseCase
+from payments_api.use_cases.group_commit import StrongGroupCommitter
+from payments_api.use_cases.payment_import import MAX_LINE_BYTES, iter_text_lines
+from shared.contracts.event_codec import EventPayload, decode_event_payload, event_payload_to_json
 from shared.contracts.messages import DomainMessage
-from shared.contracts.models import ErrorCode, OutboxEventType, OutboxStatus, PaymentStatus
-from shared.db import AccountORM, IdempotencyKeyORM, LedgerEntryORM, OutboxEventORM, PaymentORM
+from shared.contracts.models import (
+    AccountLockStrategy,
+    BatchItemOutcome,
+    ConsistencyMode,
+    CreatePaymentRequest,
+    ErrorCode,
+    LedgerDirection,
+    OutboxEventType,
+    OutboxStatus,
+    PaymentMethod,
+    PaymentResponse,
+    PaymentStatus,
+)
+from shared.db import (
+    AccountBalance,
+    AccountORM,
+    IdempotencyKeyORM,
+    LedgerEntryORM,
+    OutboxEventORM,
+    PaymentORM,
+)
+from shared.db.append_only import OUTBOX_NOTIFY, AppendOnlyBuffer
+from shared.db.orm_models import utc_now
+from shared.utils.backoff import RetryPolicy
+from shared.utils.ids import TimeOrderedIdGenerator, id_timestamp_ms
+from shared.utils.partitions import outbox_partition_key
 
 
 def test_health() -> None:
@@ -78,6 +142,397 @@ def test_hybrid_mode_reservation_flow() -> None:
         assert source.reserved_balance_cents == 250
         assert payment.status == PaymentStatus.RESERVED.value
         assert outbox_event.event_type == OutboxEventType.PAYMENT_RESERVED.value
+        # Workers partition the outbox by source account.
+        assert outbox_event.partition_key == outbox_partition_key("acc-001")
+    finally:
+        session.close()
+
+
+def test_async_intake_strong_mode_and_replay() -> None:
+    os.environ["CONSISTENCY_MODE"] = "strong"
+    os.environ["PAYMENTS_INTAKE_MODE"] = "async"
+    try:
+        app = create_app()
+    finally:
+        os.environ.pop("PAYMENTS_INTAKE_MODE")
+    payload = {
+        "idempotency_key": "idem-async-0001",
+        "source_account_id": "acc-001",
+        "destination_account_id": "acc-002",
+        "amount_cents": 200,
+        "method": "pix",
+    }
+    with TestClient(app) as client:
+        first = client.post("/v1/payments", json=payload)
+        replay = client.post("/v1/payments", json=payload)
+        changed = client.post("/v1/payments", json={**payload, "amount_cents": 201})
+    assert first.status_code == 200
+    assert first.json()["status"] == PaymentStatus.COMPLETED.value
+    assert replay.json() == first.json()
+    assert changed.status_code == 409
+    assert changed.json()["error_code"] == ErrorCode.IDEMPOTENCY_CONFLICT.value
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        entries = list(session.scalars(select(LedgerEntryORM)))
+        assert source is not None
+        assert source.available_balance_cents == 800
+        assert len(entries) == 2
+    finally:
+        session.close()
+
+
+def test_batch_endpoint_reports_per_item_outcomes_in_one_transaction() -> None:
+    os.environ["CONSISTENCY_MODE"] = "strong"
+    app = create_app()
+    client = TestClient(app)
+
+    def item(key: str, source: str, destination: str, amount: int) -> dict[str, object]:
+        return {
+            "idempotency_key": key,
+            "source_account_id": source,
+            "destination_account_id": destination,
+            "amount_cents": amount,
+            "method": "pix",
+        }
+
+    existing = item("idem-batch-0000", "acc-003", "acc-004", 50)
+    assert client.post("/v1/payments", json=existing).status_code == 200
+    items = [
+        item("idem-batch-0001", "acc-001", "acc-002", 300),
+        item("idem-batch-0002", "acc-002", "acc-001", 100),
+        item("idem-batch-0001", "acc-001", "acc-002", 300),
+        item("idem-batch-0003", "acc-001", "acc-002", 5_000),
+        item("idem-batch-0001", "acc-001", "acc-002", 301),
+        existing,
+    ]
+    response = client.post("/v1/payments:batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["outcome"] for result in results] == [
+        BatchItemOutcome.CREATED.value,
+        BatchItemOutcome.CREATED.value,
+        BatchItemOutcome.REPLAYED.value,
+        BatchItemOutcome.REJECTED.value,
+        BatchItemOutcome.REJECTED.value,
+        BatchItemOutcome.REPLAYED.value,
+    ]
+    assert results[2]["payment"] == results[0]["payment"]
+    assert results[3]["error"]["error_code"] == ErrorCode.INSUFFICIENT_FUNDS.value
+    assert results[4]["error"]["error_code"] == ErrorCode.IDEMPOTENCY_CONFLICT.value
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-002"))
+        assert source is not None and destination is not None
+        assert source.available_balance_cents == 800
+        assert destination.available_balance_cents == 1_200
+        assert len(list(session.scalars(select(PaymentORM)))) == 3
+        assert len(list(session.scalars(select(IdempotencyKeyORM)))) == 3
+    finally:
+        session.close()
+
+    os.environ["PAYMENTS_BATCH_MAX_ITEMS"] = "2"
+    try:
+        too_large = client.post("/v1/payments:batch", json={"items": items[:3]})
+    finally:
+        os.environ.pop("PAYMENTS_BATCH_MAX_ITEMS")
+    assert too_large.status_code == 422
+    assert too_large.json()["message"].startswith(DomainMessage.BATCH_TOO_LARGE.value)
+
+
+def test_group_commit_applies_same_source_requests_in_one_transaction() -> None:
+    sessions_opened: list[int] = []
+
+    def counting_factory() -> Session:
+        sessions_opened.append(1)
+        return get_session_factory()()
+
+    committer = StrongGroupCommitter(counting_factory, window_seconds=0.2, max_batch=3)
+    requests = [
+        CreatePaymentRequest(
+            idempotency_key=f"idem-group-{index:04d}",
+            source_account_id="acc-001",
+            destination_account_id="acc-002",
+            amount_cents=amount,
+        )
+        for index, amount in enumerate([600, 300, 200])
+    ]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(committer.submit, request) for request in requests]
+    outcomes: list[str] = []
+    for future in futures:
+        try:
+            outcomes.append(future.result().status.value)
+        except DomainError as exc:
+            outcomes.append(exc.error_code.value)
+    assert sorted(outcomes) == sorted(
+        [PaymentStatus.COMPLETED.value, PaymentStatus.COMPLETED.value, ErrorCode.INSUFFICIENT_FUNDS.value]
+    )
+    assert len(sessions_opened) == 1
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert 0 <= source.available_balance_cents < 1_000
+        assert len(list(session.scalars(select(PaymentORM)))) == 2
+    finally:
+        session.close()
+
+
+def test_group_commit_route_in_strong_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CONSISTENCY_MODE", "strong")
+    monkeypatch.setenv("STRONG_GROUP_COMMIT", "1")
+    monkeypatch.setenv("GROUP_COMMIT_WINDOW_MS", "1")
+    client = TestClient(create_app())
+    payload = {
+        "idempotency_key": "idem-group-route-0001",
+        "source_account_id": "acc-001",
+        "destination_account_id": "acc-002",
+        "amount_cents": 5_000,
+        "method": "pix",
+    }
+    rejected = client.post("/v1/payments", json=payload)
+    assert rejected.status_code == 422
+    assert rejected.json()["error_code"] == ErrorCode.INSUFFICIENT_FUNDS.value
+    accepted = client.post("/v1/payments", json={**payload, "amount_cents": 100})
+    assert accepted.status_code == 200
+    assert accepted.json()["status"] == PaymentStatus.COMPLETED.value
+
+
+@pytest.mark.parametrize("mode", ["strong", "hybrid"])
+def test_lean_lock_strategy_matches_orm_balances(monkeypatch: pytest.MonkeyPatch, mode: str) -> None:
+    monkeypatch.setenv("CONSISTENCY_MODE", mode)
+    monkeypatch.setenv("ACCOUNT_LOCK_STRATEGY", "lean")
+    client = TestClient(create_app())
+    payload = {
+        "idempotency_key": f"idem-lean-{mode}-0001",
+        "source_account_id": "acc-003",
+        "destination_account_id": "acc-001",
+        "amount_cents": 400,
+        "method": "pix",
+    }
+    assert client.post("/v1/payments", json=payload).status_code == 200
+    overdraft = client.post(
+        "/v1/payments",
+        json={**payload, "idempotency_key": f"idem-lean-{mode}-0002", "amount_cents": 700},
+    )
+    assert overdraft.status_code == 422
+    assert overdraft.json()["error_code"] == ErrorCode.INSUFFICIENT_FUNDS.value
+    missing = client.post(
+        "/v1/payments",
+        json={**payload, "idempotency_key": f"idem-lean-{mode}-0003", "source_account_id": "acc-404"},
+    )
+    assert missing.status_code == 422
+    assert missing.json()["message"] == DomainMessage.ACCOUNT_NOT_FOUND.value
+    batch = client.post(
+        "/v1/payments:batch",
+        json={
+            "items": [
+                {**payload, "idempotency_key": f"idem-lean-{mode}-0004", "amount_cents": 500},
+                {**payload, "idempotency_key": f"idem-lean-{mode}-0005", "amount_cents": 200},
+            ]
+        },
+    )
+    assert [item["outcome"] for item in batch.json()["results"]] == [
+        BatchItemOutcome.CREATED.value,
+        BatchItemOutcome.REJECTED.value,
+    ]
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-003"))
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None and destination is not None
+        assert source.available_balance_cents == 100
+        assert source.version == 2
+        if mode == "strong":
+            assert destination.available_balance_cents == 1_900
+        else:
+            assert source.reserved_balance_cents == 900
+            assert destination.available_balance_cents == 1_000
+    finally:
+        session.close()
+
+
+def test_optimistic_strategy_retries_after_a_concurrent_version_bump(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    original_read = AccountsRepository.read_balances
+    original_claim = IdempotencyRepository.claim
+    bumps_left = [1]
+    stale_reads: list[dict[str, AccountBalance]] = []
+
+    def claim_after_concurrent_bump(self: IdempotencyRepository, key: str, request_hash: str) -> bool:
+        if bumps_left[0] > 0:
+            bumps_left[0] -= 1
+            # The payment's balance read lands before another connection commits a version
+            # bump. Both happen before the claim: SQLite admits no second writer after it.
+            stale_reads.append(original_read(AccountsRepository(self.session), {"acc-001", "acc-002"}))
+            with get_engine().begin() as connection:
+                connection.execute(
+                    update(AccountORM).where(AccountORM.id == "acc-001").values(version=AccountORM.version + 1)
+                )
+        return original_claim(self, key, request_hash)
+
+    def read_stale(self: AccountsRepository, account_ids: set[str]) -> dict[str, AccountBalance]:
+        return stale_reads.pop() if stale_reads else original_read(self, account_ids)
+
+    monkeypatch.setattr(IdempotencyRepository, "claim", claim_after_concurrent_bump)
+    monkeypatch.setattr(AccountsRepository, "read_balances", read_stale)
+    conflicts_before = REGISTRY.get_sample_value("optimistic_lock_conflict_total") or 0.0
+    request = CreatePaymentRequest(
+        idempotency_key="idem-occ-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=250,
+    )
+    session = get_session_factory()()
+    try:
+        use_case = CreatePaymentUseCase(
+            session,
+            ConsistencyMode.STRONG,
+            lock_strategy=AccountLockStrategy.OPTIMISTIC,
+            conflict_retry=RetryPolicy(max_attempts=2, base_delay_seconds=0.0),
+        )
+        assert use_case.execute(request, traceparent=None).status == PaymentStatus.COMPLETED
+        assert REGISTRY.get_sample_value("optimistic_lock_conflict_total") == conflicts_before + 1
+
+        bumps_left[0] = 2
+        with pytest.raises(DomainError) as exhausted:
+            use_case.execute(request.model_copy(update={"idempotency_key": "idem-occ-0002"}), None)
+        assert exhausted.value.error_code == ErrorCode.CONCURRENCY_CONFLICT
+        assert exhausted.value.http_status == 503
+
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        destination = session.scalar(select(AccountORM).where(AccountORM.id == "acc-002"))
+        assert source is not None and destination is not None
+        assert source.available_balance_cents == 750
+        assert source.version == 4
+        assert destination.available_balance_cents == 1_250
+    finally:
+        session.close()
+
+
+def test_conflict_retry_backs_off_through_the_supplied_sleep() -> None:
+    attempts: list[int] = []
+    delays: list[float] = []
+
+    def conflict_twice() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OptimisticLockConflict("acc-001")
+        return "done"
+
+    session = get_session_factory()()
+    try:
+        use_case = CreatePaymentUseCase(
+            session,
+            ConsistencyMode.STRONG,
+            conflict_retry=RetryPolicy(max_attempts=3, base_delay_seconds=0.001),
+        )
+        assert use_case.retry_on_conflict(conflict_twice, sleep=delays.append) == "done"
+        assert len(delays) == 2
+        assert all(0.0 <= delay <= 0.002 for delay in delays)
+        with pytest.raises(DomainError) as exhausted:
+            use_case.conflict_backoff(3, OptimisticLockConflict("acc-001"))
+        assert exhausted.value.error_code == ErrorCode.CONCURRENCY_CONFLICT
+    finally:
+        session.close()
+
+
+def test_async_intake_awaits_the_optimistic_conflict_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    original_read = AccountsRepository.read_balances
+    original_claim = IdempotencyRepository.claim
+    original_sleep = asyncio.sleep
+    stale_reads: list[dict[str, AccountBalance]] = []
+    awaited: list[float] = []
+
+    def claim_after_concurrent_bump(self: IdempotencyRepository, key: str, request_hash: str) -> bool:
+        if not awaited and not stale_reads:
+            stale_reads.append(original_read(AccountsRepository(self.session), {"acc-001", "acc-002"}))
+            with get_engine().begin() as connection:
+                connection.execute(
+                    update(AccountORM).where(AccountORM.id == "acc-001").values(version=AccountORM.version + 1)
+                )
+        return original_claim(self, key, request_hash)
+
+    def read_stale(self: AccountsRepository, account_ids: set[str]) -> dict[str, AccountBalance]:
+        return stale_reads.pop() if stale_reads else original_read(self, account_ids)
+
+    def blocking_sleep(_seconds: float) -> None:
+        raise AssertionError("the async intake must not block the event loop")
+
+    async def recording_sleep(seconds: float) -> None:
+        awaited.append(seconds)
+        await original_sleep(0)
+
+    monkeypatch.setattr(IdempotencyRepository, "claim", claim_after_concurrent_bump)
+    monkeypatch.setattr(AccountsRepository, "read_balances", read_stale)
+    monkeypatch.setattr(time, "sleep", blocking_sleep)
+    monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+    conflicts_before = REGISTRY.get_sample_value("optimistic_lock_conflict_total") or 0.0
+    request = CreatePaymentRequest(
+        idempotency_key="idem-occ-async-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=250,
+    )
+
+    async def run() -> PaymentResponse:
+        async with get_async_session_factory()() as session:
+            use_case = AsyncCreatePaymentUseCase(
+                session,
+                ConsistencyMode.STRONG,
+                lock_strategy=AccountLockStrategy.OPTIMISTIC,
+                conflict_retry=RetryPolicy(max_attempts=2, base_delay_seconds=0.0),
+            )
+            return await use_case.execute(request, traceparent=None)
+
+    assert asyncio.run(run()).status == PaymentStatus.COMPLETED
+    assert awaited == [0.0]
+    assert REGISTRY.get_sample_value("optimistic_lock_conflict_total") == conflicts_before + 1
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert source.available_balance_cents == 750
+        assert source.version == 2
+    finally:
+        session.close()
+
+
+def test_optimistic_batch_takes_no_account_locks(monkeypatch: pytest.MonkeyPatch) -> None:
+    def no_locks(self: AccountsRepository, account_ids: object) -> None:
+        raise AssertionError("optimistic strategy must not lock accounts")
+
+    monkeypatch.setattr(AccountsRepository, "get_many_for_update", no_locks)
+    monkeypatch.setattr(AccountsRepository, "get_for_update", no_locks)
+    monkeypatch.setattr(AccountsRepository, "lock_balances", no_locks)
+    requests = [
+        CreatePaymentRequest(
+            idempotency_key=f"idem-occ-batch-{index}",
+            source_account_id="acc-001",
+            destination_account_id="acc-002",
+            amount_cents=100,
+        )
+        for index in range(3)
+    ]
+    session = get_session_factory()()
+    try:
+        batch = CreatePaymentBatchUseCase(
+            session, ConsistencyMode.STRONG, max_items=10, lock_strategy=AccountLockStrategy.OPTIMISTIC
+        )
+        results = batch.execute(requests, traceparent=None)
+        assert [item.error for item in results] == [None, None, None]
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert source.available_balance_cents == 700
+        assert source.version == 3
     finally:
         session.close()
 
@@ -161,6 +616,152 @@ def test_idempotency_hit_returns_stored_response() -> None:
         session.close()
 
 
+def test_idempotency_cache_replays_committed_keys_without_the_database() -> None:
+    cache = IdempotencyCache(max_entries=1)
+    request = CreatePaymentRequest(
+        idempotency_key="idem-cache-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=120,
+    )
+    session = get_session_factory()()
+    try:
+        use_case = CreatePaymentUseCase(session, ConsistencyMode.HYBRID, idempotency_cache=cache)
+        first = use_case.execute(request, traceparent=None)
+        with session.begin():
+            session.query(IdempotencyKeyORM).delete()
+        assert use_case.execute(request, traceparent=None) == first
+        with pytest.raises(DomainError) as conflict:
+            use_case.execute(request.model_copy(update={"amount_cents": 121}), traceparent=None)
+        assert conflict.value.error_code == ErrorCode.IDEMPOTENCY_CONFLICT
+
+        cache.put("idem-cache-0002", "hash", first.model_dump_json())
+        assert cache.get("idem-cache-0001") is None
+        assert len(cache) == 1
+    finally:
+        session.close()
+
+    bloom = BloomFilter(capacity=100)
+    bloom.add("idem-cache-0001")
+    assert bloom.might_contain("idem-cache-0001")
+    assert not any(bloom.might_contain(f"idem-unseen-{index}") for index in range(20))
+
+
+def test_idempotency_cache_keeps_cached_keys_across_a_bloom_rollover() -> None:
+    cache = IdempotencyCache(max_entries=3, bloom_capacity=6)
+    for index in range(7):
+        cache.put(f"idem-roll-{index}", "v2:hash", f'{{"index": {index}}}')
+    # The seventh insert crossed the bloom capacity; the keys the LRU still holds
+    # must keep hitting while evicted ones stay misses.
+    for index in (4, 5, 6):
+        entry = cache.get(f"idem-roll-{index}")
+        assert entry is not None
+        assert entry.response_payload_json == f'{{"index": {index}}}'
+    assert cache.get("idem-roll-0") is None
+    assert len(cache) == 3
+
+
+def test_request_hash_v2_scheme_and_legacy_keys_still_replay() -> None:
+    request = CreatePaymentRequest(
+        idempotency_key="idem-legacy-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=130,
+    )
+    request_hash = request.compute_request_hash()
+    assert request_hash.startswith("v2:") and len(request_hash) == 35
+    assert request_hash != request.model_copy(update={"amount_cents": 131}).compute_request_hash()
+    assert request_hash != request.model_copy(update={"method": PaymentMethod.TED}).compute_request_hash()
+
+    stored = PaymentResponse(payment_id="pay-legacy-0001", status=PaymentStatus.COMPLETED)
+    session = get_session_factory()()
+    try:
+        with session.begin():
+            session.add(
+                IdempotencyKeyORM(
+                    key=request.idempotency_key,
+                    request_hash=request.compute_legacy_request_hash(),
+                    response_payload_json=stored.model_dump_json(),
+                )
+            )
+        use_case = CreatePaymentUseCase(session, ConsistencyMode.HYBRID)
+        assert use_case.execute(request, traceparent=None) == stored
+        with pytest.raises(DomainError) as conflict:
+            use_case.execute(request.model_copy(update={"amount_cents": 131}), traceparent=None)
+        assert conflict.value.error_code == ErrorCode.IDEMPOTENCY_CONFLICT
+    finally:
+        session.close()
+
+
+def test_replay_returns_stored_bytes_without_pydantic_round_trip(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = TestClient(create_app())
+    payload = {
+        "idempotency_key": "idem-raw-0001",
+        "source_account_id": "acc-001",
+        "destination_account_id": "acc-002",
+        "amount_cents": 140,
+        "method": "pix",
+    }
+    first = client.post("/v1/payments", json=payload)
+
+    def fail_parse(*_args: object, **_kwargs: object) -> PaymentResponse:
+        raise AssertionError("replay must not parse the stored response")
+
+    monkeypatch.setattr(PaymentResponse, "model_validate_json", fail_parse)
+    replay = client.post("/v1/payments", json=payload)
+    assert first.status_code == replay.status_code == 200
+    assert replay.headers["content-type"] == "application/json"
+
+    session = get_session_factory()()
+    try:
+        stored = session.scalar(select(IdempotencyKeyORM).where(IdempotencyKeyORM.key == "idem-raw-0001"))
+        assert stored is not None
+        assert first.content == replay.content == stored.response_payload_json.encode("utf-8")
+    finally:
+        session.close()
+
+
+def test_replays_skip_the_write_path_and_lost_claims_replay_the_winner(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    request = CreatePaymentRequest(
+        idempotency_key="idem-claim-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=150,
+    )
+    winner = PaymentResponse(payment_id="pay-claim-winner", status=PaymentStatus.RESERVED)
+    original_claim = IdempotencyRepository.claim
+
+    def claim_after_concurrent_winner(self: IdempotencyRepository, key: str, request_hash: str) -> bool:
+        with get_session_factory()() as other, other.begin():
+            other.add(
+                IdempotencyKeyORM(
+                    key=key, request_hash=request_hash, response_payload_json=winner.model_dump_json()
+                )
+            )
+        return original_claim(self, key, request_hash)
+
+    def fail_mode(*_args: object) -> PaymentResponse:
+        raise AssertionError("the losing duplicate must not run the mode strategy")
+
+    monkeypatch.setattr(IdempotencyRepository, "claim", claim_after_concurrent_winner)
+    monkeypatch.setattr(CreatePaymentUseCase, "execute_mode", fail_mode)
+    session = get_session_factory()()
+    try:
+        use_case = CreatePaymentUseCase(session, ConsistencyMode.HYBRID)
+        assert use_case.execute(request, traceparent=None) == winner
+        monkeypatch.setattr(IdempotencyRepository, "claim", original_claim)
+        assert use_case.execute(request, traceparent=None) == winner
+        assert not session.in_transaction()
+        assert original_claim(IdempotencyRepository(session), request.idempotency_key, "hash") is False
+        session.rollback()
+    finally:
+        session.close()
+
+
 def test_idempotency_conflict_returns_409() -> None:
     os.environ["CONSISTENCY_MODE"] = "hybrid"
     app = create_app()
@@ -236,3 +837,560 @@ def test_internal_stats_for_eventual_pending_outbox_and_negative_balance() -> No
 
     second_stats = client.get("/internal/stats").json()
     assert second_stats["negative_balance_detected"] == 1
+
+
+def test_idempotency_retention_deletes_expired_keys_without_partitions() -> None:
+    os.environ["IDEMPOTENCY_RETENTION_DAYS"] = "7"
+    try:
+        get_session_factory.cache_clear()
+        now = utc_now()
+        session = get_session_factory()()
+        assert session.info[IDEMPOTENCY_PARTITIONED] is False
+        try:
+            with session.begin():
+                session.add_all(
+                    [
+                        IdempotencyKeyORM(
+                            key="idem-retention-expired",
+                            request_hash="v2:expired",
+                            response_payload_json="{}",
+                            created_at=now - timedelta(days=8),
+                        ),
+                        IdempotencyKeyORM(
+                            key="idem-retention-recent",
+                            request_hash="v2:recent",
+                            response_payload_json="{}",
+                            created_at=now - timedelta(days=6),
+                        ),
+                    ]
+                )
+        finally:
+            session.close()
+
+        pruner = IdempotencyPruner(engine=get_engine(), retention_days=7, partitions_ahead=3)
+        assert pruner.run_once(now=now) == PruneResult(deleted_rows=1)
+        disabled = IdempotencyPruner(engine=get_engine(), retention_days=0, partitions_ahead=3)
+        assert disabled.run_once(now=now + timedelta(days=30)) == PruneResult()
+
+        session = get_session_factory()()
+        try:
+            remaining = session.scalars(select(IdempotencyKeyORM.key)).all()
+        finally:
+            session.close()
+        assert remaining == ["idem-retention-recent"]
+        assert partition_name(now.date()) == f"idempotency_keys_p{now:%Y%m%d}"
+        assert partition_day(partition_name(now.date())) == now.date()
+        assert partition_day("idempotency_keys_default") is None
+    finally:
+        os.environ.pop("IDEMPOTENCY_RETENTION_DAYS", None)
+        get_session_factory.cache_clear()
+
+
+def test_retry_after_idempotency_pruning_is_a_deterministic_conflict() -> None:
+    request = CreatePaymentRequest(
+        idempotency_key="idem-pruned-0001",
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=100,
+    )
+    session = get_session_factory()()
+    try:
+        use_case = CreatePaymentUseCase(session, ConsistencyMode.STRONG)
+        assert use_case.execute(request, traceparent=None).status == PaymentStatus.COMPLETED
+        pruner = IdempotencyPruner(engine=get_engine(), retention_days=7, partitions_ahead=3)
+        assert pruner.run_once(now=utc_now() + timedelta(days=8)) == PruneResult(deleted_rows=1)
+
+        # The payment row still holds the key, so the retry is refused, not raced forever.
+        with pytest.raises(DomainError) as expired:
+            use_case.execute(request, traceparent=None)
+        assert expired.value.error_code == ErrorCode.IDEMPOTENCY_CONFLICT
+        assert expired.value.http_status == 409
+        assert expired.value.message == DomainMessage.IDEMPOTENCY_EXPIRED.value
+
+        fresh = request.model_copy(update={"idempotency_key": "idem-pruned-0002"})
+        batch = CreatePaymentBatchUseCase(session, ConsistencyMode.STRONG, max_items=10)
+        results = batch.execute([request, fresh], traceparent=None)
+        assert results[0].error is not None
+        assert results[0].error.http_status == 409
+        assert results[1].response is not None
+        assert results[1].response.status == PaymentStatus.COMPLETED
+
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert source.available_balance_cents == 800
+    finally:
+        session.close()
+
+
+def test_pruning_loop_logs_and_counts_failed_passes(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    class StopLoop(Exception):
+        pass
+
+    class FailingPruner(IdempotencyPruner):
+        def run_once(self, now: object = None) -> PruneResult:
+            raise RuntimeError("partition ddl failed")
+
+    async def stop_sleep(_seconds: float) -> None:
+        raise StopLoop()
+
+    failures_before = REGISTRY.get_sample_value("idempotency_prune_failures_total") or 0.0
+    monkeypatch.setattr(asyncio, "sleep", stop_sleep)
+    pruner = FailingPruner(engine=get_engine(), retention_days=7, partitions_ahead=3)
+    with caplog.at_level("ERROR", logger="payments_api.db.idempotency_retention"):
+        with pytest.raises(StopLoop):
+            asyncio.run(run_pruning_loop(pruner, 60.0))
+    assert REGISTRY.get_sample_value("idempotency_prune_failures_total") == failures_before + 1
+    assert "idempotency retention pass failed" in caplog.text
+    assert "partition ddl failed" in caplog.text
+
+
+def test_outbox_payload_format_binary_round_trips_to_the_json_contract() -> None:
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["OUTBOX_PAYLOAD_FORMAT"] = "binary"
+    try:
+        get_session_factory.cache_clear()
+        client = TestClient(create_app())
+        response = client.post(
+            "/v1/payments",
+            json={
+                "idempotency_key": "idem-binary-outbox-0001",
+                "source_account_id": "acc-001",
+                "destination_account_id": "acc-002",
+                "amount_cents": 125,
+                "method": "pix",
+            },
+        )
+        assert response.status_code == 200
+        payment_id = response.json()["payment_id"]
+        session = get_session_factory()()
+        try:
+            event = session.scalar(select(OutboxEventORM))
+        finally:
+            session.close()
+    finally:
+        os.environ.pop("OUTBOX_PAYLOAD_FORMAT", None)
+        get_session_factory.cache_clear()
+
+    assert event is not None and event.payload_json is None and event.payload_bin is not None
+    payload = decode_event_payload(event.payload_bin)
+    assert payload == EventPayload(
+        payment_id=payment_id,
+        source_account_id="acc-001",
+        destination_account_id="acc-002",
+        amount_cents=125,
+        traceparent=payload.traceparent,
+    )
+    assert len(event.payload_bin) < len(event_payload_to_json(payload).encode("utf-8"))
+
+
+def test_time_ordered_ids_stay_monotonic_across_sequence_overflow_and_clock_steps() -> None:
+    ticks = iter([5_000_000, 5_000_000, 4_000_000] + [5_000_000] * 4_096)
+    generator = TimeOrderedIdGenerator(
+        clock_ns=lambda: next(ticks), random_bits=lambda bits: (1 << bits) - 1
+    )
+    ids = [generator.new_hex() for _ in range(4_099)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    first = int(ids[0], 16)
+    assert first >> 80 == 5
+    assert (first >> 76) & 0xF == 7
+    assert (first >> 62) & 0b11 == 0b10
+    # The 12-bit sequence started at 2047 and overflowed into the next millisecond.
+    assert int(ids[-1], 16) >> 80 == 6
+
+    client = TestClient(create_app())
+    created = [
+        client.post(
+            "/v1/payments",
+            json={
+                "idempotency_key": f"idem-ordered-id-{index:04d}",
+                "source_account_id": "acc-001",
+                "destination_account_id": "acc-002",
+                "amount_cents": 10,
+                "method": "pix",
+            },
+        ).json()["payment_id"]
+        for index in range(3)
+    ]
+    assert created == sorted(created)
+    assert all(payment_id.startswith("pay-") and len(payment_id) == 36 for payment_id in created)
+    assert abs(id_timestamp_ms(created[0]) - utc_now().timestamp() * 1000) < 60_000
+
+
+def test_append_only_rows_are_written_with_one_insert_per_table_per_transaction() -> None:
+    os.environ["CONSISTENCY_MODE"] = "strong"
+    client = TestClient(create_app())
+    items = [
+        {
+            "idempotency_key": f"idem-bulk-rows-{index:04d}",
+            "source_account_id": "acc-001",
+            "destination_account_id": "acc-002",
+            "amount_cents": 10,
+            "method": "pix",
+        }
+        for index in range(4)
+    ]
+    statements: list[str] = []
+
+    def record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        response = client.post("/v1/payments:batch", json={"items": items})
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert len([sql for sql in statements if sql.startswith("INSERT INTO ledger_entries")]) == 1
+
+    session = get_session_factory()()
+    try:
+        entries = list(session.scalars(select(LedgerEntryORM)))
+    finally:
+        session.close()
+    assert len(entries) == 8
+    assert sum(entry.amount_cents for entry in entries if entry.direction == LedgerDirection.DEBIT.value) == 40
+    assert len({entry.payment_id for entry in entries}) == 4
+
+
+def test_admission_control_delays_then_sheds_with_retry_after() -> None:
+    now = [0.0]
+    backlog = [0]
+    controller = AdmissionController(
+        backlog_source=lambda: backlog[0],
+        delay_backlog=100,
+        shed_backlog=300,
+        max_delay_seconds=0.05,
+        refresh_interval_seconds=1.0,
+        clock=lambda: now[0],
+    )
+    assert controller.admit() == 0.0
+    backlog[0] = 200
+    controller.refresh()
+    assert controller.admit() == pytest.approx(0.025)
+
+    now[0] = 1.0
+    backlog[0] = 500
+    controller.refresh()
+    with pytest.raises(DomainError) as rising:
+        controller.admit()
+    # Backlog is still growing, so there is no drain rate to estimate from.
+    assert rising.value.http_status == 429
+    assert rising.value.retry_after_seconds == controller.max_retry_after_seconds
+
+    now[0] = 2.0
+    backlog[0] = 400
+    controller.refresh()
+    with pytest.raises(DomainError) as draining:
+        controller.admit()
+    assert draining.value.error_code is ErrorCode.OVERLOADED
+    assert draining.value.retry_after_seconds == 15
+    now[0] = 20.0
+    assert controller.admit() == 0.0
+
+    os.environ["CONSISTENCY_MODE"] = "eventual"
+    os.environ["ADMISSION_CONTROL"] = "1"
+    os.environ["ADMISSION_DELAY_BACKLOG"] = "0"
+    os.environ["ADMISSION_SHED_BACKLOG"] = "1"
+    os.environ["ADMISSION_REFRESH_MS"] = "60000"
+    try:
+        get_admission_controller.cache_clear()
+        client = TestClient(create_app())
+
+        def pay(key: str) -> Response:
+            return client.post(
+                "/v1/payments",
+                json={
+                    "idempotency_key": key,
+                    "source_account_id": "acc-001",
+                    "destination_account_id": "acc-002",
+                    "amount_cents": 10,
+                    "method": "pix",
+                },
+            )
+
+        assert pay("idem-admission-0001").status_code == 200
+        live = get_admission_controller()
+        assert live is not None
+        assert live.refresh() == 1
+        shed = pay("idem-admission-0002")
+        assert shed.status_code == 429
+        assert shed.json()["error_code"] == ErrorCode.OVERLOADED.value
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert REGISTRY.get_sample_value("payments_admission_outbox_backlog") == 1.0
+        live.stop()
+    finally:
+        for name in [
+            "ADMISSION_CONTROL",
+            "ADMISSION_DELAY_BACKLOG",
+            "ADMISSION_SHED_BACKLOG",
+            "ADMISSION_REFRESH_MS",
+        ]:
+            os.environ.pop(name, None)
+
+
+def test_account_serializer_orders_same_pair_and_exposes_queue_metrics() -> None:
+    serializer = AccountSerializer()
+    inside: list[int] = []
+    overlaps: list[int] = []
+    guard = threading.Lock()
+
+    def run(pair: tuple[str, str]) -> None:
+        with serializer.hold(pair):
+            with guard:
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(len(inside))
+            time.sleep(0.002)
+            with guard:
+                inside.pop()
+
+    pairs = [("acc-serial-a", "acc-serial-b"), ("acc-serial-b", "acc-serial-a")] * 10
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(run, pairs))
+    assert overlaps == []
+    assert serializer.depth("acc-serial-a") == 0
+    assert REGISTRY.get_sample_value(
+        "payments_account_queue_depth", {"account_id": "acc-serial-a"}
+    ) == 0.0
+    assert REGISTRY.get_sample_value(
+        "payments_account_queue_wait_ms_count", {"account_id": "acc-serial-b"}
+    ) == 20.0
+
+    async def run_async() -> list[str]:
+        async_serializer = AsyncAccountSerializer()
+        order: list[str] = []
+
+        async def hold(name: str) -> None:
+            async with async_serializer.hold(["acc-serial-c", "acc-serial-d"]):
+                order.append(f"{name}-in")
+                await asyncio.sleep(0)
+                order.append(f"{name}-out")
+
+        await asyncio.gather(hold("first"), hold("second"))
+        return order
+
+    assert asyncio.run(run_async()) == ["first-in", "first-out", "second-in", "second-out"]
+
+    # Past the waiter cap a request fails fast instead of blocking another thread.
+    capped = AccountSerializer(max_waiters=1)
+    release = threading.Event()
+    holding = threading.Event()
+
+    def hold_until_released() -> None:
+        with capped.hold(["acc-serial-e"]):
+            holding.set()
+            release.wait(timeout=5)
+
+    def wait_in_queue() -> None:
+        with capped.hold(["acc-serial-e"]):
+            pass
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        held = pool.submit(hold_until_released)
+        assert holding.wait(timeout=5)
+        queued = pool.submit(wait_in_queue)
+        while capped.depth("acc-serial-e") < 2:
+            time.sleep(0.001)
+        with pytest.raises(DomainError) as full:
+            with capped.hold(["acc-serial-f", "acc-serial-e"]):
+                pass
+        release.set()
+        held.result()
+        queued.result()
+    assert full.value.http_status == 429
+    assert full.value.error_code == ErrorCode.OVERLOADED
+    assert capped.depth("acc-serial-f") == 0
+    assert REGISTRY.get_sample_value(
+        "payments_account_queue_rejected_total", {"account_id": "acc-serial-e"}
+    ) == 1.0
+
+    os.environ["ACCOUNT_SERIALIZATION"] = "1"
+    try:
+        client = TestClient(create_app())
+        response = client.post(
+            "/v1/payments",
+            json={
+                "idempotency_key": "idem-serialized-0001",
+                "source_account_id": "acc-001",
+                "destination_account_id": "acc-002",
+                "amount_cents": 10,
+                "method": "pix",
+            },
+        )
+        assert response.status_code == 200
+        assert REGISTRY.get_sample_value(
+            "payments_account_queue_wait_ms_count", {"account_id": "acc-002"}
+        ) is not None
+    finally:
+        os.environ.pop("ACCOUNT_SERIALIZATION", None)
+
+
+def test_multiprocess_metrics_aggregate_across_api_workers(tmp_path: Path) -> None:
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "counter_999.db").write_bytes(b"stale")
+    env = worker_environment(4, 32, {"PROMETHEUS_MULTIPROC_DIR": str(metrics_dir)})
+    assert env == {
+        "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir),
+        "DB_POOL_SIZE": "8",
+        "DB_MAX_OVERFLOW": "0",
+    }
+    assert list(metrics_dir.iterdir()) == []
+    assert worker_environment(1, 0, {}) == {}
+
+    worker_env = {**os.environ, **env}
+    record = (
+        "import sys; from payments_api.telemetry.metrics import "
+        "ADMISSION_BACKLOG, PAYMENTS_RECEIVED, REQUEST_LATENCY_MS; "
+        "PAYMENTS_RECEIVED.inc(); REQUEST_LATENCY_MS.observe(float(sys.argv[1])); "
+        "ADMISSION_BACKLOG.set(float(sys.argv[1]))"
+    )
+    for latency in ("7", "30"):
+        subprocess.run([sys.executable, "-c", record, latency], env=worker_env, check=True)
+    scrape = (
+        "from prometheus_client import generate_latest; "
+        "from payments_api.telemetry.metrics import scrape_registry; "
+        "print(generate_latest(scrape_registry()).decode())"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], env=worker_env, check=True, capture_output=True, text=True
+    ).stdout
+    assert "payments_received_total 2.0" in output
+    assert "payments_request_latency_ms_count 2.0" in output
+    assert 'payments_request_latency_ms_bucket{le="10.0"} 1.0' in output
+    assert "payments_admission_outbox_backlog 30.0" in output
+
+
+def test_import_endpoint_streams_per_line_results_in_chunks() -> None:
+    os.environ["CONSISTENCY_MODE"] = "strong"
+    os.environ["PAYMENTS_IMPORT_CHUNK_SIZE"] = "2"
+    try:
+        client = TestClient(create_app())
+
+        def line(key: str, amount: int) -> str:
+            return json.dumps(
+                {
+                    "idempotency_key": key,
+                    "source_account_id": "acc-001",
+                    "destination_account_id": "acc-002",
+                    "amount_cents": amount,
+                }
+            )
+
+        body = "\n".join(
+            [
+                line("idem-import-0001", 100),
+                "",
+                "{not json",
+                line("idem-import-0002", 200),
+                line("idem-import-0001", 100),
+                line("idem-import-0003", 0),
+                line("idem-import-0004", 5_000),
+            ]
+        )
+        response = client.post(
+            "/v1/payments:import",
+            content=body.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = [json.loads(item) for item in response.text.splitlines()]
+        assert [(item["line"], item["outcome"]) for item in results] == [
+            (1, BatchItemOutcome.CREATED.value),
+            (3, BatchItemOutcome.REJECTED.value),
+            (4, BatchItemOutcome.CREATED.value),
+            (5, BatchItemOutcome.REPLAYED.value),
+            (6, BatchItemOutcome.REJECTED.value),
+            (7, BatchItemOutcome.REJECTED.value),
+        ]
+        assert results[3]["payment"] == results[0]["payment"]
+        assert results[1]["idempotency_key"] is None
+        assert results[4]["error"]["message"].startswith(DomainMessage.INVALID_IMPORT_LINE.value)
+        assert results[5]["error"]["error_code"] == ErrorCode.INSUFFICIENT_FUNDS.value
+        assert REGISTRY.get_sample_value("payments_import_chunk_ms_count") is not None
+
+        csv_body = (
+            "idempotency_key,source_account_id,destination_account_id,amount_cents,method\r\n"
+            "idem-import-0005,acc-002,acc-001,50,pix\r\n"
+            "idem-import-0006,acc-002,acc-001\r\n"
+        )
+        csv_response = client.post(
+            "/v1/payments:import",
+            content=csv_body.encode(),
+            headers={"Content-Type": "text/csv; charset=utf-8"},
+        )
+        csv_results = [json.loads(item) for item in csv_response.text.splitlines()]
+        assert [(item["line"], item["outcome"]) for item in csv_results] == [
+            (2, BatchItemOutcome.CREATED.value),
+            (3, BatchItemOutcome.REJECTED.value),
+        ]
+
+        unsupported = client.post(
+            "/v1/payments:import", content=b"{}", headers={"Content-Type": "application/json"}
+        )
+        assert unsupported.status_code == 415
+        assert unsupported.json()["message"].startswith(DomainMessage.UNSUPPORTED_IMPORT_FORMAT.value)
+    finally:
+        os.environ.pop("PAYMENTS_IMPORT_CHUNK_SIZE", None)
+
+    session = get_session_factory()()
+    try:
+        source = session.scalar(select(AccountORM).where(AccountORM.id == "acc-001"))
+        assert source is not None
+        assert source.available_balance_cents == 1_000 - 300 + 50
+    finally:
+        session.close()
+
+    async def split_lines(chunks: list[bytes]) -> list[tuple[int, str]]:
+        async def body() -> AsyncIterator[bytes]:
+            for chunk in chunks:
+                yield chunk
+
+        return [item async for item in iter_text_lines(body())]
+
+    oversized = b"x" * (MAX_LINE_BYTES + 10)
+    lines = asyncio.run(split_lines([b"a\r\nb", b"c\n", oversized[:100], oversized[100:] + b"\nd"]))
+    assert [(number, text[:3]) for number, text in lines] == [(1, "a"), (2, "bc"), (3, "xxx"), (4, "d")]
+    assert len(lines[2][1]) == MAX_LINE_BYTES
+    # Many short lines in one chunk, with a line split across the chunk boundary.
+    many = b"".join(f"line-{index}\n".encode() for index in range(5_000))
+    lines = asyncio.run(split_lines([many + b"tail-", b"end\n", b"last"]))
+    assert len(lines) == 5_002
+    assert lines[4_999] == (5_000, "line-4999")
+    assert lines[5_000:] == [(5_001, "tail-end"), (5_002, "last")]
+
+
+def test_outbox_flush_notifies_listeners_only_when_enabled() -> None:
+    class RecordingSession:
+        def __init__(self, notify: bool) -> None:
+            self.info = {OUTBOX_NOTIFY: notify}
+            self.statements: list[str] = []
+
+        def execute(self, statement: ClauseElement, _rows: object = None) -> None:
+            compiled = statement.compile(dialect=postgresql.dialect())  # type: ignore[no-untyped-call]
+            self.statements.append(str(compiled))
+
+    for notify in (True, False):
+        session = RecordingSession(notify)
+        buffer = AppendOnlyBuffer()
+        buffer.add_outbox_event("evt-1", "pay-1", OutboxEventType.PAYMENT_REQUESTED.value, "{}", None)
+        buffer.flush(session)  # type: ignore[arg-type]
+        notifications = [sql for sql in session.statements if "pg_notify" in sql]
+        assert len(notifications) == (1 if notify else 0)
+    # Ledger-only flushes (no new outbox rows) never notify.
+    session = RecordingSession(True)
+    buffer = AppendOnlyBuffer()
+    buffer.add_ledger_transfer("pay-2", "acc-001", "acc-002", 10)
+    buffer.flush(session)  # type: ignore[arg-type]
+    assert not [sql for sql in session.statements if "pg_notify" in sql]
+
+    # SQLite sessions never enable it.
+    sqlite_session = get_session_factory()()
+    try:
+        assert sqlite_session.info[OUTBOX_NOTIFY] is False
+    finally:
+        sqlite_session.close()
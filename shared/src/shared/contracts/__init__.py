@@ -1,30 +1,56 @@
+from shared.contracts.event_codec import (
+    EventPayload,
+    EventPayloadError,
+    decode_event_payload,
+    encode_event_payload,
+    event_payload_to_json,
+)
 from shared.contracts.messages import DomainMessage, WorkerMessage
 from shared.contracts.models import (
+    AccountLockStrategy,
     ApiErrorResponse,
+    BatchItemOutcome,
     ConsistencyMode,
+    CreatePaymentBatchRequest,
+    CreatePaymentBatchResponse,
     CreatePaymentRequest,
     ErrorCode,
     IncidentSeverity,
     LedgerDirection,
     OutboxEventType,
+    OutboxPayloadFormat,
     OutboxStatus,
+    PaymentBatchItemResult,
+    PaymentImportLineResult,
     PaymentMethod,
     PaymentResponse,
     PaymentStatus,
 )
 
 __all__ = [
+    "AccountLockStrategy",
     "ApiErrorResponse",
+    "BatchItemOutcome",
     "ConsistencyMode",
+    "CreatePaymentBatchRequest",
+    "CreatePaymentBatchResponse",
     "CreatePaymentRequest",
     "DomainMessage",
     "ErrorCode",
+    "EventPayload",
+    "EventPayloadError",
     "IncidentSeverity",
     "LedgerDirection",
     "OutboxEventType",
+    "OutboxPayloadFormat",
     "OutboxStatus",
+    "PaymentBatchItemResult",
+    "PaymentImportLineResult",
     "PaymentMethod",
     "PaymentResponse",
     "PaymentStatus",
     "WorkerMessage",
+    "decode_event_payload",
+    "encode_event_payload",
+    "event_payload_to_json",
 ]
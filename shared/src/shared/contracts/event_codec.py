@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+
+EVENT_CODEC_VERSION = 1
+
+# Layout v1: version byte, big-endian u64 amount and the u16 byte lengths of payment id,
+# source, destination and traceparent (0 when absent), followed by the UTF-8 strings.
+_HEADER = struct.Struct(">BQHHHH")
+
+
+class EventPayloadError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class EventPayload:
+    payment_id: str
+    source_account_id: str
+    destination_account_id: str
+    amount_cents: int
+    traceparent: str | None
+
+
+def encode_event_payload(payload: EventPayload) -> bytes:
+    payment_id = payload.payment_id.encode("utf-8")
+    source = payload.source_account_id.encode("utf-8")
+    destination = payload.destination_account_id.encode("utf-8")
+    traceparent = (payload.traceparent or "").encode("utf-8")
+    header = _HEADER.pack(
+        EVENT_CODEC_VERSION,
+        payload.amount_cents,
+        len(payment_id),
+        len(source),
+        len(destination),
+        len(traceparent),
+    )
+    return b"".join((header, payment_id, source, destination, traceparent))
+
+
+def decode_event_payload(data: bytes) -> EventPayload:
+    try:
+        version, amount_cents, *lengths = _HEADER.unpack_from(data, 0)
+    except struct.error as exc:
+        raise EventPayloadError("truncated header") from exc
+    if version != EVENT_CODEC_VERSION:
+        raise EventPayloadError(f"unsupported version {version}")
+    if _HEADER.size + sum(lengths) != len(data):
+        raise EventPayloadError("length mismatch")
+    try:
+        text = data[_HEADER.size :].decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise EventPayloadError("invalid utf-8 field") from exc
+    if len(text) != len(data) - _HEADER.size:
+        # Multi-byte characters: byte lengths no longer index the decoded string.
+        fields = _split_bytes(data, lengths)
+    else:
+        fields = _split_ascii(text, lengths)
+    payment_id, source_account_id, destination_account_id, traceparent = fields
+    if not (payment_id and source_account_id and destination_account_id):
+        raise EventPayloadError("empty identifier")
+    return EventPayload(
+        payment_id=payment_id,
+        source_account_id=source_account_id,
+        destination_account_id=destination_account_id,
+        amount_cents=amount_cents,
+        traceparent=traceparent or None,
+    )
+
+
+def _split_ascii(text: str, lengths: list[int]) -> list[str]:
+    fields = []
+    offset = 0
+    for length in lengths:
+        fields.append(text[offset : offset + length])
+        offset += length
+    return fields
+
+
+def _split_bytes(data: bytes, lengths: list[int]) -> list[str]:
+    fields = []
+    offset = _HEADER.size
+    for length in lengths:
+        try:
+            fields.append(data[offset : offset + length].decode("utf-8"))
+        except UnicodeDecodeError as exc:
+            raise EventPayloadError("invalid utf-8 field") from exc
+        offset += length
+    return fields
+
+
+def event_payload_to_json(payload: EventPayload) -> str:
+    return json.dumps(
+        {
+            "payment_id": payload.payment_id,
+            "source_account_id": payload.source_account_id,
+            "destination_account_id": payload.destination_account_id,
+            "amount_cents": payload.amount_cents,
+            "traceparent": payload.traceparent,
+        },
+        sort_keys=True,
+    )
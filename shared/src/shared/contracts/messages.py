@@ -8,13 +8,21 @@ class DomainMessage(str, Enum):
     IDEMPOTENCY_CONFLICT = "idempotency key reused with different payload"
     IDEMPOTENCY_IN_PROGRESS = "idempotency key is being processed"
     IDEMPOTENCY_RACE = "idempotency persistence race"
+    IDEMPOTENCY_EXPIRED = "idempotency key expired; its payment already exists"
     DATABASE_UNAVAILABLE = "database unavailable"
     ACCOUNT_NOT_FOUND = "account not found"
     INSUFFICIENT_FUNDS = "insufficient funds"
+    BATCH_TOO_LARGE = "batch exceeds maximum item count"
+    OPTIMISTIC_RETRIES_EXHAUSTED = "account changed concurrently; retries exhausted"
+    OUTBOX_BACKLOG_HIGH = "outbox backlog above high-water mark; retry later"
+    ACCOUNT_QUEUE_FULL = "too many requests queued on this account; retry later"
+    UNSUPPORTED_IMPORT_FORMAT = "unsupported import content type"
+    INVALID_IMPORT_LINE = "invalid import line"
 
 
 class WorkerMessage(str, Enum):
     INVALID_FAIL_PROFILE = "invalid FAIL_PROFILE"
+    INVALID_PARTITION_ASSIGNMENT = "invalid OUTBOX_PARTITIONS"
     DETERMINISTIC_WORKER_FAILURE = "deterministic worker failure"
     DETERMINISTIC_REDIS_FAILURE = "deterministic redis failure simulation"
     PAYMENT_NOT_FOUND = "payment not found"
@@ -22,3 +30,4 @@ class WorkerMessage(str, Enum):
     ACCOUNT_NOT_FOUND = "account not found"
     UNEXPECTED_EVENT = "unexpected event"
     INVALID_PAYLOAD_FIELD = "invalid payload field"
+    INVALID_PAYLOAD_ENCODING = "invalid binary payload"
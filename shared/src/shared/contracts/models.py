@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-import json
-from hashlib import sha256
 from enum import Enum
 
 from pydantic import BaseModel, Field
 
+from shared.contracts.request_hash import (
+    encode_request_fields,
+    is_legacy_request_hash,
+    request_hash_v1,
+    request_hash_v2,
+)
+
 
 class ConsistencyMode(str, Enum):
     STRONG = "strong"
@@ -13,6 +18,17 @@ class ConsistencyMode(str, Enum):
     EVENTUAL = "eventual"
 
 
+class AccountLockStrategy(str, Enum):
+    ORM = "orm"
+    LEAN = "lean"
+    OPTIMISTIC = "optimistic"
+
+
+class OutboxPayloadFormat(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+
 class ErrorCode(str, Enum):
     INSUFFICIENT_FUNDS = "INSUFFICIENT_FUNDS"
     INVALID_PAYMENT = "INVALID_PAYMENT"
@@ -20,6 +36,8 @@ class ErrorCode(str, Enum):
     IDEMPOTENCY_UNAVAILABLE = "IDEMPOTENCY_UNAVAILABLE"
     DEPENDENCY_UNAVAILABLE = "DEPENDENCY_UNAVAILABLE"
     INVARIANT_VIOLATION = "INVARIANT_VIOLATION"
+    CONCURRENCY_CONFLICT = "CONCURRENCY_CONFLICT"
+    OVERLOADED = "OVERLOADED"
 
 
 class IncidentSeverity(str, Enum):
@@ -65,9 +83,33 @@ class CreatePaymentRequest(BaseModel):
     method: PaymentMethod = PaymentMethod.PIX
 
     def compute_request_hash(self) -> str:
-        payload = self.model_dump(mode="json", by_alias=True)
-        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
-        return sha256(encoded).hexdigest()
+        encoded = encode_request_fields(
+            self.idempotency_key,
+            self.source_account_id,
+            self.destination_account_id,
+            self.amount_cents,
+            self.method.value,
+        )
+        return request_hash_v2(encoded)
+
+    def compute_legacy_request_hash(self) -> str:
+        return request_hash_v1(self.model_dump(mode="json", by_alias=True))
+
+    def matches_request_hash(self, stored_hash: str, request_hash: str | None = None) -> bool:
+        if stored_hash == (request_hash or self.compute_request_hash()):
+            return True
+        # Keys stored before the v2 scheme carry a bare SHA-256 of the JSON payload.
+        return is_legacy_request_hash(stored_hash) and stored_hash == self.compute_legacy_request_hash()
+
+
+class BatchItemOutcome(str, Enum):
+    CREATED = "created"
+    REPLAYED = "replayed"
+    REJECTED = "rejected"
+
+
+class CreatePaymentBatchRequest(BaseModel):
+    items: list[CreatePaymentRequest] = Field(min_length=1)
 
 
 class PaymentCreatedEvent(BaseModel):
@@ -87,3 +129,22 @@ class PaymentResponse(BaseModel):
 class ApiErrorResponse(BaseModel):
     error_code: ErrorCode
     message: str
+
+
+class PaymentBatchItemResult(BaseModel):
+    idempotency_key: str
+    outcome: BatchItemOutcome
+    payment: PaymentResponse | None = None
+    error: ApiErrorResponse | None = None
+
+
+class CreatePaymentBatchResponse(BaseModel):
+    results: list[PaymentBatchItemResult]
+
+
+class PaymentImportLineResult(BaseModel):
+    line: int
+    idempotency_key: str | None = None
+    outcome: BatchItemOutcome
+    payment: PaymentResponse | None = None
+    error: ApiErrorResponse | None = None
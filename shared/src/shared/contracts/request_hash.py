@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+import struct
+from hashlib import blake2b, sha256
+
+REQUEST_HASH_V2_PREFIX = "v2:"
+
+_LENGTH = struct.Struct(">H")
+_AMOUNT = struct.Struct(">Q")
+
+
+def encode_request_fields(
+    idempotency_key: str,
+    source_account_id: str,
+    destination_account_id: str,
+    amount_cents: int,
+    method: str,
+) -> bytes:
+    # Fixed field order, length-prefixed strings and a big-endian u64 amount: the
+    # encoding is unambiguous without a serializer or key sorting.
+    parts = [
+        encoded
+        for value in (idempotency_key, source_account_id, destination_account_id)
+        for encoded in _length_prefixed(value)
+    ]
+    parts.append(_AMOUNT.pack(amount_cents))
+    parts.extend(_length_prefixed(method))
+    return b"".join(parts)
+
+
+def request_hash_v2(encoded_fields: bytes) -> str:
+    return REQUEST_HASH_V2_PREFIX + blake2b(encoded_fields, digest_size=16).hexdigest()
+
+
+def request_hash_v1(payload: dict[str, object]) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return sha256(encoded).hexdigest()
+
+
+def is_legacy_request_hash(stored_hash: str) -> bool:
+    return not stored_hash.startswith(REQUEST_HASH_V2_PREFIX)
+
+
+def _length_prefixed(value: str) -> tuple[bytes, bytes]:
+    encoded = value.encode("utf-8")
+    return _LENGTH.pack(len(encoded)), encoded
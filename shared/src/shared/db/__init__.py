@@ -1,3 +1,10 @@
+from shared.db.account_updates import (
+    AccountBalance,
+    balance_delta_statement,
+    compare_and_swap_statement,
+    lock_balances_statement,
+)
+from shared.db.append_only import AppendOnlyBuffer, insert_rows, ledger_transfer_rows
 from shared.db.base import Base
 from shared.db.orm_models import (
     AccountORM,
@@ -8,10 +15,17 @@ from shared.db.orm_models import (
 )
 
 __all__ = [
+    "AccountBalance",
     "AccountORM",
+    "AppendOnlyBuffer",
     "Base",
     "IdempotencyKeyORM",
     "LedgerEntryORM",
     "OutboxEventORM",
     "PaymentORM",
+    "balance_delta_statement",
+    "compare_and_swap_statement",
+    "insert_rows",
+    "ledger_transfer_rows",
+    "lock_balances_statement",
 ]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, Select, Update, select, update
+
+from shared.db.orm_models import AccountORM
+
+BALANCE_COLUMNS = (
+    AccountORM.id,
+    AccountORM.available_balance_cents,
+    AccountORM.reserved_balance_cents,
+    AccountORM.version,
+)
+
+
+@dataclass(frozen=True)
+class AccountBalance:
+    account_id: str
+    available_balance_cents: int
+    reserved_balance_cents: int
+    version: int
+
+
+def lock_balances_statement(
+    account_ids: Iterable[str], *, for_update: bool = True
+) -> Select[tuple[str, int, int, int]]:
+    statement = (
+        select(*BALANCE_COLUMNS)
+        .where(AccountORM.id.in_(sorted(set(account_ids))))
+        .order_by(AccountORM.id.asc())
+    )
+    if for_update:
+        statement = statement.with_for_update()
+    return statement
+
+
+def balance_delta_statement(
+    account_id: str,
+    *,
+    available_delta: int = 0,
+    reserved_delta: int = 0,
+    min_available: int | None = None,
+    min_reserved: int | None = None,
+) -> Update:
+    guards: list[ColumnElement[bool]] = [AccountORM.id == account_id]
+    if min_available is not None:
+        guards.append(AccountORM.available_balance_cents >= min_available)
+    if min_reserved is not None:
+        guards.append(AccountORM.reserved_balance_cents >= min_reserved)
+    return (
+        update(AccountORM)
+        .where(*guards)
+        .values(
+            available_balance_cents=AccountORM.available_balance_cents + available_delta,
+            reserved_balance_cents=AccountORM.reserved_balance_cents + reserved_delta,
+            version=AccountORM.version + 1,
+        )
+        .returning(*BALANCE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def compare_and_swap_statement(
+    balance: AccountBalance, *, available_delta: int = 0, reserved_delta: int = 0
+) -> Update:
+    return (
+        update(AccountORM)
+        .where(AccountORM.id == balance.account_id, AccountORM.version == balance.version)
+        .values(
+            available_balance_cents=balance.available_balance_cents + available_delta,
+            reserved_balance_cents=balance.reserved_balance_cents + reserved_delta,
+            version=balance.version + 1,
+        )
+        .returning(*BALANCE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
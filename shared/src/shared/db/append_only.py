@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import cast
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.orm import Session
+
+from shared.contracts.models import LedgerDirection, OutboxStatus
+from shared.db.orm_models import LedgerEntryORM, OutboxEventORM, utc_now
+from shared.utils.ids import new_id
+
+LEDGER_ENTRIES_TABLE = cast(Table, LedgerEntryORM.__table__)
+OUTBOX_EVENTS_TABLE = cast(Table, OutboxEventORM.__table__)
+
+# Workers LISTEN on this channel. Writers opt in through this Session.info key
+# (PostgreSQL only).
+OUTBOX_CHANNEL = "outbox_events"
+OUTBOX_NOTIFY = "outbox_notify"
+
+
+def ledger_transfer_rows(
+    payment_id: str, source_id: str, destination_id: str, amount_cents: int
+) -> list[dict[str, object]]:
+    created_at = utc_now()
+    return [
+        {
+            "id": new_id("led"),
+            "payment_id": payment_id,
+            "account_id": account_id,
+            "direction": direction.value,
+            "amount_cents": amount_cents,
+            "created_at": created_at,
+        }
+        for account_id, direction in (
+            (source_id, LedgerDirection.DEBIT),
+            (destination_id, LedgerDirection.CREDIT),
+        )
+    ]
+
+
+def insert_rows(session: Session, table: Table, rows: list[dict[str, object]]) -> None:
+    if rows:
+        # Core executemany: one statement per table, batched by insertmanyvalues,
+        # with no identity-map or unit-of-work bookkeeping for the rows.
+        session.execute(insert(table), rows)
+
+
+def notify_outbox(session: Session) -> None:
+    # Delivered when the transaction commits and never for a rollback. Identical
+    # notifications in one transaction are folded into one.
+    session.execute(select(func.pg_notify(OUTBOX_CHANNEL, "")))
+
+
+@dataclass
+class AppendOnlyBuffer:
+    # Ledger entries and freshly created outbox events are never read back or updated
+    # by the transaction that writes them, so they are collected as plain rows and
+    # written once per transaction instead of as ORM objects.
+    ledger_entries: list[dict[str, object]] = field(default_factory=list)
+    outbox_events: list[dict[str, object]] = field(default_factory=list)
+
+    def add_ledger_transfer(
+        self, payment_id: str, source_id: str, destination_id: str, amount_cents: int
+    ) -> None:
+        self.ledger_entries.extend(
+            ledger_transfer_rows(payment_id, source_id, destination_id, amount_cents)
+        )
+
+    def add_outbox_event(
+        self,
+        event_id: str,
+        aggregate_id: str,
+        event_type: str,
+        payload_json: str | None,
+        payload_bin: bytes | None,
+        partition_key: int = 0,
+    ) -> None:
+        self.outbox_events.append(
+            {
+                "id": event_id,
+                "aggregate_type": "payment",
+                "aggregate_id": aggregate_id,
+                "event_type": event_type,
+                "payload_json": payload_json,
+                "payload_bin": payload_bin,
+                "status": OutboxStatus.PENDING.value,
+                "attempts": 0,
+                "next_retry_at": None,
+                "partition_key": partition_key,
+                "created_at": utc_now(),
+            }
+        )
+
+    def clear(self) -> None:
+        self.ledger_entries = []
+        self.outbox_events = []
+
+    def flush(self, session: Session) -> None:
+        insert_rows(session, LEDGER_ENTRIES_TABLE, self.ledger_entries)
+        insert_rows(session, OUTBOX_EVENTS_TABLE, self.outbox_events)
+        if self.outbox_events and session.info.get(OUTBOX_NOTIFY, False):
+            notify_outbox(session)
+        self.clear()
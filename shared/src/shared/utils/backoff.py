@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay_seconds: float = 0.002
+    max_delay_seconds: float = 0.1
+
+    def delay_seconds(self, attempt: int, rng: random.Random | None = None) -> float:
+        # Full jitter: contenders that lost the same race spread out instead of
+        # colliding again on the next attempt.
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(attempt - 1, 0)))
+        return (rng or random).uniform(0.0, ceiling)
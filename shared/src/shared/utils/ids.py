@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections.abc import Callable
+
+_SEQUENCE_MAX = 0xFFF
+
+
+class TimeOrderedIdGenerator:
+    # UUIDv7 layout (RFC 9562): 48-bit Unix milliseconds, version 7, a 12-bit sequence in
+    # rand_a, the variant bits and 62 random bits. The sequence restarts from a random
+    # 11-bit value each millisecond and increments within it, so ids from one process are
+    # strictly increasing and new rows land on the right-most B-tree page.
+    def __init__(
+        self,
+        clock_ns: Callable[[], int] = time.time_ns,
+        random_bits: Callable[[int], int] = secrets.randbits,
+    ) -> None:
+        self._clock_ns = clock_ns
+        self._random_bits = random_bits
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def new_int(self) -> int:
+        with self._lock:
+            now_ms = self._clock_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = self._random_bits(11)
+            else:
+                # Same millisecond or the wall clock stepped back: keep counting from
+                # the last issued value, borrowing the next millisecond on overflow.
+                self._sequence += 1
+                if self._sequence > _SEQUENCE_MAX:
+                    self._last_ms += 1
+                    self._sequence = 0
+            timestamp_ms = self._last_ms
+            sequence = self._sequence
+        return (
+            (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+            | 0x7 << 76
+            | sequence << 64
+            | 0b10 << 62
+            | self._random_bits(62)
+        )
+
+    def new_hex(self) -> str:
+        return f"{self.new_int():032x}"
+
+
+_GENERATOR = TimeOrderedIdGenerator()
+
+
+def new_id(prefix: str) -> str:
+    # Same shape as f"{prefix}-{uuid4().hex}": fixed-width lowercase hex sorts by time.
+    return f"{prefix}-{_GENERATOR.new_hex()}"
+
+
+def id_timestamp_ms(identifier: str) -> int:
+    return int(identifier.rsplit("-", 1)[-1][:12], 16)
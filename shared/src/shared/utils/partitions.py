@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import zlib
+
+# Fixed key space written with every outbox event. Workers map keys onto however many
+# partitions a deployment runs (`partition_key % total`), so the count can change
+# without rewriting rows.
+OUTBOX_PARTITION_SPACE = 4096
+
+
+def outbox_partition_key(account_id: str) -> int:
+    # crc32 rather than hash(): the value must agree across processes and restarts.
+    return zlib.crc32(account_id.encode("utf-8")) % OUTBOX_PARTITION_SPACE